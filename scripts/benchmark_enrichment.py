@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Benchmark GeoIP / ASN Enrichment Overhead on Ingest
+
+Runs the OCSF ingest path (transform → Parquet encode) over synthetic
+Zeek conn records without and with the GeoIP enrichment stage, interleaved
+--repeat times, and reports the added time of the fastest runs. Exits
+non-zero if enrichment adds more than --max-overhead percent.
+
+Without --db a synthetic range database is generated (400K ranges, about
+the size of GeoLite2-ASN IPv4).
+
+Requirements:
+    pip install pandas numpy pyarrow
+
+Per-run timings can be written as JSON (--output) for comparison with
+scripts/compare_benchmarks.py.
+
+Usage:
+    python3 scripts/benchmark_enrichment.py --records 1000000
+    python3 scripts/benchmark_enrichment.py --db GeoLite2-ASN-Blocks-IPv4.csv
+    python3 scripts/benchmark_enrichment.py --output results/ingest-baseline.json
+"""
+
+import argparse
+import json
+import logging
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from ocsf_enrichment import GeoIPEnricher, apply_enrichments
+from settings import get_settings
+from transform_zeek_to_ocsf_flat import transform_zeek_to_ocsf_flat, write_ocsf_parquet
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def _int_to_ipv4(values: np.ndarray) -> np.ndarray:
+    octets = [(values >> shift) & 0xFF for shift in (24, 16, 8, 0)]
+    return np.char.add(
+        np.char.add(np.char.add(octets[0].astype(str), '.'), np.char.add(octets[1].astype(str), '.')),
+        np.char.add(np.char.add(octets[2].astype(str), '.'), octets[3].astype(str))
+    )
+
+
+def synthetic_records(count: int, seed: int = 42) -> List[Dict]:
+    """Zeek conn records with Zipf-distributed external destinations"""
+    rng = np.random.default_rng(seed)
+    src = _int_to_ipv4((10 << 24) + rng.integers(0, 4096, count))
+    dst_pool = rng.integers(1 << 24, 223 << 24, 50000)
+    dst = _int_to_ipv4(dst_pool[np.minimum(rng.zipf(1.3, count), len(dst_pool)) - 1])
+    ts = 1699886400 + np.sort(rng.uniform(0, 86400, count))
+    orig_bytes = rng.lognormal(7, 2, count).astype(np.int64)
+    resp_bytes = rng.lognormal(8, 2, count).astype(np.int64)
+
+    return [
+        {
+            'ts': float(ts[i]), 'uid': f'C{i:017d}',
+            'id.orig_h': str(src[i]), 'id.orig_p': 49152 + i % 16384,
+            'id.resp_h': str(dst[i]), 'id.resp_p': 443,
+            'proto': 'tcp', 'service': 'ssl', 'conn_state': 'SF',
+            'orig_bytes': int(orig_bytes[i]), 'resp_bytes': int(resp_bytes[i]),
+            'orig_pkts': 10, 'resp_pkts': 12, 'duration': 1.5,
+        }
+        for i in range(count)
+    ]
+
+
+def synthetic_range_db(path: Path, ranges: int = 400000, seed: int = 42) -> None:
+    """Write a non-overlapping start_ip,end_ip CSV range database"""
+    rng = np.random.default_rng(seed)
+    bounds = np.unique(rng.integers(1 << 24, 224 << 24, ranges * 2))
+    starts, ends = bounds[0::2], bounds[1::2]
+    n = min(len(starts), len(ends))
+    pd.DataFrame({
+        'start_ip': starts[:n],
+        'end_ip': ends[:n],
+        'country': rng.choice(['US', 'DE', 'CN', 'BR', 'IN', 'GB', 'RU', 'JP'], n),
+        'asn': rng.integers(1, 400000, n),
+        'as_org': [f'AS-ORG-{i % 5000}' for i in range(n)],
+    }).to_csv(path, index=False)
+
+
+def run_ingest(records: List[Dict], stages: list, out_dir: Path) -> float:
+    """Transform, enrich and encode records batch by batch; returns seconds"""
+    logging.getLogger('transform_zeek_to_ocsf_flat').setLevel(logging.WARNING)
+    batch_size = get_settings().ingest.batch_size  # same batches as the loaders
+    start = time.perf_counter()
+    for n, offset in enumerate(range(0, len(records), batch_size)):
+        df = transform_zeek_to_ocsf_flat(records[offset:offset + batch_size])
+        df = apply_enrichments(df, stages)
+        write_ocsf_parquet(df, out_dir / f'batch-{n:05d}.parquet')
+    return time.perf_counter() - start
+
+
+def main():
+    """Main execution flow"""
+    parser = argparse.ArgumentParser(description='Benchmark GeoIP enrichment overhead on ingest')
+    parser.add_argument('--records', type=int, default=1000000,
+                        help='Number of synthetic conn records (default: 1000000)')
+    parser.add_argument('--db', type=str, action='append',
+                        help='Range database CSV (repeatable; default: synthetic)')
+    parser.add_argument('--max-overhead', type=float, default=10.0,
+                        help='Maximum allowed overhead in percent (default: 10)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Interleaved repetitions; the fastest of each is kept (default: 3)')
+    parser.add_argument('--output', type=Path,
+                        help='Write per-run results JSON here')
+    args = parser.parse_args()
+
+    started_at = datetime.now(timezone.utc)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+
+        databases = args.db
+        if not databases:
+            databases = [tmp_dir / 'ranges.csv']
+            synthetic_range_db(databases[0])
+
+        logger.info(f"Generating {args.records:,} synthetic conn records...")
+        records = synthetic_records(args.records)
+        enricher = GeoIPEnricher(databases)
+
+        # Interleave runs so drift (thermal, page cache, GC) hits both sides
+        baseline_runs, enriched_runs = [], []
+        for i in range(args.repeat):
+            logger.info(f"Run {i + 1}/{args.repeat}...")
+            baseline_runs.append(run_ingest(records, [], tmp_dir))
+            enriched_runs.append(run_ingest(records, [enricher], tmp_dir))
+        baseline = min(baseline_runs)
+        enriched = min(enriched_runs)
+
+    overhead = (enriched - baseline) / baseline * 100
+    logger.info("")
+    logger.info(f"Baseline ingest:  {baseline:.2f} s ({args.records / baseline:,.0f} records/s)")
+    logger.info(f"With enrichment:  {enriched:.2f} s ({args.records / enriched:,.0f} records/s)")
+    logger.info(f"Overhead:         {overhead:+.1f}% (limit {args.max_overhead:.0f}%)")
+    logger.info(f"IP cache:         {enricher.cache_hits:,} hits / {enricher.cache_misses:,} misses")
+
+    if args.output:
+        report = {
+            "kind": "ingest",
+            "started_at": started_at.isoformat(),
+            "host": platform.node(),
+            "records": args.records,
+            "repeat": args.repeat,
+            "runs": [
+                {
+                    "name": name,
+                    "samples": [
+                        {"seconds": seconds, "records_per_second": args.records / seconds}
+                        for seconds in runs
+                    ],
+                }
+                for name, runs in (("transform_encode", baseline_runs),
+                                   ("transform_geoip_encode", enriched_runs))
+            ],
+        }
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        logger.info(f"✓ Results written to {args.output}")
+
+    if overhead > args.max_overhead:
+        logger.error("✗ Enrichment overhead exceeds limit")
+        return 1
+    logger.info("✓ Enrichment overhead within limit")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
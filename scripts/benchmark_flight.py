@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Benchmark Arrow Flight vs REST Result Extraction
+
+Extracts the same result set (default 1M rows of network-activity-ocsf)
+through both query paths of dremio_query.py and reports wall time,
+throughput and result size.
+
+By default both sides run against local stand-ins serving one table, so the
+comparison measures transport and decoding only:
+
+- REST: http.server implementing /apiv2/login, /api/v3/sql, /api/v3/job/{id}
+  and paged /results JSON (500 rows per page, as Dremio)
+- Flight: pyarrow.flight server with basic → bearer token auth, as Dremio
+
+The stand-ins ignore the SQL text and always return the served table. Use
+--dremio to run the same extract against a live Dremio instead.
+
+Requirements:
+    pip install requests pandas numpy pyarrow
+
+Usage:
+    python3 scripts/benchmark_flight.py --records 1000000
+    python3 scripts/benchmark_flight.py --parquet /data/network-activity-ocsf/year=2023/month=11/day=13/data.parquet
+    python3 scripts/benchmark_flight.py --dremio --records 1000000
+"""
+
+import argparse
+import base64
+import json
+import logging
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+
+import pyarrow as pa
+import pyarrow.flight as flight
+import pyarrow.parquet as pq
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from benchmark_enrichment import synthetic_records
+from dremio_client import DremioClient
+from dremio_query import PAGE_SIZE, run_query
+from settings import get_settings
+from transform_zeek_to_ocsf_flat import transform_zeek_to_ocsf_flat
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+STANDIN_USER = "bench"
+STANDIN_PASSWORD = "bench"
+STANDIN_TOKEN = "standin-token"
+
+# Columns typically pulled by an analyst extract
+EXTRACT_COLUMNS = [
+    'time', 'event_date', 'activity_name', 'src_endpoint_ip', 'src_endpoint_port',
+    'dst_endpoint_ip', 'dst_endpoint_port', 'connection_info_protocol_name',
+    'connection_info_uid', 'traffic_bytes_in', 'traffic_bytes_out',
+    'src_endpoint_is_local', 'dst_endpoint_is_local',
+]
+
+# Arrow type → Dremio SQL type name for the REST stand-in's schema
+ARROW_DREMIO_TYPES = [
+    (pa.types.is_boolean, "BOOLEAN"),
+    (pa.types.is_integer, "BIGINT"),
+    (pa.types.is_floating, "DOUBLE"),
+    (pa.types.is_timestamp, "TIMESTAMP"),
+    (pa.types.is_date, "DATE"),
+]
+
+
+# ============================================================================
+# Stand-in servers
+# ============================================================================
+
+def _dremio_type(arrow_type: pa.DataType) -> str:
+    for check, name in ARROW_DREMIO_TYPES:
+        if check(arrow_type):
+            return name
+    return "VARCHAR"
+
+
+def start_rest_standin(table: pa.Table) -> ThreadingHTTPServer:
+    """Serve a table through Dremio's job/results REST protocol"""
+    schema = [{"name": f.name, "type": {"name": _dremio_type(f.type)}} for f in table.schema]
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, body: Dict):
+            payload = json.dumps(body, default=str).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            if self.path == '/apiv2/login':
+                self._send({"token": STANDIN_TOKEN, "expires": int((time.time() + 3600) * 1000)})
+            else:
+                self._send({"id": "standin-job"})
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path.endswith('/results'):
+                query = parse_qs(url.query)
+                offset, limit = int(query['offset'][0]), int(query['limit'][0])
+                rows = table.slice(offset, min(limit, PAGE_SIZE)).to_pylist()
+                self._send({"rowCount": table.num_rows, "schema": schema, "rows": rows})
+            else:
+                self._send({"jobState": "COMPLETED", "rowCount": table.num_rows})
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class _BearerMiddleware(flight.ServerMiddleware):
+    def __init__(self, token: str):
+        self.token = token
+
+    def sending_headers(self):
+        return {'authorization': f'Bearer {self.token}'}
+
+
+class _AuthMiddlewareFactory(flight.ServerMiddlewareFactory):
+    """Basic auth on the handshake, bearer token afterwards (Dremio's scheme)"""
+
+    def start_call(self, info, headers):
+        auth = next(iter(headers.get('authorization', [])), '')
+        if auth.startswith('Basic '):
+            user, _, password = base64.b64decode(auth[6:]).decode().partition(':')
+            if (user, password) == (STANDIN_USER, STANDIN_PASSWORD):
+                return _BearerMiddleware(STANDIN_TOKEN)
+        elif auth == f'Bearer {STANDIN_TOKEN}':
+            return None
+        raise flight.FlightUnauthenticatedError('Invalid credentials')
+
+
+class _NoopAuthHandler(flight.ServerAuthHandler):
+    """Accept the handshake; credentials are checked by the middleware"""
+
+    def authenticate(self, outgoing, incoming):
+        pass
+
+    def is_valid(self, token):
+        return ""
+
+
+class FlightStandin(flight.FlightServerBase):
+    """Serve a table as the result of any Flight command"""
+
+    def __init__(self, table: pa.Table):
+        super().__init__('grpc+tcp://127.0.0.1:0', auth_handler=_NoopAuthHandler(),
+                         middleware={'auth': _AuthMiddlewareFactory()})
+        self.table = table
+
+    def get_flight_info(self, context, descriptor):
+        endpoint = flight.FlightEndpoint(b'result', [])
+        return flight.FlightInfo(self.table.schema, descriptor, [endpoint],
+                                 self.table.num_rows, self.table.nbytes)
+
+    def do_get(self, context, ticket):
+        return flight.RecordBatchStream(self.table)
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+def load_table(args) -> pa.Table:
+    """Result set served by the stand-ins"""
+    if args.parquet:
+        table = pq.read_table(args.parquet)
+    else:
+        logger.info(f"Generating {args.records:,} synthetic OCSF records...")
+        logging.getLogger('transform_zeek_to_ocsf_flat').setLevel(logging.WARNING)
+        table = pa.Table.from_pandas(
+            transform_zeek_to_ocsf_flat(synthetic_records(args.records)), preserve_index=False
+        )
+    columns = [c for c in EXTRACT_COLUMNS if c in table.column_names]
+    return table.select(columns).slice(0, args.records)
+
+
+def time_extract(client: DremioClient, sql: str, use_flight: bool,
+                 flight_port: int, repeat: int) -> Dict:
+    """Fastest of `repeat` extracts through one path"""
+    timings: List[float] = []
+    for _ in range(repeat):
+        result = run_query(client, sql, flight=use_flight, flight_port=flight_port)
+        timings.append(result.elapsed)
+    return {
+        "seconds": min(timings),
+        "rows": result.table.num_rows,
+        "bytes": result.table.nbytes,
+    }
+
+
+def main():
+    """Main execution flow"""
+    parser = argparse.ArgumentParser(description='Benchmark Arrow Flight vs REST result extraction')
+    parser.add_argument('--records', type=int, default=1000000,
+                        help='Rows to extract (default: 1000000)')
+    parser.add_argument('--parquet', type=str,
+                        help='Serve this Parquet file from the stand-ins instead of synthetic data')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='Extracts per path; the fastest is kept (default: 1)')
+    parser.add_argument('--dremio', action='store_true',
+                        help='Benchmark against the configured live Dremio instead of stand-ins')
+    args = parser.parse_args()
+
+    settings = get_settings()
+    dataset = f'{settings.dremio.source}."{settings.minio.bucket}"."{settings.folders["conn"]}"'
+    columns = ', '.join(EXTRACT_COLUMNS)
+    sql = f'SELECT {columns} FROM {dataset} LIMIT {args.records}'
+
+    if args.dremio:
+        client = DremioClient(interactive=True)
+        flight_port = settings.dremio.flight_port
+        servers = []
+    else:
+        table = load_table(args)
+        logger.info(f"Serving {table.num_rows:,} rows x {table.num_columns} columns "
+                    f"({table.nbytes / 1e6:,.1f} MB in Arrow)")
+        rest_server = start_rest_standin(table)
+        flight_server = FlightStandin(table)
+        servers = [rest_server, flight_server]
+        client = DremioClient(f"http://127.0.0.1:{rest_server.server_port}",
+                              STANDIN_USER, STANDIN_PASSWORD, token_cache=None, pool_size=32)
+        flight_port = flight_server.port
+
+    try:
+        logger.info("Extracting over REST (JSON pages)...")
+        rest = time_extract(client, sql, False, flight_port, args.repeat)
+        logger.info("Extracting over Arrow Flight...")
+        arrow = time_extract(client, sql, True, flight_port, args.repeat)
+    finally:
+        for server in servers:
+            server.shutdown()
+
+    logger.info("")
+    for name, stats in (("REST", rest), ("Flight", arrow)):
+        logger.info(f"{name:<7} {stats['seconds']:8.2f} s  {stats['rows'] / stats['seconds']:>12,.0f} rows/s  "
+                    f"{stats['rows']:,} rows  {stats['bytes'] / 1e6:,.1f} MB")
+    logger.info(f"Speedup: {rest['seconds'] / arrow['seconds']:.1f}x")
+
+    if rest['rows'] != arrow['rows']:
+        logger.error("✗ Row counts differ between paths")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Dremio Query Benchmark Suite
+
+Runs a catalog of workload queries against Dremio and records, per query:
+
+- Wall latency (submit → results fetched) and server job latency
+  (startedAt → endedAt) for every repetition, with p50/p95/p99
+- Rows returned, rows and bytes scanned (from the job profile)
+- Whether a reflection accelerated the query, and which
+
+Each query gets --warmup untimed runs followed by --repeat timed runs.
+Results are written as JSON (per-sample values included) so runs can be
+compared with scripts/compare_benchmarks.py.
+
+The default catalog (config/benchmarks/ocsf_queries.json) holds the sample
+queries from load_real_zeek_to_ocsf.py and docs/demo/DEMO-SQL-QUERIES.md,
+plus date-bounded queries (tag "pruning") that show how much of the data
+partitioned/sorted reflections let Dremio skip. YAML catalogs with the same
+structure are accepted when PyYAML is installed.
+
+Catalog SQL may reference {params}. Each catalog param is a literal or a
+{"sql": ...} whose first result cell is used (e.g. the latest event_date);
+--param name=value overrides either.
+
+Requirements:
+    pip install requests pyarrow numpy
+
+Usage:
+    python3 scripts/benchmark_queries.py --output results/queries-baseline.json
+    python3 scripts/benchmark_queries.py --query demo_09_source_fanout --repeat 20
+    python3 scripts/benchmark_queries.py --catalog my_workload.yaml --warmup 2
+    python3 scripts/benchmark_queries.py --tag pruning --param day=2025-01-15
+"""
+
+import argparse
+import json
+import logging
+import platform
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from dremio_client import DremioClient
+from dremio_query import DremioQueryError, QueryResult, run_query
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Benchmark Configuration
+DEFAULT_CATALOG = Path(__file__).parent.parent / "config" / "benchmarks" / "ocsf_queries.json"
+DEFAULT_WARMUP = 1
+DEFAULT_REPEAT = 10
+PERCENTILES = (50, 95, 99)
+
+
+def load_catalog(path: Path) -> Dict:
+    """
+    Load a query catalog ({"name": ..., "queries": [{"name", "sql", ...}]}).
+
+    Args:
+        path: JSON, or YAML (.yaml/.yml) when PyYAML is installed
+
+    Returns:
+        Catalog dictionary
+    """
+    text = Path(path).read_text()
+    if Path(path).suffix in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError as e:
+            raise ImportError("YAML catalogs require PyYAML (pip install pyyaml)") from e
+        catalog = yaml.safe_load(text)
+    else:
+        catalog = json.loads(text)
+
+    names = [q['name'] for q in catalog.get('queries', [])]
+    if len(names) != len(set(names)):
+        raise ValueError(f"Duplicate query names in {path}")
+    return catalog
+
+
+def resolve_params(client: DremioClient, catalog: Dict, overrides: Dict[str, str]) -> Dict[str, str]:
+    """
+    Values for the catalog's SQL parameters.
+
+    Args:
+        client: Dremio client (for {"sql": ...} params)
+        catalog: Catalog with an optional "params" mapping
+        overrides: Values given on the command line
+
+    Returns:
+        Parameter name → value
+    """
+    params = {}
+    for name, spec in catalog.get("params", {}).items():
+        if name in overrides:
+            params[name] = overrides[name]
+        elif isinstance(spec, dict) and "sql" in spec:
+            table = run_query(client, spec["sql"]).table
+            if table.num_rows == 0 or table.column(0)[0].as_py() is None:
+                raise DremioQueryError(f"Parameter {name!r} query returned no value")
+            params[name] = str(table.column(0)[0].as_py())
+        else:
+            params[name] = str(spec)
+    params.update({k: v for k, v in overrides.items() if k not in params})
+    return params
+
+
+def render_sql(sql: str, params: Dict[str, str]) -> str:
+    """Substitute {name} placeholders (other braces are left alone)"""
+    for name, value in params.items():
+        sql = sql.replace("{" + name + "}", value)
+    return sql
+
+
+def job_profile(client: DremioClient, job_id: str) -> Dict:
+    """
+    Scan statistics and reflection usage for a finished job.
+
+    Reads the job details behind the UI's job profile page; missing fields
+    (which vary across Dremio versions) are reported as None.
+    """
+    profile = {"rows_scanned": None, "bytes_scanned": None, "reflections_used": []}
+    response = client.get(f"/apiv2/job/{job_id}/details")
+    if response.status_code != 200:
+        return profile
+
+    details = response.json()
+    stats = details.get("stats") or {}
+    datasets = [d.get("datasetProfile", {}) for d in details.get("tableDatasetProfiles", [])]
+
+    profile["rows_scanned"] = stats.get("inputRecords", sum(d.get("recordsRead", 0) for d in datasets) or None)
+    profile["bytes_scanned"] = stats.get("inputBytes", sum(d.get("bytesRead", 0) for d in datasets) or None)
+    profile["reflections_used"] = [
+        r.get("reflectionName") or r.get("reflectionId")
+        for r in details.get("reflectionsUsed", [])
+    ]
+    return profile
+
+
+def _reflections_chosen(job: Dict) -> List[str]:
+    """Reflection ids the planner chose, from the v3 job status"""
+    relationships = (job.get("acceleration") or {}).get("reflectionRelationships", [])
+    return [r.get("reflectionId") for r in relationships if r.get("relationship") == "CHOSEN"]
+
+
+def _job_seconds(job: Dict) -> Optional[float]:
+    try:
+        return (int(job["endedAt"]) - int(job["startedAt"])) / 1000
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def measure(client: DremioClient, result: QueryResult) -> Dict:
+    """One benchmark sample from a completed query"""
+    profile = job_profile(client, result.job_id) if result.job_id else {}
+    reflections = profile.get("reflections_used") or _reflections_chosen(result.job)
+    return {
+        "wall_seconds": result.elapsed,
+        "job_seconds": _job_seconds(result.job),
+        "rows": result.row_count,
+        "rows_scanned": profile.get("rows_scanned"),
+        "bytes_scanned": profile.get("bytes_scanned"),
+        "reflection_used": bool(reflections),
+        "reflections": reflections,
+        "job_id": result.job_id,
+    }
+
+
+def summarize(samples: List[Dict]) -> Dict:
+    """Percentiles and representative values over a query's samples"""
+    wall = np.array([s["wall_seconds"] for s in samples])
+    job = np.array([s["job_seconds"] for s in samples if s["job_seconds"] is not None])
+    summary = {
+        f"p{p}_seconds": float(np.percentile(wall, p)) for p in PERCENTILES
+    }
+    summary["mean_seconds"] = float(wall.mean())
+    if job.size:
+        summary.update({f"job_p{p}_seconds": float(np.percentile(job, p)) for p in PERCENTILES})
+    last = samples[-1]
+    summary.update({
+        "rows": last["rows"],
+        "rows_scanned": last["rows_scanned"],
+        "bytes_scanned": last["bytes_scanned"],
+        "reflection_used": any(s["reflection_used"] for s in samples),
+    })
+    return summary
+
+
+def benchmark_query(client: DremioClient, query: Dict, warmup: int, repeat: int,
+                    fetch: bool) -> Dict:
+    """Warm up, then time `repeat` runs of one catalog query"""
+    entry = {"name": query["name"], "sql": query["sql"], "samples": [], "error": None}
+    try:
+        for _ in range(warmup):
+            run_query(client, query["sql"], fetch=fetch)
+        for _ in range(repeat):
+            entry["samples"].append(measure(client, run_query(client, query["sql"], fetch=fetch)))
+    except DremioQueryError as e:
+        entry["error"] = str(e)
+        logger.error(f"  ✗ {query['name']}: {e}")
+        return entry
+
+    entry.update(summarize(entry["samples"]))
+    logger.info(
+        f"  {query['name']:<32} p50 {entry['p50_seconds'] * 1000:8.1f} ms  "
+        f"p95 {entry['p95_seconds'] * 1000:8.1f} ms  p99 {entry['p99_seconds'] * 1000:8.1f} ms  "
+        f"rows {entry['rows']:>8,}  scanned {entry['rows_scanned'] or 0:>11,}  "
+        f"reflection {'yes' if entry['reflection_used'] else 'no'}"
+    )
+    return entry
+
+
+def main():
+    """Main execution flow"""
+    parser = argparse.ArgumentParser(description='Benchmark a catalog of Dremio workload queries')
+    parser.add_argument('--catalog', type=Path, default=DEFAULT_CATALOG,
+                        help=f'Query catalog JSON/YAML (default: {DEFAULT_CATALOG.name})')
+    parser.add_argument('--query', action='append',
+                        help='Only run this catalog query (repeatable)')
+    parser.add_argument('--tag', action='append',
+                        help='Only run catalog queries with this tag (repeatable)')
+    parser.add_argument('--param', action='append', default=[], metavar='NAME=VALUE',
+                        help='Set a catalog SQL parameter (repeatable)')
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP,
+                        help=f'Untimed runs per query (default: {DEFAULT_WARMUP})')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help=f'Timed runs per query (default: {DEFAULT_REPEAT})')
+    parser.add_argument('--no-fetch', action='store_true',
+                        help='Time job completion only, without downloading results')
+    parser.add_argument('--output', type=Path,
+                        help='Write results JSON here (default: stdout)')
+    parser.add_argument('--url', type=str, help='Dremio URL (default: dremio.url setting)')
+    parser.add_argument('--username', type=str, help='Dremio user (default: dremio.username setting)')
+    args = parser.parse_args()
+
+    catalog = load_catalog(args.catalog)
+    queries = catalog["queries"]
+    if args.query:
+        unknown = set(args.query) - {q["name"] for q in queries}
+        if unknown:
+            logger.error(f"Unknown queries: {', '.join(sorted(unknown))}")
+            return 1
+        queries = [q for q in queries if q["name"] in args.query]
+    if args.tag:
+        queries = [q for q in queries if set(args.tag) & set(q.get("tags", []))]
+
+    overrides = {}
+    for param in args.param:
+        name, sep, value = param.partition("=")
+        if not sep:
+            logger.error(f"--param expects NAME=VALUE, got {param!r}")
+            return 1
+        overrides[name] = value
+
+    client = DremioClient(args.url, args.username, interactive=True)
+    client.login()
+
+    try:
+        params = resolve_params(client, catalog, overrides)
+    except DremioQueryError as e:
+        logger.error(f"Could not resolve catalog parameters: {e}")
+        return 1
+    if params:
+        logger.info("Parameters: " + ", ".join(f"{k}={v}" for k, v in params.items()))
+    queries = [dict(q, sql=render_sql(q["sql"], params)) for q in queries]
+
+    logger.info(f"Benchmarking {len(queries)} queries from {catalog.get('name', args.catalog)} "
+                f"({args.warmup} warmup + {args.repeat} timed runs each)")
+    started_at = datetime.now(timezone.utc)
+    results = [
+        benchmark_query(client, query, args.warmup, args.repeat, not args.no_fetch)
+        for query in queries
+    ]
+
+    report = {
+        "kind": "query",
+        "catalog": catalog.get("name", str(args.catalog)),
+        "started_at": started_at.isoformat(),
+        "dremio_url": client.url,
+        "host": platform.node(),
+        "warmup": args.warmup,
+        "repeat": args.repeat,
+        "fetch": not args.no_fetch,
+        "params": params,
+        "queries": results,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(output + "\n")
+        logger.info(f"✓ Results written to {args.output}")
+    else:
+        print(output)
+
+    failed = [r["name"] for r in results if r["error"]]
+    if failed:
+        logger.error(f"✗ {len(failed)} queries failed: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
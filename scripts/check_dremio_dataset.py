@@ -5,10 +5,16 @@ Check if OCSF dataset exists in Dremio and run test query
 This verifies that the data is accessible before creating reflections.
 """
 
-import json
 import logging
-import requests
-from typing import Dict, List, Optional
+import sys
+from pathlib import Path
+from typing import Dict
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from dremio_client import DremioClient
+from dremio_query import DremioQueryError, run_query
+from settings import get_settings
 
 # Configure logging
 logging.basicConfig(
@@ -17,70 +23,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Dremio Configuration
-DREMIO_URL = "http://localhost:9047"
-DREMIO_USERNAME = "admin"
-DREMIO_PASSWORD = "admin123"
-
-
-class DremioClient:
-    """Simple Dremio client for dataset operations"""
-
-    def __init__(self, url: str, username: str, password: str):
-        self.url = url.rstrip('/')
-        self.session = requests.Session()
-        self.token = None
-        self.login(username, password)
-
-    def login(self, username: str, password: str):
-        """Authenticate with Dremio"""
-        auth_url = f"{self.url}/apiv2/login"
-        response = self.session.post(
-            auth_url,
-            json={"userName": username, "password": password}
-        )
-
-        if response.status_code == 200:
-            self.token = response.json()["token"]
-            self.session.headers.update({
-                "Authorization": f"_dremio{self.token}",
-                "Content-Type": "application/json"
-            })
-            logger.info("✓ Successfully authenticated with Dremio")
-        else:
-            raise Exception(f"Failed to login: {response.text}")
+# Dremio Configuration (see settings.py); password from DREMIO_PASSWORD or a cached token
+DREMIO_URL = get_settings().dremio.url
+DREMIO_USERNAME = get_settings().dremio.username
+DATASET = '.'.join(f'"{part}"' for part in get_settings().dataset_path())
+
+
+class DatasetClient(DremioClient):
+    """Shared Dremio client with a JSON-style query helper"""
 
     def run_query(self, sql: str) -> Dict:
-        """Execute SQL query"""
-        url = f"{self.url}/api/v3/sql"
-        response = self.session.post(url, json={"sql": sql})
-
-        if response.status_code == 200:
-            job_id = response.json()["id"]
-            logger.info(f"Query job submitted: {job_id}")
-
-            # Wait for job to complete
-            job_url = f"{self.url}/api/v3/job/{job_id}"
-            while True:
-                job_response = self.session.get(job_url)
-                if job_response.status_code == 200:
-                    job_data = job_response.json()
-                    state = job_data.get("jobState")
-                    if state in ["COMPLETED", "FAILED", "CANCELLED"]:
-                        if state == "COMPLETED":
-                            # Get results
-                            results_url = f"{self.url}/api/v3/job/{job_id}/results"
-                            results_response = self.session.get(results_url)
-                            if results_response.status_code == 200:
-                                return results_response.json()
-                        else:
-                            logger.error(f"Query failed with state: {state}")
-                            logger.error(f"Error: {job_data.get('errorMessage')}")
-                            return {}
-        else:
-            logger.error(f"Failed to submit query: {response.text}")
+        """Execute SQL query as a Dremio job and return its rows"""
+        try:
+            result = run_query(self, sql)
+        except DremioQueryError as e:
+            logger.error(f"Query failed: {e}")
             return {}
 
+        logger.info(f"Query job {result.job_id} completed in {result.elapsed:.3f} s")
+        return {
+            "rows": result.table.to_pylist(),
+            "schema": [{"name": name} for name in result.table.column_names],
+        }
+
 
 def main():
     """Check dataset and run test queries"""
@@ -92,19 +57,20 @@ def main():
 
     try:
         # Connect to Dremio
-        client = DremioClient(DREMIO_URL, DREMIO_USERNAME, DREMIO_PASSWORD)
+        client = DatasetClient(DREMIO_URL, DREMIO_USERNAME, interactive=True)
+        client.login()
 
         # Test queries
         queries = [
             # 1. Check if dataset exists
             (
                 "Dataset Count",
-                'SELECT COUNT(*) as record_count FROM minio."zeek-data"."network-activity-ocsf" LIMIT 1'
+                f'SELECT COUNT(*) as record_count FROM {DATASET} LIMIT 1'
             ),
             # 2. Check OCSF fields
             (
                 "Sample OCSF Record",
-                '''SELECT
+                f'''SELECT
                     class_uid,
                     class_name,
                     src_endpoint_ip,
@@ -112,16 +78,16 @@ def main():
                     traffic_bytes_in,
                     traffic_bytes_out,
                     activity_name
-                FROM minio."zeek-data"."network-activity-ocsf"
+                FROM {DATASET}
                 LIMIT 5'''
             ),
             # 3. Quick aggregation
             (
                 "Protocol Distribution",
-                '''SELECT
+                f'''SELECT
                     connection_info_protocol_name,
                     COUNT(*) as count
-                FROM minio."zeek-data"."network-activity-ocsf"
+                FROM {DATASET}
                 GROUP BY connection_info_protocol_name
                 ORDER BY count DESC'''
             )
@@ -161,7 +127,7 @@ def main():
                 logger.info("3. Dremio needs restart")
                 logger.info("")
                 logger.info("To fix:")
-                logger.info("1. Open Dremio UI: http://localhost:9047")
+                logger.info(f"1. Open Dremio UI: {DREMIO_URL}")
                 logger.info("2. Navigate to: Sources > minio > zeek-data")
                 logger.info("3. Click on 'network-activity-ocsf' folder")
                 logger.info("4. Click 'Format Folder' and choose 'Parquet'")
@@ -182,5 +148,4 @@ def main():
 
 
 if __name__ == "__main__":
-    import sys
     sys.exit(main())
\ No newline at end of file
@@ -7,11 +7,16 @@ It attempts to access the public API endpoints.
 """
 
 import requests
-import json
 import sys
 import os
+from pathlib import Path
 
-DREMIO_URL = "http://localhost:9047"
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from dremio_client import DremioAuthError, DremioClient
+from settings import get_settings
+
+DREMIO_URL = get_settings().dremio.url
 
 def check_reflections_no_auth():
     """Try to check reflections without authentication"""
@@ -80,7 +85,7 @@ def check_reflections_no_auth():
             return 1
 
     except requests.exceptions.ConnectionError:
-        print("\n✗ Cannot connect to Dremio at http://localhost:9047")
+        print(f"\n✗ Cannot connect to Dremio at {DREMIO_URL}")
         print("\nCheck if Dremio is running:")
         print("  docker ps | grep dremio")
         return 1
@@ -90,46 +95,31 @@ def check_reflections_no_auth():
 
 def check_with_password():
     """Check reflections with authentication"""
-    password = os.getenv("DREMIO_PASSWORD")
+    client = DremioClient(DREMIO_URL, timeout=10)
 
-    if not password:
+    if not os.getenv("DREMIO_PASSWORD") and not client.has_valid_token():
         print("DREMIO_PASSWORD not set")
         return None
 
     print("\nAuthenticating with Dremio...")
 
-    # Login
-    auth_url = f"{DREMIO_URL}/apiv2/login"
     try:
-        response = requests.post(
-            auth_url,
-            json={"userName": "admin", "password": password},
-            timeout=10
-        )
-
-        if response.status_code == 200:
-            token = response.json()["token"]
-            print("✓ Authenticated successfully")
-
-            # Get reflections
-            headers = {
-                "Authorization": f"_dremio{token}",
-                "Content-Type": "application/json"
-            }
+        client.login()
+        print("✓ Authenticated successfully")
 
-            reflection_url = f"{DREMIO_URL}/api/v3/reflection"
-            response = requests.get(reflection_url, headers=headers, timeout=10)
+        # Get reflections
+        response = client.get("/api/v3/reflection")
 
-            if response.status_code == 200:
-                reflections = response.json().get("data", [])
-                return reflections
-            else:
-                print(f"Failed to get reflections: {response.status_code}")
-                return None
+        if response.status_code == 200:
+            reflections = response.json().get("data", [])
+            return reflections
         else:
-            print(f"Authentication failed: {response.text}")
+            print(f"Failed to get reflections: {response.status_code}")
             return None
 
+    except DremioAuthError as e:
+        print(f"Authentication failed: {e}")
+        return None
     except Exception as e:
         print(f"Error: {e}")
         return None
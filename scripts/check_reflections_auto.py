@@ -7,12 +7,17 @@ Usage:
     python3 scripts/check_reflections_auto.py
 """
 
-import requests
 import os
 import sys
+from pathlib import Path
 
-DREMIO_URL = "http://localhost:9047"
-DREMIO_USERNAME = os.getenv("DREMIO_USERNAME", "admin")
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from dremio_client import DremioAuthError, DremioClient
+from settings import get_settings
+
+DREMIO_URL = get_settings().dremio.url
+DREMIO_USERNAME = get_settings().dremio.username
 DREMIO_PASSWORD = os.getenv("DREMIO_PASSWORD", "")
 
 def main():
@@ -21,7 +26,9 @@ def main():
     print("=" * 70)
     print()
 
-    if not DREMIO_PASSWORD:
+    client = DremioClient(DREMIO_URL, DREMIO_USERNAME, DREMIO_PASSWORD or None, timeout=10)
+
+    if not DREMIO_PASSWORD and not client.has_valid_token():
         print("❌ DREMIO_PASSWORD environment variable is required")
         print()
         print("Usage:")
@@ -31,38 +38,24 @@ def main():
 
     # Authenticate
     print("Authenticating with Dremio...")
-    auth_url = f"{DREMIO_URL}/apiv2/login"
 
     try:
-        response = requests.post(
-            auth_url,
-            json={"userName": DREMIO_USERNAME, "password": DREMIO_PASSWORD},
-            timeout=10
-        )
-
-        if response.status_code != 200:
-            print(f"❌ Authentication failed: {response.text}")
-            return 1
-
-        token = response.json()["token"]
+        client.login()
         print("✓ Authenticated successfully")
         print()
 
+    except DremioAuthError as e:
+        print(f"❌ Authentication failed: {e}")
+        return 1
     except Exception as e:
         print(f"❌ Authentication error: {e}")
         return 1
 
     # Get reflections
     print("Fetching reflections...")
-    headers = {
-        "Authorization": f"_dremio{token}",
-        "Content-Type": "application/json"
-    }
-
-    reflection_url = f"{DREMIO_URL}/api/v3/reflection"
 
     try:
-        response = requests.get(reflection_url, headers=headers, timeout=10)
+        response = client.get("/api/v3/reflection")
 
         if response.status_code != 200:
             print(f"❌ Failed to get reflections: {response.status_code}")
@@ -162,7 +155,7 @@ def main():
             print(f"{failed} reflection(s) failed to build.")
             print()
             print("To fix:")
-            print("1. Go to Dremio UI: http://localhost:9047")
+            print(f"1. Go to Dremio UI: {DREMIO_URL}")
             print("2. Navigate to dataset Reflections tab")
             print("3. Disable and re-enable failed reflections")
             print()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Compare Benchmark Results and Flag Regressions
+
+Diffs two result files from the same benchmark:
+
+- Query results (benchmark_queries.py): wall latency per query, lower is better
+- Ingest results (benchmark_enrichment.py --output): records/s per run, higher is better
+- Loader stage metrics (load_real_zeek_to_ocsf.py --metrics-output, JSON):
+  records/s per stage, higher is better; one run is one sample, so pass a
+  directory of summaries from repeated runs
+
+For every benchmark present in both files, the change is the ratio of
+candidate to baseline medians. A bootstrap resamples the repetitions of each
+side to put a 95% confidence interval on that ratio. A benchmark is a
+regression when the interval excludes "no change" and the median is worse by
+more than --threshold percent. Exit status is 1 if any regression is found,
+so data layout changes can be gated on measured impact.
+
+Query scan statistics (rows/bytes scanned, reflection use) are deterministic
+and are shown alongside without statistics.
+
+Requirements:
+    pip install numpy
+
+Usage:
+    python3 scripts/compare_benchmarks.py results/queries-main.json results/queries-branch.json
+    python3 scripts/compare_benchmarks.py base.json cand.json --threshold 5 --report diff.md
+    python3 scripts/compare_benchmarks.py results/ingest-main/ results/ingest-branch/
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Comparison Configuration
+DEFAULT_THRESHOLD = 10.0      # Percent
+BOOTSTRAP_RESAMPLES = 10000
+CONFIDENCE = 0.95
+MIN_SAMPLES = 3               # Fewer repetitions than this are reported but not judged
+
+# Result kind → (list key, sample metric, True if higher is better)
+BENCHMARK_KINDS = {
+    "query": ("queries", "wall_seconds", False),
+    "ingest": ("runs", "records_per_second", True),
+    "ingest_metrics": ("stages", "records_per_second", True),
+}
+
+
+def _load_file(path: Path) -> Dict:
+    results = json.loads(Path(path).read_text())
+    kind = results.get("kind")
+    if kind not in BENCHMARK_KINDS:
+        raise ValueError(f"{path}: unknown benchmark kind {kind!r}")
+    if kind == "ingest_metrics":
+        # One loader run: each stage summary is a single sample of that stage
+        results["stages"] = [{"name": stage["name"], "samples": [stage]}
+                             for stage in results.get("stages", [])]
+    return results
+
+
+def load_results(path: Path) -> Dict:
+    """
+    Load a benchmark result file and check its kind.
+
+    A directory loads every *.json in it (all of one kind) and pools the
+    samples per benchmark name, e.g. --metrics-output files of repeated
+    loader runs.
+    """
+    path = Path(path)
+    if not path.is_dir():
+        return _load_file(path)
+
+    files = sorted(path.glob("*.json"))
+    if not files:
+        raise ValueError(f"{path}: no result files (*.json)")
+    pooled = _load_file(files[0])
+    list_key = BENCHMARK_KINDS[pooled["kind"]][0]
+    entries = {entry["name"]: entry for entry in pooled.get(list_key, [])}
+    for file in files[1:]:
+        results = _load_file(file)
+        if results["kind"] != pooled["kind"]:
+            raise ValueError(f"{file}: {results['kind']} results mixed with {pooled['kind']} results")
+        for entry in results.get(list_key, []):
+            if entry["name"] in entries:
+                entries[entry["name"]]["samples"] = (entries[entry["name"]].get("samples", [])
+                                                     + entry.get("samples", []))
+            else:
+                entries[entry["name"]] = entry
+    pooled[list_key] = list(entries.values())
+    return pooled
+
+
+def extract_samples(results: Dict) -> Dict[str, Dict]:
+    """Benchmark name → {"values": sample array, "entry": raw entry}"""
+    list_key, metric, _ = BENCHMARK_KINDS[results["kind"]]
+    extracted = {}
+    for entry in results.get(list_key, []):
+        values = [s[metric] for s in entry.get("samples", []) if s.get(metric) is not None]
+        extracted[entry["name"]] = {"values": np.asarray(values, dtype=float), "entry": entry}
+    return extracted
+
+
+def bootstrap_ratio_ci(baseline: np.ndarray, candidate: np.ndarray,
+                       resamples: int = BOOTSTRAP_RESAMPLES, confidence: float = CONFIDENCE,
+                       seed: int = 0) -> tuple:
+    """
+    Confidence interval for median(candidate) / median(baseline).
+
+    Both sides are resampled independently with replacement; the interval
+    is the percentile range of the resampled median ratios.
+
+    Returns:
+        (low, high)
+    """
+    rng = np.random.default_rng(seed)
+    base_medians = np.median(rng.choice(baseline, (resamples, len(baseline))), axis=1)
+    cand_medians = np.median(rng.choice(candidate, (resamples, len(candidate))), axis=1)
+    ratios = cand_medians / base_medians
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(ratios, [tail, 100 - tail])
+    return float(low), float(high)
+
+
+def compare(baseline: Dict, candidate: Dict, threshold: float) -> List[Dict]:
+    """
+    Compare every benchmark present in both result sets.
+
+    Args:
+        baseline: Baseline results
+        candidate: Candidate results
+        threshold: Regression threshold in percent
+
+    Returns:
+        One comparison row per benchmark
+    """
+    _, _, higher_is_better = BENCHMARK_KINDS[baseline["kind"]]
+    base_samples = extract_samples(baseline)
+    cand_samples = extract_samples(candidate)
+
+    rows = []
+    for name in list(base_samples) + [n for n in cand_samples if n not in base_samples]:
+        row = {"name": name, "status": "ok", "baseline": None, "candidate": None,
+               "change": None, "ci": None}
+        if name not in cand_samples or name not in base_samples:
+            row["status"] = "removed" if name not in cand_samples else "added"
+            rows.append(row)
+            continue
+
+        base, cand = base_samples[name]["values"], cand_samples[name]["values"]
+        row["scan"] = _scan_change(base_samples[name]["entry"], cand_samples[name]["entry"])
+        if base.size == 0 or cand.size == 0:
+            row["status"] = "failed"
+            rows.append(row)
+            continue
+
+        ratio = float(np.median(cand) / np.median(base))
+        row.update({"baseline": float(np.median(base)), "candidate": float(np.median(cand)),
+                    "change": (ratio - 1) * 100})
+
+        if min(base.size, cand.size) < MIN_SAMPLES:
+            row["status"] = "too few samples"
+            rows.append(row)
+            continue
+
+        low, high = bootstrap_ratio_ci(base, cand)
+        row["ci"] = ((low - 1) * 100, (high - 1) * 100)
+
+        significant = low > 1 or high < 1
+        worse = row["change"] < -threshold if higher_is_better else row["change"] > threshold
+        better = row["change"] > threshold if higher_is_better else row["change"] < -threshold
+        if significant and worse:
+            row["status"] = "REGRESSION"
+        elif significant and better:
+            row["status"] = "improved"
+        elif not significant:
+            row["status"] = "no significant change"
+        rows.append(row)
+    return rows
+
+
+def _scan_change(base_entry: Dict, cand_entry: Dict) -> Optional[str]:
+    """Rows/bytes scanned and reflection use, baseline → candidate"""
+    parts = []
+    for key, label in (("rows_scanned", "rows"), ("bytes_scanned", "bytes")):
+        before, after = base_entry.get(key), cand_entry.get(key)
+        if before and after is not None and before != after:
+            parts.append(f"{label} scanned {(after / before - 1) * 100:+.0f}%")
+    if "reflection_used" in base_entry and "reflection_used" in cand_entry:
+        if base_entry["reflection_used"] != cand_entry["reflection_used"]:
+            parts.append("reflection " + ("gained" if cand_entry["reflection_used"] else "lost"))
+    return ", ".join(parts) or None
+
+
+def format_report(baseline_path: Path, candidate_path: Path, kind: str,
+                  rows: List[Dict], threshold: float) -> str:
+    """Markdown diff report"""
+    _, metric, higher_is_better = BENCHMARK_KINDS[kind]
+    unit = "records/s" if higher_is_better else "ms"
+    scale = 1 if higher_is_better else 1000
+
+    lines = [
+        f"# Benchmark comparison ({kind})",
+        "",
+        f"- Baseline: `{baseline_path}`",
+        f"- Candidate: `{candidate_path}`",
+        f"- Metric: median {metric} ({'higher' if higher_is_better else 'lower'} is better), "
+        f"{CONFIDENCE:.0%} bootstrap CI, regression threshold {threshold:g}%",
+        "",
+        f"| Benchmark | Baseline ({unit}) | Candidate ({unit}) | Change | {CONFIDENCE:.0%} CI | Status | Scan |",
+        "|---|---:|---:|---:|---|---|---|",
+    ]
+    for row in rows:
+        base = f"{row['baseline'] * scale:,.1f}" if row["baseline"] is not None else "–"
+        cand = f"{row['candidate'] * scale:,.1f}" if row["candidate"] is not None else "–"
+        change = f"{row['change']:+.1f}%" if row["change"] is not None else "–"
+        ci = f"[{row['ci'][0]:+.1f}%, {row['ci'][1]:+.1f}%]" if row["ci"] else "–"
+        lines.append(f"| {row['name']} | {base} | {cand} | {change} | {ci} | "
+                     f"{row['status']} | {row.get('scan') or ''} |")
+
+    regressions = [r["name"] for r in rows if r["status"] == "REGRESSION"]
+    lines.append("")
+    lines.append(f"**{len(regressions)} regression(s)**" +
+                 (f": {', '.join(regressions)}" if regressions else ""))
+    return "\n".join(lines)
+
+
+def main():
+    """Main execution flow"""
+    parser = argparse.ArgumentParser(description='Compare two benchmark result files')
+    parser.add_argument('baseline', type=Path, help='Baseline results JSON (or a directory of them)')
+    parser.add_argument('candidate', type=Path, help='Candidate results JSON (or a directory of them)')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Regression threshold in percent (default: {DEFAULT_THRESHOLD:g})')
+    parser.add_argument('--report', type=Path,
+                        help='Also write the Markdown report to this file')
+    args = parser.parse_args()
+
+    try:
+        baseline = load_results(args.baseline)
+        candidate = load_results(args.candidate)
+    except (OSError, ValueError) as e:
+        logger.error(str(e))
+        return 2
+    if baseline["kind"] != candidate["kind"]:
+        logger.error(f"Cannot compare {baseline['kind']} results with {candidate['kind']} results")
+        return 2
+
+    rows = compare(baseline, candidate, args.threshold)
+    report = format_report(args.baseline, args.candidate, baseline["kind"], rows, args.threshold)
+    print(report)
+
+    if args.report:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        args.report.write_text(report + "\n")
+
+    return 1 if any(r["status"] == "REGRESSION" for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
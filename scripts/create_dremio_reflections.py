@@ -4,7 +4,15 @@ Create Dremio Reflections for OCSF Data
 
 This script creates aggregation and raw reflections on the OCSF dataset
 to accelerate query performance. Reflections are Dremio's query acceleration
-technology that pre-computes and caches data structures.
+technology that pre-computes and caches data structures. Definitions and
+the refresh policy come from config/reflections.yaml, applied with
+reconcile_reflections.reconcile(), so existing reflections that match are
+kept rather than rebuilt.
+
+The spec sets the dataset's refresh policy to INCREMENTAL (refresh field
+`time`), so refreshes only materialize data added since the last one.
+Loaders trigger those refreshes right after an upload with
+refresh_after_ingest() (see load_real_zeek_to_ocsf.py --refresh-reflections).
 
 Requirements:
     pip install requests
@@ -13,13 +21,18 @@ Usage:
     python3 scripts/create_dremio_reflections.py
 """
 
-import json
 import logging
-import requests
+import sys
+from pathlib import Path
 from typing import Dict, List, Optional
-import time
 import os
-import getpass
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from dremio_client import DremioAuthError, DremioClient
+from dremio_query import DremioQueryError, run_query
+from reflection_watcher import wait_for_reflections
+from settings import get_settings
 
 # Configure logging
 logging.basicConfig(
@@ -28,41 +41,25 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Dremio Configuration
-DREMIO_URL = "http://localhost:9047"
-DREMIO_USERNAME = os.getenv("DREMIO_USERNAME", "admin")
+# Dremio Configuration (URL, user and dataset path: see settings.py)
 DREMIO_PASSWORD = os.getenv("DREMIO_PASSWORD", "")
 
-# Dataset Configuration
-DATASET_PATH = ["minio", "zeek-data", "network-activity-ocsf"]
+# Dataset refresh policy: incremental on the event time column, with a
+# scheduled refresh as a fallback for data loaded without the ingest hook
+REFRESH_METHOD = "INCREMENTAL"
+REFRESH_FIELD = "time"
+REFRESH_PERIOD_MS = 60 * 60 * 1000       # 1 hour
+GRACE_PERIOD_MS = 3 * 60 * 60 * 1000     # 3 hours
 
 
 class DremioReflectionManager:
     """Manage Dremio reflections via REST API"""
 
-    def __init__(self, url: str, username: str, password: str):
-        self.url = url.rstrip('/')
-        self.session = requests.Session()
-        self.token = None
-        self.login(username, password)
-
-    def login(self, username: str, password: str):
-        """Authenticate with Dremio"""
-        auth_url = f"{self.url}/apiv2/login"
-        response = self.session.post(
-            auth_url,
-            json={"userName": username, "password": password}
-        )
-
-        if response.status_code == 200:
-            self.token = response.json()["token"]
-            self.session.headers.update({
-                "Authorization": f"_dremio{self.token}",
-                "Content-Type": "application/json"
-            })
-            logger.info("✓ Successfully authenticated with Dremio")
-        else:
-            raise Exception(f"Failed to login: {response.text}")
+    def __init__(self, url: Optional[str] = None, username: Optional[str] = None,
+                 password: Optional[str] = None, client: Optional[DremioClient] = None):
+        self.client = client or DremioClient(url, username, password, interactive=True)
+        self.url = (url or self.client.url).rstrip('/')
+        self.client.login()
 
     def get_dataset_id(self, path: List[str]) -> Optional[str]:
         """Get dataset ID from path"""
@@ -81,7 +78,7 @@ class DremioReflectionManager:
             else:
                 url = catalog_url
 
-            response = self.session.get(url)
+            response = self.client.get(url)
             if response.status_code != 200:
                 logger.error(f"Failed to get catalog: {response.text}")
                 return None
@@ -105,119 +102,11 @@ class DremioReflectionManager:
         logger.info(f"✓ Found dataset ID: {parent_id}")
         return parent_id
 
-    def create_raw_reflection(self, dataset_id: str, fields: List[str]) -> Dict:
-        """Create a raw reflection (for SELECT * queries)"""
-
-        reflection_config = {
-            "datasetId": dataset_id,
-            "type": "RAW",
-            "name": "OCSF Raw Reflection",
-            "enabled": True,
-            "partitionDistributionStrategy": "CONSOLIDATED",
-            "displayFields": fields,  # All fields for raw reflection
-            "sortFields": [],  # Can add sort fields if needed
-            "partitionFields": ["event_date"],  # Partition by date
-            "distributionFields": []
-        }
-
-        url = f"{self.url}/api/v3/reflection"
-        response = self.session.post(url, json=reflection_config)
-
-        if response.status_code in [200, 201]:
-            logger.info("✓ Created raw reflection")
-            return response.json()
-        else:
-            logger.error(f"Failed to create raw reflection: {response.text}")
-            return {}
-
-    def create_aggregation_reflection(self, dataset_id: str) -> Dict:
-        """Create aggregation reflections (for GROUP BY queries)"""
-
-        # Reflection 1: Protocol and Activity aggregation
-        reflection1 = {
-            "datasetId": dataset_id,
-            "type": "AGGREGATION",
-            "name": "OCSF Protocol Activity Aggregation",
-            "enabled": True,
-            "partitionDistributionStrategy": "CONSOLIDATED",
-            "dimensionFields": [
-                {"name": "connection_info_protocol_name"},
-                {"name": "activity_name"},
-                {"name": "src_endpoint_ip"},
-                {"name": "dst_endpoint_ip"}
-            ],
-            "measureFields": [
-                {"name": "traffic_bytes_in", "measureTypes": ["SUM", "MIN", "MAX"]},
-                {"name": "traffic_bytes_out", "measureTypes": ["SUM", "MIN", "MAX"]},
-                {"name": "traffic_packets_in", "measureTypes": ["SUM"]},
-                {"name": "traffic_packets_out", "measureTypes": ["SUM"]}
-            ],
-            "partitionFields": ["event_date"],
-            "distributionFields": []
-        }
-
-        # Reflection 2: Time-based aggregation
-        reflection2 = {
-            "datasetId": dataset_id,
-            "type": "AGGREGATION",
-            "name": "OCSF Time-based Aggregation",
-            "enabled": True,
-            "partitionDistributionStrategy": "CONSOLIDATED",
-            "dimensionFields": [
-                {"name": "event_date"},
-                {"name": "class_name"},
-                {"name": "category_name"}
-            ],
-            "measureFields": [
-                {"name": "traffic_bytes", "measureTypes": ["SUM", "MIN", "MAX"]},
-                {"name": "traffic_packets", "measureTypes": ["SUM"]},
-                {"name": "src_endpoint_ip", "measureTypes": ["COUNT_DISTINCT"]},
-                {"name": "dst_endpoint_ip", "measureTypes": ["COUNT_DISTINCT"]}
-            ],
-            "partitionFields": ["event_date"],
-            "distributionFields": []
-        }
-
-        # Reflection 3: Security analysis aggregation
-        reflection3 = {
-            "datasetId": dataset_id,
-            "type": "AGGREGATION",
-            "name": "OCSF Security Analysis Aggregation",
-            "enabled": True,
-            "partitionDistributionStrategy": "CONSOLIDATED",
-            "dimensionFields": [
-                {"name": "src_endpoint_is_local"},
-                {"name": "dst_endpoint_is_local"},
-                {"name": "activity_name"},
-                {"name": "connection_info_protocol_name"}
-            ],
-            "measureFields": [
-                {"name": "traffic_bytes_out", "measureTypes": ["SUM"]},
-                {"name": "traffic_bytes_in", "measureTypes": ["SUM"]},
-                {"name": "connection_info_uid", "measureTypes": ["COUNT_DISTINCT"]}
-            ],
-            "partitionFields": [],
-            "distributionFields": []
-        }
-
-        results = []
-        for i, reflection in enumerate([reflection1, reflection2, reflection3], 1):
-            url = f"{self.url}/api/v3/reflection"
-            response = self.session.post(url, json=reflection)
-
-            if response.status_code in [200, 201]:
-                logger.info(f"✓ Created aggregation reflection {i}")
-                results.append(response.json())
-            else:
-                logger.error(f"Failed to create aggregation reflection {i}: {response.text}")
-
-        return results
-
     def list_reflections(self, dataset_id: str) -> List[Dict]:
         """List all reflections for a dataset"""
 
         url = f"{self.url}/api/v3/reflection"
-        response = self.session.get(url)
+        response = self.client.get(url)
 
         if response.status_code == 200:
             all_reflections = response.json().get("data", [])
@@ -234,7 +123,7 @@ class DremioReflectionManager:
         """Manually trigger reflection refresh"""
 
         url = f"{self.url}/api/v3/reflection/{reflection_id}/refresh"
-        response = self.session.post(url)
+        response = self.client.post(url)
 
         if response.status_code in [200, 202]:
             logger.info(f"✓ Triggered refresh for reflection {reflection_id}")
@@ -243,31 +132,121 @@ class DremioReflectionManager:
             logger.error(f"Failed to refresh reflection: {response.text}")
             return False
 
-    def wait_for_reflections(self, dataset_id: str, timeout: int = 300):
-        """Wait for reflections to be built"""
+    def set_refresh_policy(self, dataset_id: str, method: str = REFRESH_METHOD,
+                           refresh_field: Optional[str] = REFRESH_FIELD,
+                           refresh_period_ms: int = REFRESH_PERIOD_MS,
+                           grace_period_ms: int = GRACE_PERIOD_MS) -> bool:
+        """
+        Configure how Dremio refreshes the reflections of a dataset.
+
+        With INCREMENTAL, a refresh only materializes rows added since the
+        previous one instead of rebuilding every reflection. For
+        file-based sources such as MinIO, Dremio tracks new files itself.
+        Rewriting an existing day's file is therefore not picked up, and
+        reloading a day needs a FULL refresh.
+
+        Args:
+            dataset_id: Dataset whose policy is set
+            method: INCREMENTAL, FULL or AUTO
+            refresh_field: Monotonic column used to find new rows (INCREMENTAL only)
+            refresh_period_ms: Scheduled refresh interval
+            grace_period_ms: How long materializations stay usable without a refresh
+
+        Returns:
+            True if the policy is in place (changed or already set)
+        """
+        url = f"{self.url}/api/v3/catalog/{dataset_id}"
+        response = self.client.get(url)
+        if response.status_code != 200:
+            logger.error(f"Failed to read dataset {dataset_id}: {response.text}")
+            return False
 
-        logger.info("Waiting for reflections to build...")
-        start_time = time.time()
+        dataset = response.json()
+        policy = {
+            "method": method,
+            "refreshPeriodMs": refresh_period_ms,
+            "gracePeriodMs": grace_period_ms,
+            "neverRefresh": False,
+            "neverExpire": False,
+        }
+        if method == "INCREMENTAL" and refresh_field:
+            policy["refreshField"] = refresh_field
 
-        while time.time() - start_time < timeout:
-            reflections = self.list_reflections(dataset_id)
+        current = dataset.get("accelerationRefreshPolicy") or {}
+        if all(current.get(key) == value for key, value in policy.items()):
+            logger.info(f"✓ Refresh policy already {method} for {'.'.join(dataset.get('path', []))}")
+            return True
+
+        dataset["accelerationRefreshPolicy"] = dict(current, **policy)
+        response = self.client.put(url, json=dataset)
+        if response.status_code == 200:
+            field = f" on {policy['refreshField']}" if "refreshField" in policy else ""
+            logger.info(f"✓ Set {method} refresh policy{field} for {'.'.join(dataset.get('path', []))}")
+            return True
+        logger.error(f"Failed to set refresh policy: {response.text}")
+        return False
 
-            all_ready = True
-            for reflection in reflections:
-                status = reflection.get("status", {})
-                if status.get("availability") != "AVAILABLE":
-                    all_ready = False
-                    logger.info(f"  Reflection '{reflection.get('name')}': {status.get('availability', 'UNKNOWN')}")
+    def refresh_dataset(self, path: List[str]) -> bool:
+        """
+        Make Dremio pick up newly uploaded files and refresh dependent reflections.
 
-            if all_ready and reflections:
-                logger.info("✓ All reflections are ready!")
-                return True
+        Args:
+            path: Dataset path, e.g. settings.dataset_path('conn')
 
-            time.sleep(10)  # Check every 10 seconds
+        Returns:
+            True if the refresh was triggered
+        """
+        dataset = self.client.get_catalog_by_path(path)
+        if not dataset or not dataset.get("id"):
+            logger.warning(f"Dataset not found (format the folder in Dremio first): {'.'.join(path)}")
+            return False
 
-        logger.warning(f"Timeout waiting for reflections after {timeout} seconds")
+        # New partitions are invisible to the reflection refresh until the
+        # dataset's file listing is refreshed
+        table = ".".join(f'"{segment}"' for segment in path)
+        try:
+            run_query(self.client, f"ALTER TABLE {table} REFRESH METADATA", fetch=False)
+        except DremioQueryError as e:
+            logger.warning(f"Metadata refresh failed for {'.'.join(path)}: {e}")
+
+        response = self.client.post(f"{self.url}/api/v3/catalog/{dataset['id']}/refresh")
+        if response.status_code in [200, 202, 204]:
+            logger.info(f"✓ Triggered reflection refresh for {'.'.join(path)}")
+            return True
+        logger.error(f"Failed to refresh reflections for {'.'.join(path)}: {response.text}")
         return False
 
+    def wait_for_reflections(self, dataset_id: str, timeout: int = 300) -> bool:
+        """Wait for the dataset's reflections to build (see reflection_watcher.py)"""
+        logger.info("Waiting for reflections to build...")
+        return wait_for_reflections(self.client, [dataset_id], timeout)
+
+
+def refresh_after_ingest(paths: List[List[str]], url: Optional[str] = None,
+                         username: Optional[str] = None) -> int:
+    """
+    Refresh reflections on datasets a loader just wrote to.
+
+    Non-interactive: uses the cached token or DREMIO_PASSWORD. Failures
+    are logged, never raised, because the upload itself has succeeded.
+
+    Args:
+        paths: Dataset paths that received new data
+        url: Dremio URL (default: dremio.url setting)
+        username: Dremio user (default: dremio.username setting)
+
+    Returns:
+        Number of datasets whose refresh could not be triggered
+    """
+    # requests' exceptions are OSErrors
+    try:
+        with DremioClient(url, username, DREMIO_PASSWORD or None) as client:
+            manager = DremioReflectionManager(client=client)
+            return sum(not manager.refresh_dataset(path) for path in paths)
+    except (DremioAuthError, OSError) as e:
+        logger.warning(f"Reflection refresh skipped, Dremio unavailable: {e}")
+        return len(paths)
+
 
 def main():
     """Main execution flow"""
@@ -278,24 +257,20 @@ def main():
     logger.info("")
 
     try:
-        # Get password if not set
-        password = DREMIO_PASSWORD
-        if not password:
-            password = getpass.getpass(f"Enter password for {DREMIO_USERNAME}: ")
-
-        # Connect to Dremio
-        manager = DremioReflectionManager(DREMIO_URL, DREMIO_USERNAME, password)
+        # Connect to Dremio (cached token, else DREMIO_PASSWORD, else prompt)
+        manager = DremioReflectionManager(password=DREMIO_PASSWORD or None)
 
         # Get dataset ID
-        dataset_id = manager.get_dataset_id(DATASET_PATH)
+        dataset_path = get_settings().dataset_path()
+        dataset_id = manager.get_dataset_id(dataset_path)
         if not dataset_id:
-            logger.error(f"Could not find dataset at path: {'/'.join(DATASET_PATH)}")
+            logger.error(f"Could not find dataset at path: {'/'.join(dataset_path)}")
             logger.info("Make sure you have:")
             logger.info("1. Formatted the folder as Parquet in Dremio")
             logger.info("2. The dataset is visible in Dremio UI")
             return 1
 
-        # Check existing reflections
+        # Show what is there before reconciling
         existing = manager.list_reflections(dataset_id)
         if existing:
             logger.info(f"Found {len(existing)} existing reflections:")
@@ -303,44 +278,15 @@ def main():
                 logger.info(f"  - {r.get('name')} ({r.get('type')})")
             logger.info("")
 
-            # Option to delete existing reflections
-            response = input("Delete existing reflections? (y/n): ")
-            if response.lower() == 'y':
-                for r in existing:
-                    url = f"{manager.url}/api/v3/reflection/{r['id']}"
-                    manager.session.delete(url)
-                    logger.info(f"  Deleted: {r.get('name')}")
-                logger.info("")
-
-        # Get dataset schema to know which fields are available
-        catalog_url = f"{manager.url}/api/v3/catalog/{dataset_id}"
-        response = manager.session.get(catalog_url)
-        if response.status_code == 200:
-            dataset_info = response.json()
-            fields = [f["name"] for f in dataset_info.get("fields", [])]
-            logger.info(f"Dataset has {len(fields)} fields")
-
-            # Show key OCSF fields
-            key_fields = [
-                "class_uid", "class_name", "activity_name",
-                "src_endpoint_ip", "dst_endpoint_ip",
-                "traffic_bytes_in", "traffic_bytes_out",
-                "connection_info_protocol_name"
-            ]
-            logger.info("Key OCSF fields available:")
-            for field in key_fields:
-                if field in fields:
-                    logger.info(f"  ✓ {field}")
-            logger.info("")
-
-        # Create reflections
-        logger.info("Creating reflections...")
-
-        # Create raw reflection
-        raw_result = manager.create_raw_reflection(dataset_id, fields[:50])  # Limit to 50 fields
-
-        # Create aggregation reflections
-        agg_results = manager.create_aggregation_reflection(dataset_id)
+        # Apply config/reflections.yaml (the only source of reflection
+        # definitions): matching reflections are kept, changed ones updated
+        # in place, and the spec's refresh policy is set
+        from reconcile_reflections import reconcile  # imports this module
+        logger.info("Reconciling reflections with config/reflections.yaml...")
+        failures = reconcile(manager.client)
+        if failures:
+            logger.error(f"{failures} reflection changes failed")
+            return 1
 
         # Wait for reflections to build
         manager.wait_for_reflections(dataset_id, timeout=300)
@@ -348,7 +294,7 @@ def main():
         # Show final status
         logger.info("")
         logger.info("=" * 70)
-        logger.info("✓ Reflection creation complete!")
+        logger.info("✓ Reflections match config/reflections.yaml")
         logger.info("=" * 70)
         logger.info("")
 
@@ -366,7 +312,7 @@ def main():
         logger.info("")
 
         logger.info("View reflection status at:")
-        logger.info(f"  {DREMIO_URL}/reflections")
+        logger.info(f"  {manager.url}/reflections")
 
         return 0
 
@@ -376,5 +322,4 @@ def main():
 
 
 if __name__ == "__main__":
-    import sys
     sys.exit(main())
\ No newline at end of file
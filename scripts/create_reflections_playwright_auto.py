@@ -19,8 +19,15 @@ import asyncio
 import logging
 import sys
 import os
+from pathlib import Path
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
 
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from dremio_client import DremioClient
+from reflection_watcher import watch_dataset_paths
+from settings import get_settings
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -28,10 +35,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Configuration
-DREMIO_URL = "http://localhost:9047"
-DREMIO_USERNAME = os.getenv("DREMIO_USERNAME", "admin")
+# Configuration (Dremio endpoint, user and dataset: see settings.py)
+DREMIO_URL = get_settings().dremio.url
+DREMIO_USERNAME = get_settings().dremio.username
 DREMIO_PASSWORD = os.getenv("DREMIO_PASSWORD", "")
+DATASET_PATH = get_settings().dataset_path()
+BUILD_TIMEOUT = 300  # seconds to keep the browser open while the reflection builds
 
 
 async def login_to_dremio(page, username: str, password: str):
@@ -351,14 +360,15 @@ async def main():
             logger.info("The reflection is now building in the background.")
             logger.info("This typically takes 2-5 minutes for 1M records.")
             logger.info("")
-            logger.info("Browser will stay open for 60 seconds so you can:")
+            logger.info("Browser stays open until the build finishes so you can:")
             logger.info("1. See the reflection in the Reflections tab")
             logger.info("2. Create additional reflections manually if desired")
             logger.info("3. Monitor build progress")
             logger.info("")
 
-            # Keep browser open
-            await asyncio.sleep(60)
+            # Keep browser open while the build runs, not for a fixed time
+            with DremioClient(DREMIO_URL, DREMIO_USERNAME, DREMIO_PASSWORD) as client:
+                await watch_dataset_paths(client, [DATASET_PATH], timeout=BUILD_TIMEOUT)
 
         except Exception as e:
             logger.error(f"Unexpected error: {e}", exc_info=True)
@@ -371,9 +381,9 @@ async def main():
     logger.info("✓ Browser closed")
     logger.info("")
     logger.info("Next steps:")
-    logger.info("1. Wait 2-5 minutes for reflection to build")
-    logger.info("2. Check status in Dremio UI: http://localhost:9047")
-    logger.info("3. Test query performance!")
+    logger.info("1. Check status in Dremio UI: http://localhost:9047")
+    logger.info("   (or: python3 scripts/reflection_watcher.py)")
+    logger.info("2. Test query performance!")
     logger.info("")
 
     return 0
@@ -1,29 +1,33 @@
 #!/usr/bin/env python3
 """
 Create sample Parquet files in MinIO for Dremio testing
+
+The rows are seeded, so every run uploads the same data for a given date.
+For realistic Zeek/OCSF data at benchmark scale use generate_zeek_data.py.
+MinIO endpoint, credentials and bucket come from settings.py.
 """
 import pandas as pd
 import pyarrow as pa
 import pyarrow.parquet as pq
 from datetime import datetime, timedelta
-import random
+from random import Random
 import tempfile
-import boto3
+import sys
 from pathlib import Path
 
-# MinIO configuration
-s3_client = boto3.client(
-    's3',
-    endpoint_url='http://localhost:9000',
-    aws_access_key_id='minioadmin',
-    aws_secret_access_key='minioadmin'
-)
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from settings import get_settings, s3_client
+
+SEED = 42
 
 # Create sample network activity data
-def create_sample_data(num_records=1000):
-    """Generate sample network activity data"""
-    base_time = datetime.now() - timedelta(days=1)
-    
+def create_sample_data(num_records=1000, seed=SEED, base_time=None):
+    """Generate sample network activity data (same seed and base_time, same rows)"""
+    if base_time is None:
+        base_time = datetime.now() - timedelta(days=1)
+    random = Random(seed)
+
     data = {
         'timestamp': [base_time + timedelta(seconds=i*10) for i in range(num_records)],
         'src_ip': [f'192.168.{random.randint(1,255)}.{random.randint(1,255)}' for _ in range(num_records)],
@@ -51,14 +55,14 @@ def upload_to_minio(df, bucket, key):
         pq.write_table(table, tmp_path, compression='snappy')
         
         # Upload to MinIO
-        s3_client.upload_file(tmp_path, bucket, key)
+        s3_client().upload_file(tmp_path, bucket, key)
         print(f"✓ Uploaded {key} to {bucket} ({len(df):,} records)")
         
     finally:
         Path(tmp_path).unlink(missing_ok=True)
 
 def main():
-    bucket = 'zeek-data'
+    bucket = get_settings().minio.bucket
     
     print("Creating sample network activity data...")
     
@@ -67,7 +71,8 @@ def main():
         date = datetime.now() - timedelta(days=day)
         date_str = date.strftime('%Y-%m-%d')
         
-        df = create_sample_data(1000)
+        day_start = datetime(date.year, date.month, date.day)
+        df = create_sample_data(1000, seed=SEED + day, base_time=day_start)
         df['event_date'] = date_str
         
         key = f'network-activity/year={date.year}/month={date.month:02d}/day={date.day:02d}/data.parquet'
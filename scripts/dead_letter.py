@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Dead-Letter Sink for Records the Ingest Cannot Use
+
+Malformed lines and records a mapper cannot turn into OCSF are routed here
+instead of being logged one warning at a time and dropped:
+
+- Every failure is counted per (log type, error code)
+- The first failure of each cause is logged with its message; after that
+  at most one progress line per LOG_INTERVAL seconds, and a summary at the
+  end, so the hot path never formats exception messages per record
+- With a path configured, the failed records (raw line or record JSON,
+  error code and message) are written as NDJSON or Parquet for replay
+
+Requirements:
+    pip install pandas pyarrow
+
+Usage:
+    from dead_letter import DeadLetterSink
+    sink = DeadLetterSink('results/dead-letter.ndjson')
+    df = transform_zeek_log_to_ocsf_flat(records, 'conn', dead_letter=sink)
+    sink.close()
+
+    python3 scripts/load_real_zeek_to_ocsf.py --all --dead-letter results/dead-letter.parquet
+    python3 scripts/dead_letter.py results/dead-letter.parquet  # counts per cause
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Error codes
+JSON_DECODE = "json_decode"                    # line is not valid JSON
+NOT_AN_OBJECT = "not_an_object"                # valid JSON, but not a record
+UNSUPPORTED_LOG_TYPE = "unsupported_log_type"  # no OCSF mapper for `_path`
+MISSING_FIELD = "missing_field"                # KeyError / AttributeError in a mapper
+BAD_VALUE = "bad_value"                        # ValueError / TypeError converting a field
+MAPPER_ERROR = "mapper_error"                  # anything else raised by a mapper
+
+# Exception type → error code (first match along the MRO wins)
+ERROR_CODES = {
+    json.JSONDecodeError: JSON_DECODE,
+    KeyError: MISSING_FIELD,
+    AttributeError: MISSING_FIELD,
+    ValueError: BAD_VALUE,
+    TypeError: BAD_VALUE,
+    OverflowError: BAD_VALUE,
+}
+
+LOG_INTERVAL = 10.0          # seconds between progress lines while errors keep coming
+MAX_RETAINED = 1_000_000     # dead letters kept in memory; later ones are only counted
+
+
+def error_code(error: BaseException) -> str:
+    """Error code for an exception raised while reading or mapping a record"""
+    for cls in type(error).__mro__:
+        if cls in ERROR_CODES:
+            return ERROR_CODES[cls]
+    return MAPPER_ERROR
+
+
+class DeadLetterSink:
+    """Count, rate-limit logging of, and optionally keep failed records"""
+
+    def __init__(self, path: Optional[Path] = None, log_interval: float = LOG_INTERVAL,
+                 max_retained: int = MAX_RETAINED, quiet: bool = False):
+        self.path = Path(path) if path else None
+        self.log_interval = log_interval
+        self.max_retained = max_retained
+        self.quiet = quiet  # count only, e.g. in worker processes merged later
+        self.counts: Counter = Counter()
+        # First failure per cause: (exception, source, line)
+        self.first_errors: Dict[Tuple[str, str], Tuple] = {}
+        # (log_type, code, source, line, raw record or line, exception); formatted on write
+        self._entries: List[Tuple] = []
+        self._dropped = 0
+        self._next_log = 0.0
+        self._since_log = 0
+
+    def __len__(self) -> int:
+        return sum(self.counts.values())
+
+    def add(self, log_type: str, code: str, record=None, error: Optional[BaseException] = None,
+            source: Optional[str] = None, line: Optional[int] = None) -> None:
+        """
+        Record one failed record.
+
+        Args:
+            log_type: Zeek log type (or "unknown" before it is known)
+            code: Error code (see error_code())
+            record: Raw line (str) or parsed record (dict)
+            error: Exception raised for it, if any
+            source: Input file name
+            line: 1-based line number in the source
+        """
+        key = (log_type, code)
+        if key not in self.counts:
+            self.first_errors[key] = (error, source, line)
+            self._log_first(key)
+        self.counts[key] += 1
+
+        if self.path is not None:
+            if len(self._entries) < self.max_retained:
+                self._entries.append((log_type, code, source, line, record, error))
+            else:
+                self._dropped += 1
+        self._log_progress(1)
+
+    def merge(self, other: 'DeadLetterSink') -> None:
+        """Add the counts and retained records of another sink (e.g. from a worker)"""
+        for key, count in other.counts.items():
+            if key not in self.counts:
+                self.first_errors[key] = other.first_errors.get(key, (None, None, None))
+                self._log_first(key)
+            self.counts[key] += count
+        if self.path is not None:
+            room = max(self.max_retained - len(self._entries), 0)
+            self._entries.extend(other._entries[:room])
+            self._dropped += other._dropped + max(len(other._entries) - room, 0)
+        self._log_progress(len(other))
+
+    def _log_first(self, key: Tuple[str, str]) -> None:
+        if self.quiet:
+            return
+        error, source, line = self.first_errors[key]
+        where = f" ({source}:{line})" if source and line else ""
+        detail = f": {error!r}" if error is not None else ""
+        logger.warning(f"Dead letter [{key[0]}/{key[1]}]{where}{detail}; "
+                       f"further ones are counted, not logged")
+        self._since_log = 0
+        self._next_log = time.monotonic() + self.log_interval
+
+    def _log_progress(self, added: int) -> None:
+        self._since_log += added
+        if self.quiet or not self._since_log or time.monotonic() < self._next_log:
+            return
+        logger.warning(f"  {self._since_log:,} more dead letters "
+                       f"({len(self):,} total, see summary at the end)")
+        self._since_log = 0
+        self._next_log = time.monotonic() + self.log_interval
+
+    def add_error(self, log_type: str, error: BaseException, record=None,
+                  source: Optional[str] = None, line: Optional[int] = None) -> None:
+        """add() with the error code derived from the exception"""
+        self.add(log_type, error_code(error), record, error, source, line)
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """Counts per log type and error code"""
+        result: Dict[str, Dict[str, int]] = {}
+        for (log_type, code), count in sorted(self.counts.items()):
+            result.setdefault(log_type, {})[code] = count
+        return result
+
+    def to_frame(self) -> pd.DataFrame:
+        """Retained dead letters, one row each (raw records as JSON strings)"""
+        rows = []
+        for log_type, code, source, line, record, error in self._entries:
+            if isinstance(record, str):
+                raw = record.rstrip('\n')
+            else:
+                try:
+                    raw = json.dumps(record, default=str)
+                except (TypeError, ValueError):
+                    raw = repr(record)
+            rows.append({
+                'log_type': log_type,
+                'error_code': code,
+                'error_type': type(error).__name__ if error is not None else None,
+                'error': str(error) if error is not None else None,
+                'source': source,
+                'line': line,
+                'raw': raw,
+            })
+        return pd.DataFrame(rows, columns=['log_type', 'error_code', 'error_type', 'error',
+                                           'source', 'line', 'raw']).astype({'line': 'Int64'})
+
+    def write(self, path: Optional[Path] = None) -> Optional[Path]:
+        """
+        Write retained dead letters: Parquet for .parquet, NDJSON otherwise.
+
+        Returns:
+            The path written, or None when there is nothing to write
+        """
+        path = Path(path) if path else self.path
+        if path is None or not self._entries:
+            return None
+        path.parent.mkdir(parents=True, exist_ok=True)
+        df = self.to_frame()
+        if path.suffix == '.parquet':
+            df.to_parquet(path, index=False, compression='zstd')
+        else:
+            df.to_json(path, orient='records', lines=True)
+        logger.info(f"✓ Wrote {len(df):,} dead letters to {path}")
+        if self._dropped:
+            logger.warning(f"  {self._dropped:,} more were counted but not kept (max_retained)")
+        return path
+
+    def log_summary(self) -> None:
+        """Counts per cause, one line each"""
+        if not self.counts:
+            return
+        logger.warning(f"Dead letters: {len(self):,} records not loaded")
+        for (log_type, code), count in sorted(self.counts.items()):
+            logger.warning(f"  {log_type:<8} {code:<22} {count:>10,}")
+
+    def close(self) -> None:
+        """Log the summary and write retained dead letters"""
+        self.log_summary()
+        self.write()
+
+
+def main():
+    """Summarize a dead-letter file"""
+    parser = argparse.ArgumentParser(description='Summarize a dead-letter file')
+    parser.add_argument('path', type=Path, help='Dead-letter .ndjson or .parquet file')
+    parser.add_argument('--show', type=int, default=0, help='Also print the first N entries')
+    args = parser.parse_args()
+
+    if not args.path.exists():
+        logger.error(f"File not found: {args.path}")
+        return 1
+
+    df = (pd.read_parquet(args.path) if args.path.suffix == '.parquet'
+          else pd.read_json(args.path, lines=True, dtype={'line': 'Int64', 'raw': str}))
+    logger.info(f"{len(df):,} dead letters in {args.path}")
+    for (log_type, code), count in df.groupby(['log_type', 'error_code']).size().items():
+        logger.info(f"  {log_type:<8} {code:<22} {count:>10,}")
+    for row in df.head(args.show).itertuples():
+        error = row.error if isinstance(row.error, str) else ''
+        logger.info(f"  {row.source}:{row.line} [{row.error_code}] {error} :: {row.raw[:200]}")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    sys.exit(main())
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Shared Dremio REST Client
+
+One authenticated, pooled HTTP session for every Dremio script:
+
+- requests.Session with a sized connection pool (TCP/TLS reuse)
+- Retry with exponential backoff on connection errors and 502/503/504
+- Auth token cached on disk between runs and refreshed shortly before
+  it expires, so scripted checks do not log in on every invocation
+- Transparent re-login when a cached token is rejected (401)
+
+URL, user and token cache default to the dremio section of settings.py
+(config/settings.yaml, ZEEK_DEMO_DREMIO_* or DREMIO_USERNAME).
+
+Requirements:
+    pip install requests
+
+Usage:
+    from dremio_client import DremioClient
+    client = DremioClient(password=os.getenv("DREMIO_PASSWORD"))
+    response = client.get("/api/v3/reflection")
+"""
+
+import getpass
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Token cache shared by all scripts (one entry per URL and user); the
+# default marker stands for the dremio.token_cache setting
+CONFIGURED_CACHE = object()
+TOKEN_REFRESH_MARGIN = 300  # Re-login this many seconds before expiry
+
+# HTTP Configuration
+POOL_SIZE = 10
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+DEFAULT_TIMEOUT = 30
+
+
+class DremioAuthError(Exception):
+    """Authentication with Dremio failed"""
+
+
+class DremioClient:
+    """Pooled, token-caching Dremio REST client"""
+
+    def __init__(self, url: Optional[str] = None, username: Optional[str] = None,
+                 password: Optional[str] = None, interactive: bool = False,
+                 token_cache: Optional[Path] = CONFIGURED_CACHE,
+                 pool_size: int = POOL_SIZE, max_retries: int = MAX_RETRIES,
+                 timeout: float = DEFAULT_TIMEOUT):
+        """
+        Args:
+            url: Dremio base URL (default: dremio.url setting)
+            username: Dremio user (default: dremio.username setting)
+            password: Password; falls back to DREMIO_PASSWORD when needed
+            interactive: Prompt for the password if none is available
+            token_cache: JSON file for cached tokens (default: dremio.token_cache
+                setting, None disables caching)
+            pool_size: Connections kept per host
+            max_retries: Retries for connection errors and 502/503/504
+            timeout: Default request timeout in seconds
+        """
+        dremio = get_settings().dremio
+        if token_cache is CONFIGURED_CACHE:
+            token_cache = dremio.token_cache
+        self.url = (url or dremio.url).rstrip('/')
+        self.username = username or dremio.username
+        self.password = password
+        self.interactive = interactive
+        self.token_cache = Path(token_cache) if token_cache else None
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.token: Optional[str] = None
+        self.expires_at = 0.0
+
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=BACKOFF_FACTOR,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,  # idempotent methods only
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+
+    # ------------------------------------------------------------------
+    # Authentication
+    # ------------------------------------------------------------------
+
+    @property
+    def _cache_key(self) -> str:
+        return f"{self.url}|{self.username}"
+
+    def _read_token_cache(self) -> Dict:
+        if not self.token_cache or not self.token_cache.exists():
+            return {}
+        try:
+            return json.loads(self.token_cache.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _write_token_cache(self) -> None:
+        if not self.token_cache:
+            return
+        cache = self._read_token_cache()
+        cache[self._cache_key] = {"token": self.token, "expires_at": self.expires_at}
+        self.token_cache.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        tmp_path = self.token_cache.with_suffix('.tmp')
+        # Created owner-only, so the token is never readable by others; a
+        # leftover temp file is removed first (O_CREAT keeps an existing mode)
+        tmp_path.unlink(missing_ok=True)
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            f.write(json.dumps(cache))
+        tmp_path.replace(self.token_cache)
+
+    def _token_valid(self) -> bool:
+        return bool(self.token) and time.time() < self.expires_at - TOKEN_REFRESH_MARGIN
+
+    def _set_token(self, token: str, expires_at: float) -> None:
+        self.token = token
+        self.expires_at = expires_at
+        self.session.headers["Authorization"] = f"_dremio{token}"
+
+    def has_valid_token(self) -> bool:
+        """True if a non-expired token is loaded or cached on disk"""
+        if self._token_valid():
+            return True
+        cached = self._read_token_cache().get(self._cache_key)
+        if cached:
+            self._set_token(cached["token"], cached["expires_at"])
+        return self._token_valid()
+
+    def resolve_password(self) -> str:
+        """Password from the constructor, DREMIO_PASSWORD, or an interactive prompt"""
+        password = self.password or os.getenv("DREMIO_PASSWORD")
+        if not password and self.interactive:
+            password = getpass.getpass(f"Enter Dremio password for {self.username}: ")
+        if not password:
+            raise DremioAuthError("No Dremio password available (set DREMIO_PASSWORD)")
+        self.password = password
+        return password
+
+    def login(self, force: bool = False) -> str:
+        """
+        Authenticate, reusing a cached token unless it is close to expiry.
+
+        Args:
+            force: Ignore cached tokens and log in again
+
+        Returns:
+            The session token
+        """
+        if not force and self.has_valid_token():
+            return self.token
+
+        password = self.resolve_password()
+
+        logger.info(f"Authenticating with Dremio as {self.username}...")
+        response = self.session.post(
+            f"{self.url}/apiv2/login",
+            json={"userName": self.username, "password": password},
+            timeout=self.timeout
+        )
+        if response.status_code != 200:
+            raise DremioAuthError(f"Failed to login: {response.text}")
+
+        result = response.json()
+        # Dremio reports expiry in epoch milliseconds; default session is 30 hours
+        expires_at = result.get("expires", (time.time() + 30 * 3600) * 1000) / 1000
+        self._set_token(result["token"], expires_at)
+        self._write_token_cache()
+        logger.info("✓ Successfully authenticated with Dremio")
+        return self.token
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    def _full_url(self, path_or_url: str) -> str:
+        if path_or_url.startswith(('http://', 'https://')):
+            return path_or_url
+        return f"{self.url}/{path_or_url.lstrip('/')}"
+
+    def request(self, method: str, path_or_url: str, **kwargs) -> requests.Response:
+        """
+        Send an authenticated request.
+
+        A 401 on a cached token triggers one forced re-login and retry.
+        """
+        self.login()
+        kwargs.setdefault('timeout', self.timeout)
+        url = self._full_url(path_or_url)
+
+        response = self.session.request(method, url, **kwargs)
+        if response.status_code == 401:
+            logger.info("Token rejected, re-authenticating...")
+            self.login(force=True)
+            response = self.session.request(method, url, **kwargs)
+        return response
+
+    def get(self, path_or_url: str, **kwargs) -> requests.Response:
+        return self.request('GET', path_or_url, **kwargs)
+
+    def post(self, path_or_url: str, **kwargs) -> requests.Response:
+        return self.request('POST', path_or_url, **kwargs)
+
+    def put(self, path_or_url: str, **kwargs) -> requests.Response:
+        return self.request('PUT', path_or_url, **kwargs)
+
+    def delete(self, path_or_url: str, **kwargs) -> requests.Response:
+        return self.request('DELETE', path_or_url, **kwargs)
+
+    def get_catalog_by_path(self, path: List[str]) -> Optional[Dict]:
+        """Catalog entity for a dataset/folder path, or None if not found"""
+        response = self.get(f"/api/v3/catalog/by-path/{'/'.join(path)}")
+        if response.status_code == 200:
+            return response.json()
+        return None
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> 'DremioClient':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
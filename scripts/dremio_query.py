@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Asynchronous Dremio Query Runner
+
+POST /api/v3/sql only submits a job and returns its id. This runner drives
+the full job lifecycle and returns results as Arrow tables:
+
+1. Submit SQL → job id
+2. Poll /api/v3/job/{id} with adaptive backoff (fast first polls for
+   sub-second queries, growing interval for long ones)
+3. Page /api/v3/job/{id}/results?offset=&limit= (max 500 rows per page),
+   fetching pages concurrently once the row count is known
+4. Run N queries concurrently with asyncio over the shared pooled client
+
+For large extracts, FlightQueryRunner is an optional drop-in that streams
+Arrow record batches from Dremio's Arrow Flight endpoint (port 32010)
+instead of paging JSON rows.
+
+Requirements:
+    pip install requests pyarrow   # pyarrow wheels include pyarrow.flight
+
+Usage:
+    python3 scripts/dremio_query.py 'SELECT COUNT(*) FROM minio."zeek-data"."network-activity-ocsf"'
+    python3 scripts/dremio_query.py "SELECT 1" "SELECT 2" --concurrency 2
+    python3 scripts/dremio_query.py 'SELECT * FROM minio."zeek-data"."network-activity-ocsf"' --flight
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+import pyarrow as pa
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from dremio_client import DremioClient
+from settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Runner Configuration
+PAGE_SIZE = 500            # Dremio's maximum rows per results page
+MAX_CONCURRENCY = 4        # Queries in flight at once
+POLL_INITIAL = 0.05        # First job poll after 50 ms
+POLL_MAX = 2.0             # Poll interval ceiling in seconds
+POLL_GROWTH = 1.5
+QUERY_TIMEOUT = 300
+
+TERMINAL_STATES = {"COMPLETED", "FAILED", "CANCELED", "CANCELLED"}
+
+# Dremio SQL type name → Arrow type (anything else is inferred)
+DREMIO_ARROW_TYPES = {
+    "BOOLEAN": pa.bool_(),
+    "INTEGER": pa.int32(),
+    "BIGINT": pa.int64(),
+    "FLOAT": pa.float32(),
+    "DOUBLE": pa.float64(),
+    "DECIMAL": pa.float64(),
+    "VARCHAR": pa.string(),
+    "DATE": pa.date32(),
+    "TIMESTAMP": pa.timestamp('ms'),
+}
+
+
+class DremioQueryError(Exception):
+    """A Dremio job failed, was cancelled or timed out"""
+
+
+@dataclass
+class QueryResult:
+    """Outcome of one query job"""
+    sql: str
+    job_id: str
+    table: pa.Table
+    row_count: int
+    elapsed: float                       # Submit → last page fetched, seconds
+    job: Dict = field(default_factory=dict)  # Final /api/v3/job/{id} payload
+
+
+def _to_arrow(schema: List[Dict], rows: List[Dict]) -> pa.Table:
+    """Build an Arrow table from Dremio's JSON results"""
+    arrays, names = [], []
+    for column in schema:
+        name = column["name"]
+        values = [row.get(name) for row in rows]
+        arrow_type = DREMIO_ARROW_TYPES.get(column.get("type", {}).get("name"))
+
+        if arrow_type is None:
+            array = pa.array(values)
+        elif pa.types.is_timestamp(arrow_type) or pa.types.is_date(arrow_type):
+            # Temporal values arrive as strings ("2023-11-13 12:00:00.000")
+            array = pa.array(values, pa.string()).cast(
+                pa.timestamp('ms') if pa.types.is_timestamp(arrow_type) else arrow_type
+            )
+        else:
+            array = pa.array(values, arrow_type)
+
+        arrays.append(array)
+        names.append(name)
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+async def _run_bounded(runner, sqls: List[str], max_concurrency: int,
+                       **kwargs) -> List[QueryResult]:
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def bounded(sql: str) -> QueryResult:
+        async with semaphore:
+            return await runner.run(sql, **kwargs)
+
+    return await asyncio.gather(*(bounded(sql) for sql in sqls))
+
+
+class AsyncQueryRunner:
+    """Submit, poll and page Dremio query jobs concurrently"""
+
+    def __init__(self, client: DremioClient, max_concurrency: int = MAX_CONCURRENCY,
+                 page_size: int = PAGE_SIZE, timeout: float = QUERY_TIMEOUT):
+        """
+        Args:
+            client: Authenticated (or authenticating) shared Dremio client
+            max_concurrency: Queries executed at the same time
+            page_size: Rows per results page (Dremio caps this at 500)
+            timeout: Seconds to wait for a job to reach a terminal state
+        """
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.page_size = min(page_size, PAGE_SIZE)
+        self.timeout = timeout
+
+    async def _call(self, method: str, path: str, **kwargs) -> Dict:
+        # The shared client is blocking; run it off the event loop
+        response = await asyncio.to_thread(self.client.request, method, path, **kwargs)
+        if response.status_code != 200:
+            raise DremioQueryError(f"{method} {path} failed ({response.status_code}): {response.text[:200]}")
+        return response.json()
+
+    async def submit(self, sql: str) -> str:
+        """Submit SQL and return the job id"""
+        return (await self._call('POST', '/api/v3/sql', json={"sql": sql}))["id"]
+
+    async def wait(self, job_id: str) -> Dict:
+        """Poll a job until it completes, backing off while it runs"""
+        deadline = time.monotonic() + self.timeout
+        interval = POLL_INITIAL
+
+        while True:
+            job = await self._call('GET', f'/api/v3/job/{job_id}')
+            state = job.get("jobState")
+            if state == "COMPLETED":
+                return job
+            if state in TERMINAL_STATES:
+                raise DremioQueryError(f"Job {job_id} {state}: {job.get('errorMessage', '')}")
+            if time.monotonic() >= deadline:
+                await self.cancel(job_id)
+                raise DremioQueryError(f"Job {job_id} still {state} after {self.timeout}s (canceled)")
+
+            await asyncio.sleep(interval)
+            interval = min(interval * POLL_GROWTH, POLL_MAX)
+
+    async def cancel(self, job_id: str) -> None:
+        """Ask Dremio to cancel a job (best effort: it may finish first)"""
+        try:
+            await self._call('POST', f'/api/v3/job/{job_id}/cancel')
+        except DremioQueryError as e:
+            logger.warning(f"Could not cancel job {job_id}: {e}")
+
+    async def fetch_results(self, job_id: str, row_count: int,
+                            max_rows: Optional[int] = None) -> pa.Table:
+        """
+        Page through a completed job's results.
+
+        Pages are fetched concurrently, at most pool_size / max_concurrency
+        at a time per query so concurrent queries do not overflow the
+        client's connection pool.
+
+        Args:
+            job_id: Completed job id
+            row_count: Row count reported by the job
+            max_rows: Stop after this many rows (None fetches everything)
+
+        Returns:
+            Results as an Arrow table
+        """
+        total = row_count if max_rows is None else min(row_count, max_rows)
+        offsets = range(0, max(total, 1), self.page_size)
+
+        # Share the client's connection pool with the other queries in flight
+        slots = asyncio.Semaphore(max(1, self.client.pool_size // self.max_concurrency))
+
+        async def page(offset: int) -> Dict:
+            async with slots:
+                return await self._call('GET', f'/api/v3/job/{job_id}/results',
+                                        params={"offset": offset,
+                                                "limit": min(self.page_size, total - offset) or 1})
+
+        pages = await asyncio.gather(*(page(offset) for offset in offsets))
+
+        schema = pages[0].get("schema", [])
+        rows = [row for page in pages for row in page.get("rows", [])][:total]
+        return _to_arrow(schema, rows)
+
+    async def run(self, sql: str, fetch: bool = True,
+                  max_rows: Optional[int] = None) -> QueryResult:
+        """
+        Run one query end to end.
+
+        Args:
+            sql: SQL text
+            fetch: Download result rows (False only waits for completion)
+            max_rows: Cap on downloaded rows
+
+        Returns:
+            QueryResult with an Arrow table
+        """
+        start = time.perf_counter()
+        job_id = await self.submit(sql)
+        job = await self.wait(job_id)
+        row_count = int(job.get("rowCount", 0))
+
+        if fetch:
+            table = await self.fetch_results(job_id, row_count, max_rows)
+        else:
+            table = pa.table({})
+
+        return QueryResult(sql, job_id, table, row_count, time.perf_counter() - start, job)
+
+    async def run_many(self, sqls: List[str], **kwargs) -> List[QueryResult]:
+        """Run queries concurrently (at most max_concurrency at once), in input order"""
+        return await _run_bounded(self, sqls, self.max_concurrency, **kwargs)
+
+
+class FlightQueryRunner:
+    """
+    Run queries over Arrow Flight, streaming record batches.
+
+    Same run/run_many interface as AsyncQueryRunner. Credentials come from
+    the shared client (basic auth exchanged for a bearer token on connect).
+    """
+
+    def __init__(self, client: DremioClient, host: Optional[str] = None,
+                 port: Optional[int] = None, tls: bool = False,
+                 max_concurrency: int = MAX_CONCURRENCY):
+        """
+        Args:
+            client: Shared Dremio client supplying the credentials
+            host: Flight host (default: the REST URL's host)
+            port: Flight port (default: dremio.flight_port setting)
+            tls: Use grpc+tls instead of grpc+tcp
+            max_concurrency: Queries executed at the same time
+        """
+        self.client = client
+        self.host = host or urlparse(client.url).hostname
+        self.port = port or get_settings().dremio.flight_port
+        self.tls = tls
+        self.max_concurrency = max_concurrency
+        self._flight_client = None
+        self._options = None
+
+    def _connect(self):
+        if self._flight_client is None:
+            try:
+                from pyarrow import flight
+            except ImportError as e:
+                raise ImportError("Arrow Flight requires a pyarrow build with flight support") from e
+
+            scheme = 'grpc+tls' if self.tls else 'grpc+tcp'
+            flight_client = flight.FlightClient(f"{scheme}://{self.host}:{self.port}")
+            token_header = flight_client.authenticate_basic_token(
+                self.client.username, self.client.resolve_password()
+            )
+            self._options = flight.FlightCallOptions(headers=[token_header])
+            self._flight_client = flight_client
+        return self._flight_client
+
+    def iter_batches(self, sql: str) -> Iterator[pa.RecordBatch]:
+        """Stream a query's results as Arrow record batches"""
+        from pyarrow import flight
+
+        flight_client = self._connect()
+        info = flight_client.get_flight_info(flight.FlightDescriptor.for_command(sql), self._options)
+        for endpoint in info.endpoints:
+            for chunk in flight_client.do_get(endpoint.ticket, self._options):
+                yield chunk.data
+
+    def run_sync(self, sql: str, fetch: bool = True,
+                 max_rows: Optional[int] = None) -> QueryResult:
+        """Run one query and collect its batches into a table"""
+        from pyarrow import flight
+
+        start = time.perf_counter()
+        flight_client = self._connect()
+        info = flight_client.get_flight_info(flight.FlightDescriptor.for_command(sql), self._options)
+
+        tables = []
+        rows = 0
+        for endpoint in info.endpoints:
+            if not fetch or (max_rows is not None and rows >= max_rows):
+                break
+            reader = flight_client.do_get(endpoint.ticket, self._options)
+            if max_rows is None:
+                tables.append(reader.read_all())
+                rows += tables[-1].num_rows
+                continue
+            for chunk in reader:
+                tables.append(pa.Table.from_batches([chunk.data]))
+                rows += chunk.data.num_rows
+                if rows >= max_rows:
+                    break
+
+        table = pa.concat_tables(tables) if tables else info.schema.empty_table()
+        if max_rows is not None:
+            table = table.slice(0, max_rows)
+        row_count = info.total_records if info.total_records >= 0 else table.num_rows
+        return QueryResult(sql, "", table, row_count, time.perf_counter() - start)
+
+    async def run(self, sql: str, fetch: bool = True,
+                  max_rows: Optional[int] = None) -> QueryResult:
+        """Run one query end to end (Flight calls run off the event loop)"""
+        return await asyncio.to_thread(self.run_sync, sql, fetch, max_rows)
+
+    async def run_many(self, sqls: List[str], **kwargs) -> List[QueryResult]:
+        """Run queries concurrently (at most max_concurrency at once), in input order"""
+        return await _run_bounded(self, sqls, self.max_concurrency, **kwargs)
+
+
+def run_queries(client: DremioClient, sqls: List[str],
+                max_concurrency: int = MAX_CONCURRENCY, flight: bool = False,
+                flight_port: Optional[int] = None, **kwargs) -> List[QueryResult]:
+    """Blocking wrapper around run_many of the REST or Flight runner"""
+    if flight:
+        runner = FlightQueryRunner(client, port=flight_port, max_concurrency=max_concurrency)
+    else:
+        runner = AsyncQueryRunner(client, max_concurrency=max_concurrency)
+    return asyncio.run(runner.run_many(sqls, **kwargs))
+
+
+def run_query(client: DremioClient, sql: str, **kwargs) -> QueryResult:
+    """Blocking wrapper for a single query"""
+    return run_queries(client, [sql], max_concurrency=1, **kwargs)[0]
+
+
+def main():
+    """Run SQL from the command line"""
+    parser = argparse.ArgumentParser(description='Run Dremio SQL queries as async jobs')
+    parser.add_argument('sql', nargs='+', help='SQL statements')
+    parser.add_argument('--concurrency', type=int, default=MAX_CONCURRENCY,
+                        help=f'Queries in flight at once (default: {MAX_CONCURRENCY})')
+    parser.add_argument('--max-rows', type=int, default=None,
+                        help='Maximum rows to download per query')
+    parser.add_argument('--flight', action='store_true',
+                        help='Fetch results over Arrow Flight instead of REST')
+    parser.add_argument('--flight-port', type=int,
+                        help='Arrow Flight port (default: dremio.flight_port setting)')
+    parser.add_argument('--url', type=str, help='Dremio URL (default: dremio.url setting)')
+    parser.add_argument('--username', type=str, help='Dremio user (default: dremio.username setting)')
+    args = parser.parse_args()
+
+    client = DremioClient(args.url, args.username, interactive=True,
+                          pool_size=max(args.concurrency * 2, 10))
+
+    start = time.perf_counter()
+    try:
+        results = run_queries(client, args.sql, max_concurrency=args.concurrency,
+                              flight=args.flight, flight_port=args.flight_port,
+                              max_rows=args.max_rows)
+    except DremioQueryError as e:
+        logger.error(f"✗ {e}")
+        return 1
+
+    for result in results:
+        logger.info(f"Job {result.job_id or 'flight'}: {result.row_count:,} rows in {result.elapsed:.3f} s")
+        logger.info(result.table.slice(0, 10).to_pandas().to_string())
+        logger.info("")
+
+    logger.info(f"✓ {len(results)} queries completed in {time.perf_counter() - start:.3f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    sys.exit(main())
@@ -0,0 +1,936 @@
+#!/usr/bin/env python3
+"""
+Generate Synthetic Zeek conn Logs for Benchmarking
+
+Vectorized (NumPy / Arrow) generator of realistic Zeek conn records, fast
+enough to produce 100M+ rows on a laptop (one core, generate + encode:
+~650k rows/s to OCSF, ~370k rows/s to NDJSON or TSV, where the per-row
+string join dominates; blocks run in parallel with --workers):
+
+- Zipf-distributed internal clients and external destinations
+- Diurnal and weekly arrival rate (timestamps strictly ordered)
+- Service / protocol / conn_state mixes with matching histories, packets
+  and IP bytes
+- Heavy-tailed (log-normal body, Pareto tail) bytes and durations
+
+Output is Zeek JSON (NDJSON, what the loaders read), Zeek TSV (the native
+conn.log format) or OCSF Parquet in the flat schema of
+transform_zeek_to_ocsf_flat.py, written in blocks of BLOCK_ROWS rows. With
+--minio-root the OCSF data is written partitioned by day into a local
+directory laid out like the MinIO bucket (serve it with `minio server`,
+or query it with local_query.py --local-root).
+
+Datasets are reproducible: a named profile (record count, days, hosts,
+ports, services, skew; see config/benchmarks/data_profiles.json) plus a
+seed (default DEFAULT_SEED) give bit-identical output on every run and
+machine with the same NumPy / Arrow versions, whatever the thread count.
+metadata_processed_time defaults to the end of the generated range rather
+than the wall clock. A _manifest.json with the profile, seed, versions and
+SHA-256 of every file is written next to the output for comparison.
+Parquet row groups, the bucket and the dataset folder follow settings.py,
+like the loader's.
+
+Requirements:
+    pip install numpy pyarrow
+
+Usage:
+    python3 scripts/generate_zeek_data.py --records 1000000 --output data/conn_1M.json
+    python3 scripts/generate_zeek_data.py --profile laptop-100m --format ocsf --output conn.parquet
+    python3 scripts/generate_zeek_data.py --profile week --minio-root ./minio-data --overwrite
+    python3 scripts/generate_zeek_data.py --records 1000000 --format tsv --output conn.log
+    python3 scripts/generate_zeek_data.py --records 10000000  # generate and encode only (speed)
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, fields, replace
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from transform_zeek_to_ocsf_flat import (
+    ACTIVITY_ID_MAP, CONN_STATE_MAP, LOG_TYPE_CLASSES, PARQUET_ROW_GROUP_SIZE,
+    PARQUET_WRITE_OPTIONS, PROTOCOL_MAP,
+)
+from ingest_pipeline import PartitionFiles
+from settings import get_settings
+from uid_index import partition_path
+
+logger = logging.getLogger(__name__)
+
+BLOCK_ROWS = PARQUET_ROW_GROUP_SIZE  # rows generated per block (fixed: part of the seeding)
+FORMATS = ('ndjson', 'tsv', 'ocsf')
+WORKERS = os.cpu_count() or 1
+DEFAULT_SEED = 42
+DEFAULT_PROFILES = Path(__file__).parent.parent / "config" / "benchmarks" / "data_profiles.json"
+MANIFEST_NAME = "_manifest.json"       # '_' prefix: skipped by Dremio and Arrow datasets
+
+EPHEMERAL_PORTS = (32768, 61000)     # Linux default source port range
+MSS = 1200                           # average payload bytes per packet
+HEADER_BYTES = {'tcp': 40, 'udp': 28, 'icmp': 28}
+TAIL_SCALE = 100                     # Pareto tail starts at 100x the log-normal draw
+MAX_BYTES = 50 * 1024 ** 3           # cap for the Pareto tail
+UID_ALPHABET = np.frombuffer(
+    b'0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz', dtype=np.uint8)
+UID_LENGTH = 18                      # 'C' + 17 base62 characters
+
+
+class Service(NamedTuple):
+    """One entry of the service mix"""
+    name: Optional[str]    # Zeek `service` (None: not identified)
+    proto: str
+    port: int              # responder port (0: from the profile's port pool)
+    weight: float          # share of connections
+    internal: float        # share of connections to internal hosts
+    orig_bytes: tuple      # log-normal (mu, sigma) of payload bytes sent
+    resp_bytes: tuple      # log-normal (mu, sigma) of payload bytes received
+    duration: tuple        # log-normal (mu, sigma) of seconds
+
+
+# Identified services first, most common first (ConnProfile.services keeps a prefix)
+SERVICES = [
+    Service('dns', 'udp', 53, 0.34, 1.0, (3.8, 0.3), (4.8, 0.5), (-4.0, 1.0)),
+    Service('ssl', 'tcp', 443, 0.30, 0.05, (7.0, 1.2), (9.0, 2.0), (0.5, 1.5)),
+    Service('http', 'tcp', 80, 0.08, 0.10, (6.0, 1.0), (8.5, 2.2), (0.0, 1.5)),
+    Service('ssh', 'tcp', 22, 0.01, 0.50, (8.0, 2.0), (8.0, 2.0), (2.0, 2.0)),
+    Service('smtp', 'tcp', 25, 0.01, 0.30, (8.5, 1.5), (6.0, 0.5), (0.5, 1.0)),
+    Service('ntp', 'udp', 123, 0.02, 0.0, (3.9, 0.05), (3.9, 0.05), (-3.5, 0.5)),
+    Service('dhcp', 'udp', 67, 0.005, 1.0, (5.7, 0.1), (5.8, 0.1), (-2.0, 1.0)),
+    Service(None, 'tcp', 0, 0.16, 0.20, (6.0, 2.0), (7.0, 2.5), (0.0, 2.5)),
+    Service(None, 'udp', 0, 0.06, 0.30, (5.0, 1.5), (5.0, 1.5), (-1.0, 2.0)),
+    Service(None, 'icmp', 8, 0.025, 0.30, (4.2, 0.3), (4.2, 0.3), (-3.0, 1.0)),
+]
+
+# Most popular ports of unidentified services; profiles with more ports add random ones
+OTHER_PORTS = [8080, 8443, 3389, 445, 139, 993, 995, 5223, 5228, 1194, 3478, 9000]
+
+
+class ConnState(NamedTuple):
+    """One conn_state of a protocol's state mix"""
+    name: str
+    weight: float
+    history: Optional[str]
+    orig_pkts: int         # packets besides payload (handshake, FIN/RST)
+    resp_pkts: int
+    orig_payload: bool
+    resp_payload: bool
+    timed: bool            # duration is set
+
+
+STATE_MIX = {
+    'tcp': [
+        ConnState('SF', 0.72, 'ShADadFf', 3, 2, True, True, True),
+        ConnState('S0', 0.10, 'S', 1, 0, False, False, False),
+        ConnState('REJ', 0.05, 'Sr', 1, 1, False, False, True),
+        ConnState('RSTO', 0.04, 'ShADadR', 3, 1, True, True, True),
+        ConnState('RSTR', 0.03, 'ShADadr', 2, 2, True, True, True),
+        ConnState('S1', 0.02, 'ShADad', 2, 1, True, True, True),
+        ConnState('SH', 0.01, 'SF', 2, 0, False, False, True),
+        ConnState('OTH', 0.03, 'CCdd', 0, 0, True, True, True),
+    ],
+    'udp': [
+        ConnState('SF', 0.78, 'Dd', 0, 0, True, True, True),
+        ConnState('S0', 0.18, 'D', 0, 0, True, False, False),
+        ConnState('SHR', 0.01, 'd', 0, 0, False, True, False),
+        ConnState('OTH', 0.03, 'Dd', 0, 0, True, True, True),
+    ],
+    'icmp': [
+        ConnState('OTH', 1.0, None, 0, 0, True, True, True),
+    ],
+}
+
+PROTOS = list(STATE_MIX)
+
+# Zeek conn.log fields (Zeek 5 defaults) and their TSV types
+CONN_FIELDS = {
+    'ts': 'time', 'uid': 'string',
+    'id.orig_h': 'addr', 'id.orig_p': 'port', 'id.resp_h': 'addr', 'id.resp_p': 'port',
+    'proto': 'enum', 'service': 'string', 'duration': 'interval',
+    'orig_bytes': 'count', 'resp_bytes': 'count', 'conn_state': 'string',
+    'local_orig': 'bool', 'local_resp': 'bool', 'missed_bytes': 'count', 'history': 'string',
+    'orig_pkts': 'count', 'orig_ip_bytes': 'count', 'resp_pkts': 'count', 'resp_ip_bytes': 'count',
+    'tunnel_parents': 'set[string]',
+}
+
+# Private, loopback and link-local ranges excluded from external addresses
+NON_PUBLIC_NETWORKS = [
+    (10 << 24, 8), (127 << 24, 8), ((172 << 24) | (16 << 16), 12),
+    ((192 << 24) | (168 << 16), 16), ((169 << 24) | (254 << 16), 16), (100 << 24 | 64 << 16, 10),
+]
+
+
+@dataclass
+class ConnProfile:
+    """Size and shape of the generated traffic"""
+    records: int = 1000000
+    days: int = 1
+    start: date = date(2023, 11, 13)
+    internal_hosts: int = 2000       # clients (10.0.0.0/12)
+    resolvers: int = 2               # internal DNS servers
+    external_hosts: int = 50000      # distinct internet destinations
+    services: int = sum(1 for s in SERVICES if s.name)  # identified services kept
+    ports: int = 200                 # distinct responder ports of unidentified services
+    host_skew: float = 1.1           # Zipf exponent of client activity
+    dest_skew: float = 1.2           # Zipf exponent of destination popularity
+    port_skew: float = 1.0           # Zipf exponent of unidentified-service ports
+    diurnal_amplitude: float = 0.6   # 0: flat; peak/trough = (1 + a) / (1 - a)
+    peak_hour: float = 14.0          # UTC hour of the daily peak
+    weekend_factor: float = 0.5      # weekend rate relative to weekdays
+    tail_fraction: float = 0.01      # TCP flows with Pareto-tailed bytes
+    tail_alpha: float = 1.2          # Pareto shape (smaller = heavier)
+
+
+def load_profile(name: str, path: Path = DEFAULT_PROFILES) -> ConnProfile:
+    """
+    Load a named profile ({"profiles": {name: {field: value}}}).
+
+    Args:
+        name: Profile name
+        path: JSON, or YAML (.yaml/.yml) when PyYAML is installed
+
+    Returns:
+        The profile; fields it does not set keep the ConnProfile defaults
+    """
+    text = Path(path).read_text()
+    if Path(path).suffix in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError as e:
+            raise ImportError("YAML profiles require PyYAML (pip install pyyaml)") from e
+        profiles = yaml.safe_load(text).get('profiles', {})
+    else:
+        profiles = json.loads(text).get('profiles', {})
+
+    if name not in profiles:
+        raise ValueError(f"Unknown profile {name!r} in {path} (have: {', '.join(profiles)})")
+    values = dict(profiles[name])
+    unknown = set(values) - {f.name for f in fields(ConnProfile)}
+    if unknown:
+        raise ValueError(f"Unknown fields in profile {name!r}: {', '.join(sorted(unknown))}")
+    if isinstance(values.get('start'), str):
+        values['start'] = date.fromisoformat(values['start'])
+    return ConnProfile(**values)
+
+
+def ipv4_strings(values: np.ndarray) -> pa.Array:
+    """Dotted-quad strings of IPv4 addresses given as integers"""
+    octets = [pc.cast(pa.array((values >> shift) & 0xFF), pa.string()) for shift in (24, 16, 8, 0)]
+    return pc.binary_join_element_wise(*octets, '.')
+
+
+def _zipf_cdf(size: int, exponent: float) -> np.ndarray:
+    weights = 1.0 / np.arange(1, size + 1) ** exponent
+    return _cdf(weights)
+
+
+def _cdf(weights: np.ndarray) -> np.ndarray:
+    """CDF of non-negative weights, exactly 1.0 from the last non-zero weight on"""
+    weights = np.asarray(weights, dtype=float)
+    cdf = np.cumsum(weights) / weights.sum()
+    cdf[np.flatnonzero(weights)[-1]:] = 1.0
+    return cdf
+
+
+def _sample(rng: np.random.Generator, cdf: np.ndarray, count: int) -> np.ndarray:
+    """Indices drawn from a discrete distribution given by its CDF"""
+    return np.minimum(np.searchsorted(cdf, rng.random(count), side='right'), len(cdf) - 1)
+
+
+def _fixed_width_strings(chars: np.ndarray) -> pa.Array:
+    """StringArray from an (n, width) uint8 character matrix without per-row objects"""
+    count, width = chars.shape
+    offsets = np.arange(0, (count + 1) * width, width, dtype=np.int32)
+    return pa.StringArray.from_buffers(count, pa.py_buffer(offsets),
+                                       pa.py_buffer(np.ascontiguousarray(chars)))
+
+
+class ConnGenerator:
+    """
+    Zeek conn records for a profile, generated block by block.
+
+    Arrival times are fixed up front (per-minute counts following the
+    diurnal profile); each block of BLOCK_ROWS rows then draws from its own
+    random stream keyed by (seed, block), so the output does not depend on
+    how, or by how many threads, it is consumed.
+    """
+
+    def __init__(self, profile: Optional[ConnProfile] = None, seed: Optional[int] = DEFAULT_SEED,
+                 processed_time: Optional[int] = None):
+        """
+        Args:
+            profile: Traffic profile (default: ConnProfile())
+            seed: Random seed (None: fresh entropy, not reproducible)
+            processed_time: OCSF metadata_processed_time in epoch ms
+                (default: end of the generated range, so output is reproducible)
+        """
+        self.profile = profile or ConnProfile()
+        self.records = self.profile.records
+        self.entropy = np.random.SeedSequence(seed).entropy
+
+        self._init_hosts(self._rng(0))
+        self._init_arrivals(self._rng(1))
+        self._init_mixes(self._rng(3))
+        self.processed_time = (processed_time if processed_time is not None
+                               else int(self.end_ts * 1000))
+
+    def _rng(self, *key: int) -> np.random.Generator:
+        return np.random.default_rng(np.random.SeedSequence(self.entropy, spawn_key=key))
+
+    def _init_hosts(self, rng: np.random.Generator) -> None:
+        p = self.profile
+        internal = rng.choice(4096 * 254, p.resolvers + p.internal_hosts, replace=False)
+        internal = (10 << 24) | ((internal // 254) << 8) | (internal % 254 + 1)
+
+        external = np.empty(0, dtype=np.int64)
+        while len(external) < p.external_hosts:
+            candidates = rng.integers(1 << 24, 224 << 24, 2 * p.external_hosts)
+            public = np.ones(len(candidates), dtype=bool)
+            for network, prefix in NON_PUBLIC_NETWORKS:
+                public &= (candidates >> (32 - prefix)) != (network >> (32 - prefix))
+            external = np.unique(np.concatenate([external, candidates[public]]))
+        external = rng.permutation(external)[:p.external_hosts]
+
+        # Internal hosts first (resolvers, then clients), then external ones
+        self.addresses = ipv4_strings(np.concatenate([internal, external]))
+        self.internal_count = len(internal)
+        # Zipf rank → host, shuffled so activity is not ordered by address
+        self.client_ranks = p.resolvers + rng.permutation(p.internal_hosts)
+        self.client_cdf = _zipf_cdf(p.internal_hosts, p.host_skew)
+        self.external_ranks = self.internal_count + rng.permutation(p.external_hosts)
+        self.external_cdf = _zipf_cdf(p.external_hosts, p.dest_skew)
+
+    def _init_arrivals(self, rng: np.random.Generator) -> None:
+        p = self.profile
+        minutes = np.arange(p.days * 1440)
+        hours = (minutes % 1440) / 60.0
+        rate = 1.0 + p.diurnal_amplitude * np.cos(2 * np.pi * (hours - p.peak_hour) / 24)
+        weekday = (p.start.weekday() + minutes // 1440) % 7
+        rate = np.where(weekday >= 5, rate * p.weekend_factor, rate)
+
+        self.minute_counts = rng.multinomial(self.records, rate / rate.sum())
+        self.minute_ends = np.cumsum(self.minute_counts)
+        self.start_ts = datetime(p.start.year, p.start.month, p.start.day,
+                                 tzinfo=timezone.utc).timestamp()
+        self.end_ts = self.start_ts + p.days * 86400
+
+    def _init_mixes(self, rng: np.random.Generator) -> None:
+        p = self.profile
+        identified = [s for s in SERVICES if s.name][:p.services]
+        services = identified + [s for s in SERVICES if not s.name]
+        self.service_cdf = _cdf([s.weight for s in services])
+        self.service_names = pa.array([s.name for s in services], pa.string())
+        self.service_proto = np.array([PROTOS.index(s.proto) for s in services])
+        self.service_port = np.array([s.port for s in services])
+        self.service_internal = np.array([s.internal for s in services])
+        self.service_lognormal = {
+            field: np.array([getattr(s, field) for s in services])
+            for field in ('orig_bytes', 'resp_bytes', 'duration')
+        }
+        self.dns_service = next((i for i, s in enumerate(services) if s.name == 'dns'), -1)
+
+        # Unidentified-service ports: OTHER_PORTS by popularity, then random high ports
+        ports = OTHER_PORTS[:p.ports]
+        candidates = rng.permutation(np.arange(1024, 65536))
+        ports += [int(port) for port in candidates[~np.isin(candidates, ports)][:p.ports - len(ports)]]
+        self.other_ports = np.array(ports)
+        self.other_port_cdf = _zipf_cdf(len(ports), p.port_skew)
+        self.proto_names = pa.array(PROTOS, pa.string())
+        self.proto_header = np.array([HEADER_BYTES[proto] for proto in PROTOS])
+
+        # States of all protocols in one table, with a CDF row per protocol
+        states = [(i, s) for i, proto in enumerate(PROTOS) for s in STATE_MIX[proto]]
+        self.state_names = pa.array([s.name for _, s in states], pa.string())
+        self.state_histories = pa.array([s.history for _, s in states], pa.string())
+        self.state_columns = {
+            field: np.array([getattr(s, field) for _, s in states])
+            for field in ('orig_pkts', 'resp_pkts', 'orig_payload', 'resp_payload', 'timed')
+        }
+        self.state_cdf = np.zeros((len(PROTOS), len(states)))
+        for proto_index in range(len(PROTOS)):
+            weights = np.array([s.weight if i == proto_index else 0.0 for i, s in states])
+            self.state_cdf[proto_index] = _cdf(weights)
+
+    @property
+    def blocks(self) -> int:
+        return -(-self.records // BLOCK_ROWS)
+
+    def __iter__(self) -> Iterator[pa.Table]:
+        for block in range(self.blocks):
+            yield self.block(block)
+
+    def _timestamps(self, rng: np.random.Generator, rows: np.ndarray) -> np.ndarray:
+        """Stratified within each minute, so times increase across blocks"""
+        minute = np.searchsorted(self.minute_ends, rows, side='right')
+        counts = self.minute_counts[minute]
+        position = rows - (self.minute_ends[minute] - counts)
+        offset = 60.0 * (position + rng.random(len(rows))) / counts
+        return np.round(self.start_ts + minute * 60.0 + offset, 6)
+
+    def _lognormal(self, rng: np.random.Generator, field: str, service: np.ndarray) -> np.ndarray:
+        mu, sigma = self.service_lognormal[field][service].T
+        return np.exp(mu + sigma * rng.standard_normal(len(service)))
+
+    def _heavy_tail(self, rng: np.random.Generator, values: np.ndarray,
+                    eligible: np.ndarray, fraction: float) -> np.ndarray:
+        """Replace a fraction of eligible values with Pareto draws (elephant flows)"""
+        tail = eligible & (rng.random(len(values)) < fraction)
+        scale = values[tail] * TAIL_SCALE
+        pareto = scale * (1.0 - rng.random(tail.sum())) ** (-1.0 / self.profile.tail_alpha)
+        values[tail] = np.minimum(pareto, MAX_BYTES)
+        return values
+
+    def block(self, block: int) -> pa.Table:
+        """
+        Generate one block of conn records.
+
+        Args:
+            block: Block number (0 ≤ block < self.blocks)
+
+        Returns:
+            Arrow table with the CONN_FIELDS columns
+        """
+        rng = self._rng(2, block)
+        rows = np.arange(block * BLOCK_ROWS, min((block + 1) * BLOCK_ROWS, self.records))
+        n = len(rows)
+        p = self.profile
+
+        ts = self._timestamps(rng, rows)
+
+        # Service, protocol and connection state
+        service = _sample(rng, self.service_cdf, n)
+        proto = self.service_proto[service]
+        state = (rng.random(n)[:, None] >= self.state_cdf[proto]).sum(axis=1)
+
+        # Endpoints: Zipf clients; DNS to the resolvers, others internal or external
+        src = self.client_ranks[_sample(rng, self.client_cdf, n)]
+        internal = rng.random(n) < self.service_internal[service]
+        dst = np.where(internal, self.client_ranks[_sample(rng, self.client_cdf, n)],
+                       self.external_ranks[_sample(rng, self.external_cdf, n)])
+        is_dns = service == self.dns_service
+        dst[is_dns] = rng.integers(0, p.resolvers, is_dns.sum())
+
+        is_icmp = proto == PROTOS.index('icmp')
+        src_port = np.where(is_icmp, 8, rng.integers(*EPHEMERAL_PORTS, n))
+        dst_port = self.service_port[service]
+        other = dst_port == 0
+        dst_port = np.where(is_icmp, 0, dst_port)
+        dst_port[other] = self.other_ports[_sample(rng, self.other_port_cdf, other.sum())]
+
+        # Bytes, packets and duration
+        is_tcp = proto == PROTOS.index('tcp')
+        orig_bytes = self._lognormal(rng, 'orig_bytes', service)
+        resp_bytes = self._lognormal(rng, 'resp_bytes', service)
+        orig_bytes = self._heavy_tail(rng, orig_bytes, is_tcp, p.tail_fraction / 4)
+        resp_bytes = self._heavy_tail(rng, resp_bytes, is_tcp, p.tail_fraction)
+        orig_bytes = np.where(self.state_columns['orig_payload'][state], orig_bytes, 0).astype(np.int64)
+        resp_bytes = np.where(self.state_columns['resp_payload'][state], resp_bytes, 0).astype(np.int64)
+
+        orig_pkts = self.state_columns['orig_pkts'][state] + -(-orig_bytes // MSS)
+        resp_pkts = self.state_columns['resp_pkts'][state] + -(-resp_bytes // MSS)
+        header = self.proto_header[proto]
+
+        duration = np.round(self._lognormal(rng, 'duration', service), 6)
+        timed = self.state_columns['timed'][state]
+
+        uid = UID_ALPHABET[rng.integers(0, len(UID_ALPHABET), (n, UID_LENGTH), dtype=np.uint8)]
+        uid[:, 0] = ord('C')
+
+        return pa.table({
+            'ts': ts,
+            'uid': _fixed_width_strings(uid),
+            'id.orig_h': self.addresses.take(pa.array(src)),
+            'id.orig_p': src_port,
+            'id.resp_h': self.addresses.take(pa.array(dst)),
+            'id.resp_p': dst_port,
+            'proto': self.proto_names.take(pa.array(proto)),
+            'service': self.service_names.take(pa.array(service)),
+            'duration': pa.array(duration, mask=~timed),
+            'orig_bytes': orig_bytes,
+            'resp_bytes': resp_bytes,
+            'conn_state': self.state_names.take(pa.array(state)),
+            'local_orig': np.ones(n, dtype=bool),
+            'local_resp': dst < self.internal_count,
+            'missed_bytes': np.zeros(n, dtype=np.int64),
+            'history': self.state_histories.take(pa.array(state)),
+            'orig_pkts': orig_pkts,
+            'orig_ip_bytes': orig_bytes + orig_pkts * header,
+            'resp_pkts': resp_pkts,
+            'resp_ip_bytes': resp_bytes + resp_pkts * header,
+            'tunnel_parents': pa.nulls(n, pa.list_(pa.string())),
+        })
+
+
+def _lines(segments: List, count: int) -> bytes:
+    """Concatenate per-row string segments into newline-terminated lines"""
+    # The join costs per segment and row: fold adjacent literals into one
+    merged = []
+    for segment in segments:
+        if isinstance(segment, str) and merged and isinstance(merged[-1], str):
+            merged[-1] += segment
+        elif not isinstance(segment, str) or segment:
+            merged.append(segment)
+    joined = pc.binary_join_element_wise(*merged, '\n', '')
+    if joined.null_count:
+        raise ValueError("null segment in generated line")
+    # The rows are contiguous in the data buffer: that is the file content
+    _, offsets, data = joined.buffers()
+    bounds = np.frombuffer(offsets, dtype=np.int32, count=count + 1, offset=joined.offset * 4)
+    return data.slice(bounds[0], bounds[-1] - bounds[0]).to_pybytes()
+
+
+def _text(column: pa.Array) -> pa.Array:
+    return column if pa.types.is_string(column.type) else pc.cast(column, pa.string())
+
+
+def to_ndjson(table: pa.Table) -> bytes:
+    """Zeek JSON lines of a conn table; unset fields are omitted like Zeek does"""
+    segments = ['{']
+    for i, name in enumerate(table.column_names):
+        column = table.column(name).combine_chunks()
+        if column.null_count == len(column):
+            continue  # unset in every row (e.g. tunnel_parents)
+        quote = '"' if pa.types.is_string(column.type) else ''
+        prefix = f'{"," if i else ""}"{name}":{quote}'
+        if column.null_count:
+            # Only optional fields get a per-row segment; others join literals directly
+            segment = pc.binary_join_element_wise(prefix, _text(column), quote, '')
+            segments.append(pc.fill_null(segment, ''))
+        else:
+            segments.extend([prefix, _text(column), quote])
+    segments.append('}')
+    return _lines(segments, len(table))
+
+
+def zeek_tsv_header(path: str, opened: datetime) -> bytes:
+    """Header lines of a Zeek ASCII log"""
+    return ('\n'.join([
+        '#separator \\x09',
+        '#set_separator\t,',
+        '#empty_field\t(empty)',
+        '#unset_field\t-',
+        f'#path\t{path}',
+        f'#open\t{opened:%Y-%m-%d-%H-%M-%S}',
+        '#fields\t' + '\t'.join(CONN_FIELDS),
+        '#types\t' + '\t'.join(CONN_FIELDS.values()),
+    ]) + '\n').encode()
+
+
+def to_tsv(table: pa.Table) -> bytes:
+    """Zeek TSV rows (without header) of a conn table; unset fields are '-'"""
+    segments = []
+    for name in table.column_names:
+        column = table.column(name).combine_chunks()
+        if pa.types.is_list(column.type):
+            column = pa.nulls(len(column), pa.string())
+        value = _text(column)
+        if pa.types.is_boolean(column.type):
+            value = pc.if_else(column, 'T', 'F')
+        segments.extend([pc.fill_null(value, '-'), '\t'])
+    return _lines(segments[:-1], len(table))
+
+
+def _constant(value, count: int, type: pa.DataType) -> pa.Array:
+    return pa.repeat(pa.scalar(value, type), count)
+
+
+def _lookup(column: pa.Array, mapping: Dict[str, int], default: int) -> pa.Array:
+    """Map string values through a dict, with a default for others and nulls"""
+    index = pc.fill_null(pc.index_in(column, value_set=pa.array(list(mapping))), len(mapping))
+    return pa.array(list(mapping.values()) + [default], pa.int64()).take(index)
+
+
+def to_ocsf(table: pa.Table, processed_time: Optional[int] = None) -> pa.Table:
+    """
+    Vectorized equivalent of _map_conn_record for a generated conn table.
+
+    Produces the same columns and values as the loader's transform, except
+    that event_date is the UTC day and all-null columns are typed (string,
+    as the loader's Parquet writer stores them).
+
+    Args:
+        table: Conn table from ConnGenerator
+        processed_time: metadata_processed_time in epoch ms (default: now)
+
+    Returns:
+        Arrow table in the OCSF flat schema
+    """
+    n = len(table)
+    col = {name: table.column(name).combine_chunks() for name in table.column_names}
+    if processed_time is None:
+        processed_time = int(datetime.now().timestamp() * 1000)
+    category_uid, category_name, class_uid, class_name = LOG_TYPE_CLASSES['conn']
+
+    ts = col['ts']
+    time_ms = pc.cast(pc.floor(pc.multiply(ts, 1000.0)), pa.int64())
+    event_date = pc.cast(pc.cast(pc.cast(pc.floor(pc.divide(ts, 86400.0)), pa.int32()),
+                                 pa.date32()), pa.string())
+    activity_name = pc.fill_null(col['service'], 'Traffic')
+    ports = {}
+    for side, field in (('src', 'id.orig_p'), ('dst', 'id.resp_p')):
+        port = col[field]
+        ports[side] = pc.if_else(pc.equal(port, 0), pa.scalar(None, pa.int64()), port)
+    no_value = pa.nulls(n, pa.string())
+
+    def zero_if_null(name):
+        return pc.fill_null(col[name], 0)
+
+    return pa.table({
+        'activity_id': _lookup(col['service'], ACTIVITY_ID_MAP, 6),
+        'activity_name': activity_name,
+        'category_uid': _constant(category_uid, n, pa.int64()),
+        'category_name': _constant(category_name, n, pa.string()),
+        'class_uid': _constant(class_uid, n, pa.int64()),
+        'class_name': _constant(class_name, n, pa.string()),
+        'confidence': _constant(100, n, pa.int64()),
+        'severity_id': _constant(1, n, pa.int64()),
+        'type_uid': _constant(400106, n, pa.int64()),
+        'type_name': pc.binary_join_element_wise('Network Activity: ', activity_name, ''),
+        'time': time_ms,
+        'event_time': time_ms,
+        'metadata_logged_time': time_ms,
+        'metadata_processed_time': _constant(processed_time, n, pa.int64()),
+        'src_endpoint_ip': col['id.orig_h'],
+        'src_endpoint_port': ports['src'],
+        'src_endpoint_domain': no_value,
+        'src_endpoint_hostname': no_value,
+        'src_endpoint_is_local': col['local_orig'],
+        'src_endpoint_location_country': no_value,
+        'src_endpoint_mac': no_value,
+        'dst_endpoint_ip': col['id.resp_h'],
+        'dst_endpoint_port': ports['dst'],
+        'dst_endpoint_domain': no_value,
+        'dst_endpoint_hostname': no_value,
+        'dst_endpoint_is_local': col['local_resp'],
+        'dst_endpoint_location_country': no_value,
+        'dst_endpoint_mac': no_value,
+        'connection_info_uid': col['uid'],
+        'connection_info_protocol_num': _lookup(col['proto'], PROTOCOL_MAP, 0),
+        'connection_info_protocol_name': pc.utf8_upper(col['proto']),
+        'connection_info_protocol_ver': _constant('IPv4', n, pa.string()),
+        'connection_info_tcp_flags': col['history'],
+        'connection_info_direction': _constant('Unknown', n, pa.string()),
+        'connection_info_boundary': _constant('Unknown', n, pa.string()),
+        'traffic_bytes_in': zero_if_null('resp_bytes'),
+        'traffic_bytes_out': zero_if_null('orig_bytes'),
+        'traffic_packets_in': zero_if_null('resp_pkts'),
+        'traffic_packets_out': zero_if_null('orig_pkts'),
+        'traffic_bytes': pc.add(zero_if_null('resp_bytes'), zero_if_null('orig_bytes')),
+        'traffic_packets': pc.add(zero_if_null('resp_pkts'), zero_if_null('orig_pkts')),
+        'metadata_product_name': _constant('Zeek', n, pa.string()),
+        'metadata_product_vendor_name': _constant('Zeek Project', n, pa.string()),
+        'metadata_product_version': _constant('5.0.0', n, pa.string()),
+        'metadata_log_name': _constant('conn', n, pa.string()),
+        'metadata_log_version': _constant('1.0.0', n, pa.string()),
+        'observables_name_src_ip': col['id.orig_h'],
+        'observables_name_dst_ip': col['id.resp_h'],
+        'observables_name_src_port': pc.cast(ports['src'], pa.string()),
+        'observables_name_dst_port': pc.cast(ports['dst'], pa.string()),
+        'observables_type_src_ip': _constant('IP Address', n, pa.string()),
+        'observables_type_dst_ip': _constant('IP Address', n, pa.string()),
+        'unmapped_conn_state': col['conn_state'],
+        'unmapped_conn_state_id': _lookup(col['conn_state'], CONN_STATE_MAP, 99),
+        'unmapped_duration': pc.fill_null(col['duration'], 0.0),
+        'unmapped_missed_bytes': zero_if_null('missed_bytes'),
+        'unmapped_tunnel_parents': _constant('[]', n, pa.string()),
+        'unmapped_vlan': no_value,
+        'unmapped_inner_vlan': no_value,
+        'unmapped_community_id': _constant(0, n, pa.int64()),  # *_id columns are coerced to 0
+        'event_date': event_date,
+    })
+
+
+def encode_block(generator: ConnGenerator, block: int, fmt: str):
+    """One generated block as NDJSON / TSV bytes or an OCSF table"""
+    table = generator.block(block)
+    if fmt == 'ocsf':
+        return to_ocsf(table, generator.processed_time)
+    return to_ndjson(table) if fmt == 'ndjson' else to_tsv(table)
+
+
+def iter_encoded(generator: ConnGenerator, fmt: str, workers: int = 1) -> Iterator:
+    """
+    Encoded blocks in order, generated by a thread pool.
+
+    Blocks are independent random streams and Arrow / NumPy release the GIL,
+    so blocks are generated in parallel; at most 2 * workers are in flight.
+    """
+    if workers <= 1:
+        for block in range(generator.blocks):
+            yield encode_block(generator, block, fmt)
+        return
+
+    with ThreadPoolExecutor(workers) as pool:
+        pending = deque()
+        for block in range(generator.blocks):
+            pending.append(pool.submit(encode_block, generator, block, fmt))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _log_progress(block: int, started: float) -> None:
+    if (block + 1) % 100 == 0:
+        done = (block + 1) * BLOCK_ROWS
+        logger.info(f"  {done:,} records ({done / (time.perf_counter() - started):,.0f} records/s)")
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(8 * 1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_conn_logs(generator: ConnGenerator, output: Optional[Path], fmt: str = 'ndjson',
+                    workers: int = WORKERS) -> int:
+    """
+    Generate all blocks and write them to one file.
+
+    Args:
+        generator: Records to generate
+        output: Output file (None: generate and encode only, for measuring speed)
+        fmt: ndjson, tsv or ocsf (Parquet)
+        workers: Generator threads
+
+    Returns:
+        Bytes written
+    """
+    ingest = get_settings().ingest
+    stream: Optional[BinaryIO] = None
+    writer: Optional[pq.ParquetWriter] = None
+    if output is not None:
+        output.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        if output is not None and fmt != 'ocsf':
+            stream = open(output, 'wb')
+            if fmt == 'tsv':
+                opened = datetime.fromtimestamp(generator.start_ts, timezone.utc)
+                stream.write(zeek_tsv_header('conn', opened))
+
+        started = time.perf_counter()
+        for block, encoded in enumerate(iter_encoded(generator, fmt, workers)):
+            if stream is not None:
+                stream.write(encoded)
+            elif output is not None:
+                if writer is None:
+                    writer = pq.ParquetWriter(str(output), encoded.schema,
+                                              compression=ingest.compression,
+                                              **PARQUET_WRITE_OPTIONS)
+                writer.write_table(encoded, row_group_size=ingest.row_group_size)
+            _log_progress(block, started)
+
+        if stream is not None and fmt == 'tsv':
+            closed = datetime.fromtimestamp(generator.end_ts, timezone.utc)
+            stream.write(f'#close\t{closed:%Y-%m-%d-%H-%M-%S}\n'.encode())
+    finally:
+        if stream is not None:
+            stream.close()
+        if writer is not None:
+            writer.close()
+
+    return output.stat().st_size if output is not None else 0
+
+
+def split_days(table: pa.Table) -> Iterator:
+    """(partition path, rows) per UTC day of a time-ordered OCSF table"""
+    day = table.column('time').to_numpy() // 86_400_000
+    bounds = [0, *(np.flatnonzero(np.diff(day)) + 1), len(day)]
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        d = datetime.fromtimestamp(int(day[start]) * 86400, timezone.utc)
+        yield partition_path(d.year, d.month, d.day), table.slice(start, stop - start)
+
+
+def write_partitioned(generator: ConnGenerator, root: Path, workers: int = WORKERS,
+                      overwrite: bool = False) -> Dict[str, Dict]:
+    """
+    Write OCSF Parquet into a local MinIO stand-in, one file per day.
+
+    The layout is the loader's: {root}/{bucket}/{conn folder}/year=/month=/day=/data.parquet,
+    with the same row groups and Parquet options, so the directory can be
+    served with `minio server {root}` or queried with local_query.py.
+
+    Args:
+        generator: Records to generate
+        root: Stand-in root directory (holds one directory per bucket)
+        workers: Generator threads
+        overwrite: Replace an existing dataset directory
+
+    Returns:
+        Object key → {rows, bytes, sha256} of every file written
+    """
+    settings = get_settings()
+    folder = settings.folders['conn']
+    dataset = Path(root) / settings.minio.bucket / folder
+    if dataset.exists() and any(dataset.iterdir()):
+        if not overwrite:
+            raise FileExistsError(f"{dataset} is not empty (use --overwrite to replace it)")
+        shutil.rmtree(dataset)
+    dataset.mkdir(parents=True, exist_ok=True)
+    # Encode outside the bucket (invisible to queries), on the same filesystem for rename
+    tmp_dir = Path(root) / '.generator-tmp'
+    tmp_dir.mkdir(exist_ok=True)
+
+    files = {}
+
+    def publish(closed):
+        target = dataset / closed.key / closed.filename
+        target.parent.mkdir(parents=True, exist_ok=True)
+        closed.path.replace(target)
+        key = f'{folder}/{closed.key}/{closed.filename}'
+        files[key] = {'rows': closed.rows, 'bytes': target.stat().st_size,
+                      'sha256': file_sha256(target)}
+        logger.info(f"  ✓ {key} ({closed.rows:,} records)")
+
+    writer = PartitionFiles(settings.ingest.row_group_size, PARQUET_WRITE_OPTIONS,
+                            compression=settings.ingest.compression, tmp_dir=tmp_dir)
+    try:
+        started = time.perf_counter()
+        for block, table in enumerate(iter_encoded(generator, 'ocsf', workers)):
+            for partition, rows in split_days(table):
+                for closed in writer.write(partition, rows, block):
+                    publish(closed)
+            # Blocks are time-ordered: a day not written in this block is complete
+            for closed in writer.close_idle(block, 1):
+                publish(closed)
+            _log_progress(block, started)
+        for closed in writer.close_all():
+            publish(closed)
+    finally:
+        writer.discard()
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return files
+
+
+def write_manifest(path: Path, generator: ConnGenerator, fmt: str, files: Dict[str, Dict]) -> None:
+    """Record how a dataset was generated, with checksums to compare runs by"""
+    profile = asdict(generator.profile)
+    profile['start'] = generator.profile.start.isoformat()
+    manifest = {
+        'generator': Path(__file__).name,
+        'format': fmt,
+        'seed': generator.entropy,
+        'profile': profile,
+        'processed_time': generator.processed_time,
+        'row_group_size': get_settings().ingest.row_group_size,
+        'versions': {'numpy': np.__version__, 'pyarrow': pa.__version__},
+        'files': files,
+    }
+    path.write_text(json.dumps(manifest, indent=2) + '\n')
+    logger.info(f"  Manifest: {path}")
+
+
+def _processed_time(value: str) -> Optional[int]:
+    """--processed-time: 'now', epoch milliseconds or an ISO date/time (UTC if naive)"""
+    if value == 'now':
+        return int(time.time() * 1000)
+    if value.isdigit():
+        return int(value)
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp() * 1000)
+
+
+def main():
+    """Main execution flow"""
+    parser = argparse.ArgumentParser(description='Generate synthetic Zeek conn logs')
+    parser.add_argument('--profile', default='default',
+                        help='Named profile (default: default)')
+    parser.add_argument('--profiles', type=Path, default=DEFAULT_PROFILES,
+                        help=f'Profiles file (default: config/benchmarks/{DEFAULT_PROFILES.name})')
+    parser.add_argument('--format', choices=FORMATS, default='ndjson',
+                        help='Zeek JSON, Zeek TSV or OCSF Parquet (default: ndjson)')
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument('--output', type=Path,
+                        help='Output file (default: generate only and report speed)')
+    output.add_argument('--minio-root', type=Path,
+                        help='Write OCSF Parquet partitioned by day into this MinIO data directory')
+    parser.add_argument('--overwrite', action='store_true',
+                        help='Replace the dataset under --minio-root if it exists')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help=f'Random seed (default: {DEFAULT_SEED})')
+    parser.add_argument('--processed-time', type=_processed_time,
+                        help="OCSF metadata_processed_time: 'now', epoch ms or ISO time "
+                             "(default: end of the generated range)")
+    parser.add_argument('--workers', type=int, default=WORKERS,
+                        help=f'Generator threads (default: {WORKERS})')
+    overrides = parser.add_argument_group('profile overrides')
+    overrides.add_argument('--records', type=int)
+    overrides.add_argument('--days', type=int)
+    overrides.add_argument('--start', type=date.fromisoformat, help='First day, YYYY-MM-DD')
+    overrides.add_argument('--internal-hosts', type=int)
+    overrides.add_argument('--external-hosts', type=int)
+    overrides.add_argument('--services', type=int, help='Identified services (most common first)')
+    overrides.add_argument('--ports', type=int, help='Ports of unidentified services')
+    args = parser.parse_args()
+
+    if args.minio_root is not None:
+        if args.format != 'ocsf' and '--format' in sys.argv:
+            parser.error('--minio-root writes OCSF Parquet (--format ocsf)')
+        args.format = 'ocsf'
+
+    try:
+        settings = get_settings()
+    except (OSError, ValueError) as e:
+        logger.error(f"Invalid settings: {e}")
+        return 1
+    try:
+        profile = load_profile(args.profile, args.profiles)
+    except (OSError, ValueError) as e:
+        logger.error(f"Cannot load profile: {e}")
+        return 1
+    changes = {f.name: getattr(args, f.name) for f in fields(ConnProfile)
+               if getattr(args, f.name, None) is not None}
+    profile = replace(profile, **changes)
+
+    generator = ConnGenerator(profile, args.seed, args.processed_time)
+    logger.info(f"Generating {profile.records:,} conn records over {profile.days} day(s) "
+                f"from {profile.start} ({args.profile} profile, {args.format}, seed {generator.entropy})")
+
+    started = time.perf_counter()
+    try:
+        if args.minio_root is not None:
+            files = write_partitioned(generator, args.minio_root, args.workers, args.overwrite)
+            manifest = (args.minio_root / settings.minio.bucket / settings.folders['conn']
+                        / MANIFEST_NAME)
+        else:
+            size = write_conn_logs(generator, args.output, args.format, args.workers)
+            files = {}
+            if args.output is not None:
+                files[args.output.name] = {'rows': profile.records, 'bytes': size,
+                                           'sha256': file_sha256(args.output)}
+                manifest = args.output.with_name(f'{args.output.name}.manifest.json')
+    except FileExistsError as e:
+        logger.error(str(e))
+        return 1
+    elapsed = time.perf_counter() - started
+
+    logger.info(f"✓ {profile.records:,} records in {elapsed:.1f}s "
+                f"({profile.records / elapsed:,.0f} records/s)")
+    if files:
+        total = sum(f['bytes'] for f in files.values())
+        logger.info(f"  Wrote {len(files)} file(s), {total / 1024 / 1024:.1f} MB")
+        write_manifest(manifest, generator, args.format, files)
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    sys.exit(main())
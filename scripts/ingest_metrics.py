@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Ingest Metrics and Profiling Hooks
+
+Per-stage instrumentation for the loaders (read → transform → enrich →
+encode → upload):
+
+- Wall and CPU time, calls, records/s, bytes in/out per stage
+- Peak RSS of the process at the end of each stage (high-water mark, so a
+  jump shows which stage grew the heap)
+- Summary as JSON or Prometheus text (file), or a Prometheus /metrics
+  endpoint served while the load runs
+- Optional cProfile or pyinstrument profile of a whole run (every stage
+  thread), saved per run
+
+Stages are recorded on the shared INGEST_METRICS registry; timing a stage
+costs two clock reads, so instrumentation is always on and only the
+output is optional.
+
+Requirements:
+    pip install pyinstrument  # optional: --profile pyinstrument
+
+Usage:
+    from ingest_metrics import INGEST_METRICS
+    with INGEST_METRICS.stage('encode', records=len(df)) as stage:
+        write_ocsf_parquet(df, path)
+        stage.bytes_out += path.stat().st_size
+
+    python3 scripts/load_real_zeek_to_ocsf.py --all --metrics-output results/ingest-metrics.json
+    python3 scripts/load_real_zeek_to_ocsf.py --all --metrics-output results/ingest.prom --metrics-port 9108
+    python3 scripts/load_real_zeek_to_ocsf.py --all --profile cprofile
+    python3 scripts/ingest_metrics.py results/ingest-metrics.json  # print a saved summary
+"""
+
+import argparse
+import cProfile
+import io
+import json
+import logging
+import pstats
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Metrics Configuration
+METRIC_PREFIX = "ocsf_ingest"
+PROFILE_DIR = Path("results") / "profiles"
+PROFILERS = ("cprofile", "pyinstrument")
+PROFILE_TOP_FUNCTIONS = 25  # rows of the cProfile text report
+
+# ru_maxrss is KiB on Linux, bytes on macOS
+RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process so far"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * RSS_UNIT
+
+
+@dataclass
+class StageMetrics:
+    """Accumulated measurements of one pipeline stage"""
+    name: str
+    calls: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    records: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    peak_rss_bytes: int = 0
+
+    @property
+    def records_per_second(self) -> float:
+        return self.records / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        return {**asdict(self), "records_per_second": self.records_per_second}
+
+
+class IngestMetrics:
+    """Registry of stage metrics for one process"""
+
+    def __init__(self):
+        self.stages: Dict[str, StageMetrics] = {}
+        self.started_at = datetime.now(timezone.utc)
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stages = {}
+            self.started_at = datetime.now(timezone.utc)
+
+    @contextmanager
+    def stage(self, name: str, records: int = 0, bytes_in: int = 0) -> Iterator['StageMetrics']:
+        """
+        Time a block of work as one call of a stage.
+
+        Args:
+            name: Stage name (read, transform, enrich, encode, upload, ...)
+            records: Records processed, if known up front
+            bytes_in: Input bytes, if known up front
+
+        Yields:
+            A per-call StageMetrics; add to records / bytes_in / bytes_out
+            inside the block when they are only known afterwards
+        """
+        call = StageMetrics(name, calls=1, records=records, bytes_in=bytes_in)
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield call
+        finally:
+            call.wall_seconds = time.perf_counter() - wall
+            # CPU of the calling thread: stages run concurrently in the loader
+            call.cpu_seconds = time.thread_time() - cpu
+            call.peak_rss_bytes = peak_rss_bytes()
+            self.add(call)
+
+    def timed(self, name: str, iterable: Iterable,
+              measure: Optional[Callable[[object], Tuple[int, int]]] = None) -> Iterator:
+        """
+        Iterate, timing each step as one call of a stage (e.g. reading batches).
+
+        Args:
+            name: Stage name
+            iterable: Source of items
+            measure: Maps an item to (records, bytes_in)
+        """
+        iterator = iter(iterable)
+        while True:
+            wall, cpu = time.perf_counter(), time.thread_time()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            records, bytes_in = measure(item) if measure else (0, 0)
+            self.add(StageMetrics(name, calls=1, wall_seconds=time.perf_counter() - wall,
+                                  cpu_seconds=time.thread_time() - cpu, records=records,
+                                  bytes_in=bytes_in, peak_rss_bytes=peak_rss_bytes()))
+            yield item
+
+    def add(self, call: StageMetrics) -> None:
+        """Accumulate one call measured elsewhere (e.g. in a worker process)"""
+        with self._lock:
+            total = self.stages.setdefault(call.name, StageMetrics(call.name))
+            total.calls += call.calls
+            total.wall_seconds += call.wall_seconds
+            total.cpu_seconds += call.cpu_seconds
+            total.records += call.records
+            total.bytes_in += call.bytes_in
+            total.bytes_out += call.bytes_out
+            total.peak_rss_bytes = max(total.peak_rss_bytes, call.peak_rss_bytes)
+
+    def to_dict(self) -> Dict:
+        """JSON summary (same envelope as the benchmark reports)"""
+        with self._lock:
+            stages = [s.to_dict() for s in self.stages.values()]
+        return {
+            "kind": "ingest_metrics",
+            "started_at": self.started_at.isoformat(),
+            "peak_rss_bytes": peak_rss_bytes(),
+            "stages": stages,
+        }
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        metrics = [
+            ("calls_total", "counter", "Stage invocations", "calls"),
+            ("wall_seconds_total", "counter", "Wall-clock time spent in the stage", "wall_seconds"),
+            ("cpu_seconds_total", "counter", "CPU time of the threads running the stage", "cpu_seconds"),
+            ("records_total", "counter", "Records processed by the stage", "records"),
+            ("bytes_in_total", "counter", "Bytes read by the stage", "bytes_in"),
+            ("bytes_out_total", "counter", "Bytes written by the stage", "bytes_out"),
+            ("records_per_second", "gauge", "Stage throughput", "records_per_second"),
+            ("peak_rss_bytes", "gauge", "Process peak RSS at the end of the stage", "peak_rss_bytes"),
+        ]
+        with self._lock:
+            stages = [s.to_dict() for s in self.stages.values()]
+
+        lines = []
+        for suffix, kind, help_text, field in metrics:
+            name = f"{METRIC_PREFIX}_stage_{suffix}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for stage in stages:
+                lines.append(f'{name}{{stage="{stage["name"]}"}} {stage[field]:g}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Path) -> None:
+        """Write the summary: Prometheus text for .prom/.txt, JSON otherwise"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix in (".prom", ".txt"):
+            path.write_text(self.to_prometheus())
+        else:
+            path.write_text(json.dumps(self.to_dict(), indent=2) + "\n")
+        logger.info(f"✓ Ingest metrics written to {path}")
+
+    def log_summary(self) -> None:
+        """One line per stage, in the order stages first ran"""
+        logger.info(f"{'Stage':<12} {'calls':>6} {'wall s':>8} {'cpu s':>8} "
+                    f"{'records/s':>11} {'MB in':>8} {'MB out':>8} {'peak RSS MB':>12}")
+        with self._lock:
+            stages = list(self.stages.values())
+        for s in stages:
+            logger.info(f"{s.name:<12} {s.calls:>6} {s.wall_seconds:>8.2f} {s.cpu_seconds:>8.2f} "
+                        f"{s.records_per_second:>11,.0f} {s.bytes_in / 1e6:>8.1f} "
+                        f"{s.bytes_out / 1e6:>8.1f} {s.peak_rss_bytes / 1e6:>12.0f}")
+
+    def serve(self, port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+        """
+        Serve GET /metrics (Prometheus) and GET /metrics.json in a daemon thread.
+
+        Returns:
+            The running server (call shutdown() to stop it)
+        """
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") == "/metrics.json":
+                    body, content_type = json.dumps(registry.to_dict()), "application/json"
+                elif self.path.rstrip("/") in ("", "/metrics"):
+                    body, content_type = registry.to_prometheus(), "text/plain; version=0.0.4"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        logger.info(f"✓ Serving ingest metrics on http://{host}:{port}/metrics")
+        return server
+
+
+# Shared registry used by the loaders
+INGEST_METRICS = IngestMetrics()
+
+
+class RunProfile:
+    """Profilers of one run: the thread that started it plus each stage thread"""
+
+    def __init__(self, profiler: str, stem: Path):
+        self.profiler = profiler
+        self.stem = stem
+        self._lock = threading.Lock()
+        self._threads: list = []  # (thread name, finished profiler)
+
+    def start(self):
+        """Start a profiler on the calling thread and return it"""
+        if self.profiler == "pyinstrument":
+            from pyinstrument import Profiler
+            instrument = Profiler()
+            instrument.start()
+            return instrument
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def stop(self, name: str, started) -> None:
+        if self.profiler == "pyinstrument":
+            started.stop()
+        else:
+            started.disable()
+        with self._lock:
+            self._threads.append((name, started))
+
+    def save(self) -> None:
+        """
+        Write the profiles collected so far.
+
+        cProfile stats of all threads are merged into one .prof/.txt;
+        pyinstrument profiles one thread per Profiler, so each thread gets
+        its own {stem}-{thread}.html.
+        """
+        with self._lock:
+            threads = list(self._threads)
+        if not threads:
+            return
+        if self.profiler == "pyinstrument":
+            for name, instrument in threads:
+                path = self.stem.with_name(f"{self.stem.name}-{name}.html")
+                path.write_text(instrument.output_html())
+            logger.info(f"✓ Profiles written to {self.stem}-*.html ({len(threads)} threads)")
+            return
+
+        stats = pstats.Stats(threads[0][1])
+        for _, profile in threads[1:]:
+            stats.add(profile)
+        stats.dump_stats(str(self.stem.with_suffix(".prof")))
+        report = io.StringIO()
+        stats.stream = report
+        stats.sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+        self.stem.with_suffix(".txt").write_text(report.getvalue())
+        logger.info(f"✓ Profile of {len(threads)} threads written to "
+                    f"{self.stem.with_suffix('.prof')} (top functions: .txt)")
+
+
+# Profile of the run in progress, picked up by profile_thread()
+_active_profile: Optional[RunProfile] = None
+
+
+@contextmanager
+def profile_run(profiler: Optional[str], output_dir: Path = PROFILE_DIR,
+                name: str = "ingest") -> Iterator[Optional[RunProfile]]:
+    """
+    Profile the enclosed block and save the result per run.
+
+    Profilers only see the thread they run on, so pipeline stages wrap
+    their thread in profile_thread() to be included. cProfile writes
+    {name}-{timestamp}.prof (open with snakeviz or pstats) plus a .txt of
+    the top functions by cumulative time, merged over all threads;
+    pyinstrument writes an .html call tree per thread.
+
+    Args:
+        profiler: "cprofile", "pyinstrument", or None for no profiling
+        output_dir: Directory for profile files
+        name: File name prefix
+    """
+    global _active_profile
+    if not profiler:
+        yield None
+        return
+    if profiler not in PROFILERS:
+        raise ValueError(f"Unknown profiler {profiler!r} (choose from {', '.join(PROFILERS)})")
+    if profiler == "pyinstrument":
+        try:
+            import pyinstrument  # noqa: F401
+        except ImportError:
+            raise RuntimeError("pyinstrument is not installed (pip install pyinstrument)") from None
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    run = RunProfile(profiler, output_dir / f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+
+    _active_profile = run
+    started = run.start()
+    try:
+        yield run
+    finally:
+        run.stop(threading.current_thread().name, started)
+        _active_profile = None
+        run.save()
+
+
+@contextmanager
+def profile_thread(name: str) -> Iterator[None]:
+    """Include the calling thread in the active profile_run(), if any"""
+    run = _active_profile
+    if run is None:
+        yield
+        return
+    started = run.start()
+    try:
+        yield
+    finally:
+        run.stop(name, started)
+
+
+def main():
+    """Print a saved JSON summary as a table, or convert it to Prometheus text"""
+    parser = argparse.ArgumentParser(description='Show a saved ingest metrics summary')
+    parser.add_argument('summary', type=Path, help='JSON summary written with --metrics-output')
+    parser.add_argument('--prometheus', action='store_true', help='Print Prometheus text instead')
+    args = parser.parse_args()
+
+    if not args.summary.exists():
+        logger.error(f"File not found: {args.summary}")
+        return 1
+
+    report = json.loads(args.summary.read_text())
+    metrics = IngestMetrics()
+    fields = set(StageMetrics.__dataclass_fields__)
+    for stage in report.get("stages", []):
+        metrics.add(StageMetrics(**{k: v for k, v in stage.items() if k in fields}))
+
+    if args.prometheus:
+        print(metrics.to_prometheus(), end="")
+    else:
+        logger.info(f"Ingest run started {report.get('started_at')}")
+        metrics.log_summary()
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    sys.exit(main())
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Staged Ingest Pipeline Building Blocks
+
+The OCSF loader runs as concurrent stages connected by bounded queues:
+
+    reader → transform workers → enrich/partition → Parquet encoder → uploaders
+
+so reading, CPU-bound transforms (worker processes) and Parquet/S3 I/O
+overlap. This module holds the stage-independent parts:
+
+- MemoryBudget: approximate bytes held in queues between stages; the
+  reader blocks when downstream falls behind (backpressure)
+- Pipeline: threads, bounded queues and error propagation; the first
+  failure stops every stage instead of leaving them blocked
+- PartitionFiles: streams batches into one Parquet file per partition,
+  rolling over to a new part on schema drift or for rows arriving after
+  the partition was closed; stale_parts() names the parts of an earlier
+  load of the same partition that this load did not overwrite
+
+Requirements:
+    pip install pandas pyarrow
+
+Usage:
+    budget = MemoryBudget(512 * 1024 * 1024)
+    pipeline = Pipeline(budget)
+    batches = pipeline.queue(4)
+    pipeline.spawn('reader', read_batches, batches)
+    pipeline.spawn('writer', write_batches, batches)
+    pipeline.join()  # re-raises the first stage failure
+"""
+
+import logging
+import re
+import tempfile
+import threading
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from queue import Empty, Full, Queue
+from typing import Callable, ContextManager, Dict, Hashable, Iterable, List, Optional, Tuple, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+# End-of-stream marker passed through the queues
+SENTINEL = object()
+
+POLL_SECONDS = 0.5          # how often blocked stages check for a pipeline failure
+OBJECT_VALUE_BYTES = 64     # rough size of one Python object (str) in a DataFrame cell
+
+
+class PipelineAborted(Exception):
+    """Raised in a stage when another stage has failed"""
+
+
+def estimate_frame_bytes(df: pd.DataFrame) -> int:
+    """
+    Approximate memory of a DataFrame without a deep (per-object) scan.
+
+    Returns:
+        Shallow column sizes plus OBJECT_VALUE_BYTES per object cell
+    """
+    shallow = int(df.memory_usage(index=False).sum())
+    object_columns = sum(1 for dtype in df.dtypes if dtype == object)
+    return shallow + object_columns * len(df) * OBJECT_VALUE_BYTES
+
+
+class MemoryBudget:
+    """
+    Bytes in flight between stages, with blocking acquire.
+
+    acquire() waits while the budget is exhausted, except when nothing is
+    in flight, so a single item larger than the budget still passes. A
+    limit of None disables waiting (usage is still tracked).
+    """
+
+    def __init__(self, limit_bytes: Optional[int] = None):
+        self.limit = limit_bytes
+        self.in_use = 0
+        self.peak = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def _exhausted(self, size: int) -> bool:
+        return (self.limit is not None and not self._closed
+                and self.in_use > 0 and self.in_use + size > self.limit)
+
+    def acquire(self, size: int, wait: bool = True) -> None:
+        """
+        Reserve size bytes, waiting for downstream stages to release memory.
+
+        Only the first stage should wait: a stage that waits while holding
+        memory an upstream reservation depends on can deadlock the pipeline.
+        Later stages pass wait=False to account for what they hold.
+        """
+        with self._condition:
+            if wait and self._exhausted(size):
+                self.waits += 1
+                started = time.perf_counter()
+                while self._exhausted(size):
+                    self._condition.wait(POLL_SECONDS)
+                self.wait_seconds += time.perf_counter() - started
+            self.in_use += size
+            self.peak = max(self.peak, self.in_use)
+
+    def release(self, size: int) -> None:
+        with self._condition:
+            self.in_use -= size
+            self._condition.notify_all()
+
+    def close(self) -> None:
+        """Stop blocking (pipeline shutting down)"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class Pipeline:
+    """Stage threads connected by bounded queues, failing as a whole"""
+
+    def __init__(self, budget: Optional[MemoryBudget] = None,
+                 stage_context: Optional[Callable[[str], ContextManager]] = None):
+        """
+        Args:
+            budget: Memory shared by the stages (default: unlimited)
+            stage_context: Called with the stage name; each stage thread
+                runs inside the returned context (e.g. profile_thread)
+        """
+        self.budget = budget or MemoryBudget()
+        self.stage_context = stage_context or (lambda name: nullcontext())
+        self.error: Optional[BaseException] = None
+        self._stopped = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def queue(self, maxsize: int) -> Queue:
+        return Queue(maxsize=maxsize)
+
+    def put(self, q: Queue, item) -> None:
+        """Blocking put that gives up once the pipeline has failed"""
+        while True:
+            if self._stopped.is_set():
+                raise PipelineAborted()
+            try:
+                q.put(item, timeout=POLL_SECONDS)
+                return
+            except Full:
+                continue
+
+    def get(self, q: Queue):
+        """Blocking get that gives up once the pipeline has failed"""
+        while True:
+            if self._stopped.is_set():
+                raise PipelineAborted()
+            try:
+                return q.get(timeout=POLL_SECONDS)
+            except Empty:
+                continue
+
+    def fail(self, error: BaseException) -> None:
+        """Record the first failure and stop every stage"""
+        if self.error is None:
+            self.error = error
+        self._stopped.set()
+        self.budget.close()
+
+    @property
+    def failed(self) -> bool:
+        return self._stopped.is_set()
+
+    def spawn(self, name: str, target: Callable, *args) -> threading.Thread:
+        """Run a stage function in a thread; exceptions fail the pipeline"""
+        def run():
+            try:
+                with self.stage_context(name):
+                    target(*args)
+            except PipelineAborted:
+                pass
+            except BaseException as e:
+                logger.error(f"Stage {name} failed: {e}")
+                self.fail(e)
+
+        thread = threading.Thread(target=run, name=name, daemon=True)
+        self._threads.append(thread)
+        thread.start()
+        return thread
+
+    def join(self) -> None:
+        """Wait for every stage; re-raise the first failure"""
+        for thread in self._threads:
+            thread.join()
+        if self.error is not None:
+            raise self.error
+
+
+PART_FILENAME = re.compile(r'data(?:-(\d+))?\.parquet')
+
+
+def part_filename(part: int) -> str:
+    """File name of a partition's n-th data file (data.parquet, data-1.parquet, ...)"""
+    return 'data.parquet' if part == 0 else f'data-{part}.parquet'
+
+
+def stale_parts(filenames: Iterable[str], parts: int) -> List[str]:
+    """
+    Part files left by an earlier load that wrote more parts.
+
+    Part numbering restarts at data.parquet on every load, so a reload
+    overwrites parts 0..parts-1; any higher part is from the old load and
+    would be counted twice.
+
+    Args:
+        filenames: File names present in the partition
+        parts: Number of parts this load wrote
+
+    Returns:
+        Names of the parts numbered parts or higher
+    """
+    stale = []
+    for filename in filenames:
+        match = PART_FILENAME.fullmatch(filename)
+        if match and int(match.group(1) or 0) >= parts:
+            stale.append(filename)
+    return sorted(stale)
+
+
+@dataclass
+class ClosedFile:
+    """A finished partition data file ready for upload"""
+    key: Tuple                # (log_type, partition) or any partition key
+    filename: str
+    path: Path
+    rows: int
+
+
+class _OpenFile:
+    def __init__(self, path: Path, schema: pa.Schema, filename: str, write_options: Dict):
+        self.path = path
+        self.schema = schema
+        self.filename = filename
+        self.writer = pq.ParquetWriter(str(path), schema, **write_options)
+        self.rows = 0
+        self.last_batch = 0
+
+
+def _writable_schema(schema: pa.Schema) -> pa.Schema:
+    """All-null columns become strings so later batches with values still fit"""
+    return pa.schema([
+        pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f
+        for f in schema
+    ])
+
+
+def _conform(table: pa.Table, schema: pa.Schema) -> Optional[pa.Table]:
+    """Table cast to an open file's schema, or None if it does not fit"""
+    if not set(table.column_names) <= set(schema.names):
+        return None
+    columns = [
+        table.column(f.name) if f.name in table.column_names else pa.nulls(len(table), f.type)
+        for f in schema
+    ]
+    try:
+        return pa.Table.from_arrays(columns, names=schema.names).cast(schema)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+        return None
+
+
+class PartitionFiles:
+    """
+    Stream DataFrames into one Parquet file per partition key.
+
+    Each write appends row groups to the partition's open file. Files are
+    closed on request (close_idle / close_all) and returned for upload; a
+    partition written again after that, or whose schema drifts, continues in
+    its next part file (data-1.parquet, ...), so no rows are overwritten.
+    """
+
+    def __init__(self, row_group_size: int, write_options: Dict, compression: str = 'snappy',
+                 tmp_dir: Optional[Path] = None):
+        self.row_group_size = row_group_size
+        self.write_options = {**write_options, 'compression': compression}
+        self.tmp_dir = Path(tmp_dir) if tmp_dir else Path(tempfile.gettempdir())
+        self._open: Dict[Hashable, _OpenFile] = {}
+        self._next_part: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._open)
+
+    def parts(self) -> Dict[Hashable, int]:
+        """Number of part files started per partition key"""
+        return dict(self._next_part)
+
+    def _open_file(self, key: Hashable, schema: pa.Schema) -> _OpenFile:
+        part = self._next_part.get(key, 0)
+        self._next_part[key] = part + 1
+        with tempfile.NamedTemporaryFile(suffix='.parquet', dir=self.tmp_dir, delete=False) as tmp:
+            path = Path(tmp.name)
+        handle = _OpenFile(path, _writable_schema(schema), part_filename(part), self.write_options)
+        self._open[key] = handle
+        return handle
+
+    def _close(self, key: Hashable) -> ClosedFile:
+        handle = self._open.pop(key)
+        handle.writer.close()
+        return ClosedFile(key, handle.filename, handle.path, handle.rows)
+
+    def write(self, key: Hashable, df: Union[pd.DataFrame, pa.Table],
+              batch: int = 0) -> List[ClosedFile]:
+        """
+        Append a DataFrame (or Arrow table) to the partition's file.
+
+        Args:
+            key: Partition key
+            df: Rows of this partition
+            batch: Sequence number of the input batch (for close_idle)
+
+        Returns:
+            Files closed by a schema rollover (usually empty)
+        """
+        table = df if isinstance(df, pa.Table) else pa.Table.from_pandas(df, preserve_index=False)
+        closed = []
+        handle = self._open.get(key)
+        conformed = _conform(table, handle.schema) if handle else None
+        if handle is not None and conformed is None:
+            logger.info(f"  Schema changed for {key}; continuing in a new part file")
+            closed.append(self._close(key))
+            handle = None
+        if handle is None:
+            handle = self._open_file(key, table.schema)
+            conformed = _conform(table, handle.schema)
+        handle.writer.write_table(conformed, row_group_size=self.row_group_size)
+        handle.rows += len(table)
+        handle.last_batch = batch
+        return closed
+
+    def close_idle(self, batch: int, idle_batches: int) -> List[ClosedFile]:
+        """Close partitions that received no rows in the last idle_batches batches"""
+        idle = [k for k, h in self._open.items() if batch - h.last_batch >= idle_batches]
+        return [self._close(k) for k in idle]
+
+    def close_all(self) -> List[ClosedFile]:
+        return [self._close(k) for k in list(self._open)]
+
+    def discard(self) -> None:
+        """Close and delete every open file (after a failure)"""
+        for closed in self.close_all():
+            closed.path.unlink(missing_ok=True)
@@ -5,25 +5,27 @@ List all datasets in Dremio catalog
 This helps debug path issues when setting up reflections.
 """
 
-import requests
-import json
 import sys
-import getpass
+from pathlib import Path
 
-DREMIO_URL = "http://localhost:9047"
-DREMIO_USERNAME = "flying-coyote"
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from dremio_client import DremioAuthError, DremioClient
+from settings import get_settings
 
+DREMIO_URL = get_settings().dremio.url
+DREMIO_USERNAME = get_settings().dremio.username
 
-def login(url, username, password):
-    """Login to Dremio"""
-    auth_url = f"{url}/apiv2/login"
-    response = requests.post(auth_url, json={"userName": username, "password": password})
 
-    if response.status_code == 200:
-        return response.json()["token"]
-    else:
-        print(f"Login failed: {response.text}")
+def login(url, username):
+    """Login to Dremio (reuses a cached token, prompts only when needed)"""
+    client = DremioClient(url, username, interactive=True)
+    try:
+        client.login()
+    except DremioAuthError as e:
+        print(f"Login failed: {e}")
         sys.exit(1)
+    return client
 
 
 def list_catalog(session, url, path=None):
@@ -88,25 +90,18 @@ def main():
     print("Dremio Catalog Explorer")
     print("=" * 70)
 
-    password = getpass.getpass(f"Enter Dremio password for {DREMIO_USERNAME}: ")
-
     # Login
-    token = login(DREMIO_URL, DREMIO_USERNAME, password)
-
-    session = requests.Session()
-    session.headers.update({
-        "Authorization": f"_dremio{token}",
-        "Content-Type": "application/json"
-    })
+    session = login(DREMIO_URL, DREMIO_USERNAME)
 
-    print("\nExploring path: minio → zeek-data → network-activity-ocsf\n")
+    dataset_path = get_settings().dataset_path()
+    print(f"\nExploring path: {' → '.join(dataset_path)}\n")
 
-    explore_path(session, DREMIO_URL, ["minio", "zeek-data", "network-activity-ocsf"])
+    explore_path(session, DREMIO_URL, dataset_path)
 
     print("\n" + "=" * 70)
     print("\nIf 'network-activity-ocsf' is not found or shows as 'FOLDER':")
     print("1. It needs to be formatted as a Parquet dataset in Dremio")
-    print("2. Open: http://localhost:9047")
+    print(f"2. Open: {DREMIO_URL}")
     print("3. Navigate to: minio > zeek-data > network-activity-ocsf")
     print("4. Right-click (or click ⋮) → 'Format Folder' → Choose 'Parquet'")
 
@@ -11,27 +11,105 @@ Requirements:
 Usage:
     python3 scripts/load_real_zeek_to_ocsf.py --records 100000
     python3 scripts/load_real_zeek_to_ocsf.py --all  # Load all 1M records
+    python3 scripts/load_real_zeek_to_ocsf.py --file conn.json --file dns.json --all
+    python3 scripts/load_real_zeek_to_ocsf.py --all --refresh-reflections
+    python3 scripts/load_real_zeek_to_ocsf.py --all --rollups
+    python3 scripts/load_real_zeek_to_ocsf.py --all --anomaly-scoring
+    python3 scripts/load_real_zeek_to_ocsf.py --all --metrics-output results/ingest-metrics.json --profile cprofile
+    python3 scripts/load_real_zeek_to_ocsf.py --all --dead-letter results/dead-letter.parquet
+    python3 scripts/load_real_zeek_to_ocsf.py --all --workers 8 --upload-workers 8 --memory-budget 2048
+
+Input is streamed in batches through concurrent stages (see
+ingest_pipeline.py): the reader feeds transform worker processes, whose
+batches are enriched in order, split by day and appended to one Parquet
+file per partition while finished partitions upload in parallel. Memory
+held between stages is bounded by --memory-budget; the reader waits when
+downstream falls behind. Rows arriving for a partition already uploaded
+go to its next part file (data-1.parquet, ...).
+
+Each Zeek log type (dispatched on `_path`, or inferred from the file name)
+is written to its own folder, see `folders` in settings.py.
+
+With --anomaly-scoring, conn records get `risk_score` (0-100) and a raised
+`severity_id` for beaconing and unusual bytes out (see AnomalyScorer), so
+alerts are `WHERE severity_id >= 3`.
+
+With --rollups, small pre-aggregated tables (see ocsf_rollups.py) are
+written next to each raw partition for dashboards.
+
+Malformed lines and records that cannot be mapped are counted per cause
+and summarized at the end instead of logged one by one; --dead-letter keeps
+them (with error codes) for inspection and replay, see dead_letter.py.
+
+Per-stage wall/CPU time, records/s, bytes and peak RSS are logged at the
+end of every run (see ingest_metrics.py); --metrics-output saves them as
+JSON or Prometheus text, --metrics-port serves them while the load runs
+and --profile saves a cProfile/pyinstrument profile per run.
+
+Endpoints, credentials, the bucket layout, input paths and batch/row-group
+and pipeline sizes come from settings.py (config/settings.yaml or
+ZEEK_DEMO_* environment variables); the MinIO client is created on first
+upload, not at import.
+
+With --refresh-reflections the loaded datasets' metadata and reflections
+are refreshed in Dremio once the upload completes (DREMIO_PASSWORD or a
+cached token is used; the load still succeeds if Dremio is unreachable).
 """
 
 import argparse
 import json
 import logging
-from datetime import datetime
+import re
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
 from pathlib import Path
 import tempfile
-from typing import List, Dict
+from typing import Iterator, List, Dict, Optional, Tuple
 import pandas as pd
-import pyarrow as pa
 import pyarrow.parquet as pq
-import boto3
+from botocore.exceptions import ClientError
 import sys
 
 # Add scripts directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 from transform_zeek_to_ocsf_flat import (
-    transform_zeek_to_ocsf_flat,
-    validate_ocsf_compliance,
-    write_ocsf_parquet
+    LOG_TYPE_MAPPERS,
+    PARQUET_WRITE_OPTIONS,
+    transform_zeek_records,
+    validate_ocsf_compliance
+)
+from ocsf_enrichment import (
+    AnomalyScorer,
+    GeoIPEnricher,
+    NetworkBoundaryEnricher,
+    PassiveDNSEnricher,
+    apply_enrichments
+)
+from create_dremio_reflections import refresh_after_ingest
+from dead_letter import JSON_DECODE, NOT_AN_OBJECT, DeadLetterSink
+from ingest_metrics import (INGEST_METRICS, PROFILE_DIR, PROFILERS, IngestMetrics, StageMetrics,
+                            profile_run, profile_thread)
+from ingest_pipeline import (
+    SENTINEL,
+    ClosedFile,
+    MemoryBudget,
+    PartitionFiles,
+    Pipeline,
+    estimate_frame_bytes,
+    stale_parts
+)
+from ocsf_rollups import ROLLUP_LOG_TYPES, ROLLUPS, build_rollups, rollup_key, write_rollup
+from settings import get_settings, s3_client
+from uid_index import (
+    INDEX_SCHEMA,
+    UID_COLUMN,
+    build_uid_index,
+    index_key,
+    merge_uid_index,
+    partition_path,
+    write_uid_index
 )
 
 # Configure logging
@@ -41,28 +119,34 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# MinIO Configuration
-S3_CLIENT = boto3.client(
-    's3',
-    endpoint_url='http://localhost:9000',
-    aws_access_key_id='minioadmin',
-    aws_secret_access_key='minioadmin'
-)
-
-# Data Configuration
-ZEEK_DATA_DIR = Path("/home/jerem/splunk-db-connect-benchmark/data/samples")
-BUCKET = "zeek-data"
-FOLDER = "network-activity-ocsf"  # New folder for OCSF-compliant data
-BATCH_SIZE = 50000  # Process 50K records at a time
+# MinIO, Dremio, data paths and pipeline sizing: see settings.py
 
 
-def read_zeek_json(file_path: Path, limit: int = None) -> List[Dict]:
+def _parse_zeek_line(line: str, source: str, line_no: int,
+                     dead_letter: DeadLetterSink) -> Optional[Dict]:
+    """One NDJSON line as a Zeek record, or None (blank or dead-lettered)"""
+    if not line.strip():
+        return None
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as e:
+        dead_letter.add('unknown', JSON_DECODE, line, e, source, line_no)
+        return None
+    if not isinstance(record, dict):
+        dead_letter.add('unknown', NOT_AN_OBJECT, line, None, source, line_no)
+        return None
+    return record
+
+
+def read_zeek_json(file_path: Path, limit: int = None,
+                   dead_letter: Optional[DeadLetterSink] = None) -> List[Dict]:
     """
     Read Zeek conn logs from NDJSON file
 
     Args:
         file_path: Path to Zeek JSON file
         limit: Maximum number of records to read (None = all)
+        dead_letter: Sink for malformed lines (default: counted and summarized)
 
     Returns:
         List of Zeek log dictionaries
@@ -70,6 +154,7 @@ def read_zeek_json(file_path: Path, limit: int = None) -> List[Dict]:
     logger.info(f"Reading Zeek logs from {file_path.name}")
     logger.info(f"File size: {file_path.stat().st_size / 1024 / 1024:.1f} MB")
 
+    sink = dead_letter if dead_letter is not None else DeadLetterSink()
     records = []
     with open(file_path, 'r') as f:
         for i, line in enumerate(f):
@@ -79,71 +164,228 @@ def read_zeek_json(file_path: Path, limit: int = None) -> List[Dict]:
             if i > 0 and i % 100000 == 0:
                 logger.info(f"  Read {i:,} records...")
 
-            try:
-                record = json.loads(line.strip())
+            record = _parse_zeek_line(line, file_path.name, i + 1, sink)
+            if record is not None:
                 records.append(record)
-            except json.JSONDecodeError as e:
-                logger.warning(f"Skipping malformed JSON on line {i+1}: {e}")
-                continue
 
+    if dead_letter is None:
+        sink.log_summary()
     logger.info(f"✓ Read {len(records):,} Zeek records")
     return records
 
 
-def upload_partition_to_minio(df: pd.DataFrame, year: int, month: int, day: int) -> None:
+def iter_zeek_batches(file_path: Path, limit: int = None,
+                      batch_size: Optional[int] = None) -> Iterator[Tuple[int, List[str]]]:
     """
-    Write OCSF DataFrame to Parquet and upload to MinIO with partitioning
+    Raw NDJSON lines of a Zeek file in batches (parsing happens in the workers)
 
     Args:
-        df: OCSF-compliant DataFrame for this partition
-        year, month, day: Partition values
+        file_path: Path to Zeek JSON file
+        limit: Maximum number of lines to read (None = all)
+        batch_size: Lines per batch (default: ingest.batch_size setting)
+
+    Yields:
+        (1-based line number of the first line, lines)
     """
-    # Create temporary file
-    with tempfile.NamedTemporaryFile(suffix='.parquet', delete=False) as tmp:
-        tmp_path = Path(tmp.name)
+    batch_size = batch_size or get_settings().ingest.batch_size
+    with open(file_path, 'r') as f:
+        first, lines = 1, []
+        for i, line in enumerate(f):
+            if limit and i >= limit:
+                break
+            lines.append(line)
+            if len(lines) >= batch_size:
+                yield first, lines
+                first, lines = i + 2, []
+        if lines:
+            yield first, lines
 
-    try:
-        # Write to Parquet with OCSF optimizations
-        write_ocsf_parquet(df, tmp_path, compression='snappy')
 
-        # Upload to MinIO
-        key = f'{FOLDER}/year={year}/month={month:02d}/day={day:02d}/data.parquet'
-        S3_CLIENT.upload_file(str(tmp_path), BUCKET, key)
+def _quiet_worker() -> None:
+    """Worker process initializer: keep per-batch transform logging out of the run log"""
+    logging.getLogger('transform_zeek_to_ocsf_flat').setLevel(logging.WARNING)
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    """In-memory size of a DataFrame, including string contents"""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def transform_batch(lines: List[str], source: str, first_line: int, default_log_type: str,
+                    dead_letter_path: Optional[Path] = None
+                    ) -> Tuple[Dict[str, pd.DataFrame], DeadLetterSink, StageMetrics]:
+    """
+    Parse and transform one batch of NDJSON lines (runs in a worker process)
+
+    Args:
+        lines: Raw lines
+        source: File name, for dead letters
+        first_line: Line number of lines[0]
+        default_log_type: Log type for records without `_path`
+        dead_letter_path: Keep dead-lettered records (for merging into the run's sink)
+
+    Returns:
+        (OCSF DataFrame per log type, dead letters, transform timing)
+    """
+    metrics = IngestMetrics()
+    sink = DeadLetterSink(dead_letter_path, quiet=True)
+    with metrics.stage('transform', bytes_in=sum(map(len, lines))) as stage:
+        records = []
+        for offset, line in enumerate(lines):
+            record = _parse_zeek_line(line, source, first_line + offset, sink)
+            if record is not None:
+                records.append(record)
+        frames = transform_zeek_records(records, default_log_type, dead_letter=sink)
+        stage.records += len(records)
+    frames = {t: df for t, df in frames.items() if not df.empty}
+    # Measured after the timed block: a deep size scan is not transform work
+    stage.bytes_out = sum(frame_nbytes(df) for df in frames.values())
+    return frames, sink, stage
+
+
+def infer_log_type(file_path: Path, default: str = 'conn') -> str:
+    """
+    Infer the Zeek log type from a file name (e.g. dns.log, dns_100000.json)
+
+    Records carrying a `_path` field override this per record.
+    """
+    match = re.match(r'[a-z]+', file_path.name.lower())
+    stem = match.group(0) if match else ''
+    return stem if stem in LOG_TYPE_MAPPERS else default
+
+
+def split_partitions(df: pd.DataFrame) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """(partition path, rows) per event_date of an OCSF batch"""
+    for event_date, group_df in df.groupby('event_date', sort=True):
+        day = date.fromisoformat(str(event_date)[:10])
+        yield partition_path(day.year, day.month, day.day), group_df
+
+
+def upload_rollups(df: pd.DataFrame, log_type: str, partition: str,
+                   filename: str = 'data.parquet') -> None:
+    """Compute the ingest-time rollups of one data file and upload them next to it"""
+    settings = get_settings()
+    with INGEST_METRICS.stage('rollups', records=len(df)) as stage:
+        for name, rollup in build_rollups(df).items():
+            with tempfile.NamedTemporaryFile(suffix='.parquet', delete=False) as tmp:
+                tmp_path = Path(tmp.name)
+            try:
+                write_rollup(rollup, tmp_path)
+                key = rollup_key(settings.folders[log_type], name, partition, filename)
+                s3_client().upload_file(str(tmp_path), settings.minio.bucket, key)
+                stage.bytes_out += tmp_path.stat().st_size
+                logger.info(f"    ✓ Rollup {name}: {len(rollup):,} rows, "
+                            f"{tmp_path.stat().st_size / 1024:.1f} KB")
+            finally:
+                tmp_path.unlink(missing_ok=True)
+
+
+def upload_data_file(closed: ClosedFile, build_index: bool = False,
+                     rollups: bool = False) -> Optional[pd.DataFrame]:
+    """
+    Upload a finished partition file to MinIO
+
+    Args:
+        closed: File from the Parquet encoder, keyed (log_type, partition)
+        build_index: Also return uid index entries for the file
+        rollups: Also write ingest-time rollups (network activity only)
 
-        file_size_mb = tmp_path.stat().st_size / 1024 / 1024
-        logger.info(f"  ✓ Uploaded {key} ({len(df):,} records, {file_size_mb:.1f} MB)")
+    Returns:
+        uid index entries for the uploaded file if build_index is set
+    """
+    settings = get_settings()
+    log_type, partition = closed.key
+    key = f'{settings.folders[log_type]}/{partition}/{closed.filename}'
+    size = closed.path.stat().st_size
+    index = None
 
+    try:
+        with INGEST_METRICS.stage('upload', records=closed.rows) as stage:
+            s3_client().upload_file(str(closed.path), settings.minio.bucket, key)
+            stage.bytes_out += size
+        logger.info(f"  ✓ Uploaded {key} ({closed.rows:,} records, {size / 1024 / 1024:.1f} MB)")
+
+        if build_index:
+            with INGEST_METRICS.stage('uid_index', records=closed.rows):
+                # Only the uid column is needed, in written row order
+                columns = [UID_COLUMN] if UID_COLUMN in pq.read_schema(closed.path).names else []
+                uids = pq.read_table(closed.path, columns=columns).to_pandas()
+                index = build_uid_index(uids, log_type, partition, key, closed.path)
+
+        if rollups and log_type in ROLLUP_LOG_TYPES:
+            upload_rollups(pq.read_table(closed.path).to_pandas(), log_type, partition,
+                           closed.filename)
     finally:
-        tmp_path.unlink(missing_ok=True)
+        closed.path.unlink(missing_ok=True)
+
+    return index
 
 
-def load_to_minio(df: pd.DataFrame) -> None:
+def remove_stale_parts(log_type: str, partition: str, parts: int) -> List[str]:
     """
-    Partition OCSF DataFrame by date and upload to MinIO
+    Delete data files (and their rollups) of an earlier, larger load of a partition
 
     Args:
-        df: OCSF-compliant DataFrame with Zeek data
+        log_type: Zeek log type of the partition
+        partition: Partition path (year=/month=/day=)
+        parts: Number of part files this run uploaded to the partition
+
+    Returns:
+        Object keys of the deleted data files
     """
-    logger.info(f"Uploading {len(df):,} OCSF records to MinIO bucket: {BUCKET}/{FOLDER}")
+    settings = get_settings()
+    folder = settings.folders[log_type]
+    prefix = f'{folder}/{partition}/'
+    filenames = []
+    for page in s3_client().get_paginator('list_objects_v2').paginate(
+            Bucket=settings.minio.bucket, Prefix=prefix):
+        filenames.extend(obj['Key'][len(prefix):] for obj in page.get('Contents', []))
+
+    removed = []
+    for filename in stale_parts(filenames, parts):
+        keys = [prefix + filename]
+        if log_type in ROLLUP_LOG_TYPES:
+            keys += [rollup_key(folder, name, partition, filename) for name in ROLLUPS]
+        for key in keys:
+            s3_client().delete_object(Bucket=settings.minio.bucket, Key=key)
+        logger.info(f"  ✓ Removed stale {prefix + filename} from an earlier load")
+        removed.append(prefix + filename)
+    return removed
+
+
+def upload_uid_index(partition: str, entries: List[pd.DataFrame],
+                     removed_files: List[str] = ()) -> None:
+    """
+    Merge uid index entries into the partition's index object in MinIO
 
-    # Parse event_date for partitioning
-    df['_partition_date'] = pd.to_datetime(df['event_date'])
-    df['_year'] = df['_partition_date'].dt.year
-    df['_month'] = df['_partition_date'].dt.month
-    df['_day'] = df['_partition_date'].dt.day
+    Args:
+        partition: Partition path (year=/month=/day=)
+        entries: Index entries for files written in this run
+        removed_files: Data file keys deleted in this run (their entries are dropped)
+    """
+    key = index_key(partition)
+    bucket = get_settings().minio.bucket
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_path = Path(tmp_dir) / 'index.parquet'
 
-    # Drop temporary columns before upload
-    partition_cols = ['_partition_date', '_year', '_month', '_day']
+        existing = None
+        try:
+            s3_client().download_file(bucket, key, str(tmp_path))
+            existing = pd.read_parquet(tmp_path)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') not in ('404', 'NoSuchKey'):
+                raise
 
-    # Group and upload
-    partitions_count = 0
-    for (year, month, day), group_df in df.groupby(['_year', '_month', '_day']):
-        # Remove partition columns from data
-        data_df = group_df.drop(columns=partition_cols)
-        upload_partition_to_minio(data_df, int(year), int(month), int(day))
-        partitions_count += 1
+        if existing is None and not entries:
+            return
+        new = (pd.concat(entries, ignore_index=True) if entries
+               else pd.DataFrame(columns=INDEX_SCHEMA.names))
+        index = merge_uid_index(existing, new, removed_files)
+        write_uid_index(index, tmp_path)
+        s3_client().upload_file(str(tmp_path), bucket, key)
 
-    logger.info(f"✓ Upload complete - {partitions_count} partitions created")
+    logger.info(f"  ✓ Uploaded {key} ({len(index):,} uid entries)")
 
 
 def show_ocsf_sample_queries():
@@ -203,142 +445,292 @@ Sample OCSF Queries for Dremio:
     print(queries)
 
 
-def main():
-    """Main execution flow"""
-    parser = argparse.ArgumentParser(description='Load real Zeek data to OCSF-compliant MinIO')
-    parser.add_argument('--records', type=int, default=100000,
-                        help='Number of records to load (default: 100000)')
-    parser.add_argument('--all', action='store_true',
-                        help='Load all records from 1M record file')
-    parser.add_argument('--file', type=str,
-                        help='Specific Zeek JSON file to load')
-    parser.add_argument('--validate', action='store_true',
-                        help='Run OCSF compliance validation')
-    args = parser.parse_args()
+class LogTypeSummary:
+    """Running statistics of one log type for the end-of-run report"""
+
+    def __init__(self, log_type: str):
+        self.log_type = log_type
+        self.records = 0
+        self.fields = 0
+        self.first_date = None
+        self.last_date = None
+        self.protocols: Counter = Counter()
+        self.activities: Counter = Counter()
+
+    def update(self, df: pd.DataFrame) -> None:
+        if not self.records:
+            self._log_sample(df)
+        self.records += len(df)
+        self.fields = max(self.fields, len(df.columns))
+        dates = df['event_date'].dropna()
+        if len(dates):
+            self.first_date = min(filter(None, [self.first_date, dates.min()]))
+            self.last_date = max(filter(None, [self.last_date, dates.max()]))
+        if 'connection_info_protocol_name' in df.columns:
+            self.protocols.update(df['connection_info_protocol_name'].value_counts().to_dict())
+        if 'activity_name' in df.columns:
+            self.activities.update(df['activity_name'].value_counts().to_dict())
+
+    def _log_sample(self, df: pd.DataFrame) -> None:
+        logger.info(f"Sample OCSF-compliant {self.log_type} record:")
+        sample_fields = [
+            'class_uid', 'class_name',
+            'src_endpoint_ip', 'src_endpoint_port',
+            'dst_endpoint_ip', 'dst_endpoint_port',
+            'traffic_bytes_in', 'traffic_bytes_out',
+            'connection_info_protocol_name',
+            'activity_name', 'metadata_product_name'
+        ]
+        for field in sample_fields:
+            if field in df.columns:
+                logger.info(f"  {field}: {df[field].iloc[0]}")
 
+    def log(self) -> None:
+        logger.info(f"--- {self.log_type} → {get_settings().folders[self.log_type]} ---")
+        logger.info("OCSF Data Statistics:")
+        logger.info(f"  Total records: {self.records:,}")
+        logger.info(f"  OCSF fields: {self.fields}")
+        logger.info(f"  Date range: {self.first_date} to {self.last_date}")
+        for title, counts in (("Top protocols", self.protocols), ("Top activities", self.activities)):
+            if counts:
+                logger.info(f"  {title}:")
+                for name, count in counts.most_common(5):
+                    logger.info(f"    {name}: {count:,} ({count / self.records * 100:.1f}%)")
+
+
+def run_pipeline(args, dead_letter: DeadLetterSink) -> int:
+    """Read, transform, enrich and upload as concurrent stages; returns the exit code"""
     logger.info("=" * 70)
     logger.info("Real Zeek Data → OCSF-Compliant Parquet → MinIO Loader")
     logger.info("=" * 70)
     logger.info("Using pragmatic flat schema with OCSF field semantics")
     logger.info("")
 
+    settings = get_settings()
+    ingest = settings.ingest
     try:
+        limit = None if args.all else args.records
+
         # Find Zeek files
         if args.file:
-            zeek_file = Path(args.file)
-            if not zeek_file.exists():
-                logger.error(f"File not found: {zeek_file}")
-                return 1
+            zeek_files = [Path(f) for f in args.file]
+            for zeek_file in zeek_files:
+                if not zeek_file.exists():
+                    logger.error(f"File not found: {zeek_file}")
+                    return 1
         else:
             # Use the 1M record file if --all, otherwise 100K file
             if args.all:
                 pattern = "zeek_1000000_*.json"
-                limit = None
             else:
                 pattern = "zeek_100000_*.json"
-                limit = args.records
 
-            zeek_files = list(ZEEK_DATA_DIR.glob(pattern))
+            data_dir = settings.paths.zeek_data_dir
+            zeek_files = list(data_dir.glob(pattern))
             if not zeek_files:
                 # Try alternative location
-                alt_dir = Path("/home/jerem/zeek-iceberg-demo/data")
+                alt_dir = settings.paths.demo_data_dir
                 zeek_files = list(alt_dir.glob(pattern))
                 if not zeek_files:
                     logger.error(f"No Zeek files found matching {pattern}")
-                    logger.error(f"Searched: {ZEEK_DATA_DIR} and {alt_dir}")
+                    logger.error(f"Searched: {data_dir} and {alt_dir}")
                     return 1
 
-            zeek_file = zeek_files[0]
-
-        logger.info(f"Source file: {zeek_file}")
+            zeek_files = zeek_files[:1]
+
+        # Passive DNS resolves from answers seen so far: stream dns files first
+        zeek_files.sort(key=lambda f: infer_log_type(f) != 'dns')
+
+        # Optional enrichment stages applied to every transformed batch
+        enrichment_stages = []
+        if args.geoip_db:
+            enrichment_stages.append(GeoIPEnricher([Path(p) for p in args.geoip_db]))
+        if args.local_networks:
+            enrichment_stages.append(NetworkBoundaryEnricher(args.local_networks.split(',')))
+        passive_dns = PassiveDNSEnricher(args.passive_dns_window) if args.passive_dns else None
+        # Baselines are per connection tuple; score network activity only
+        anomaly_scorer = AnomalyScorer() if args.anomaly_scoring else None
+
+        budget = MemoryBudget(args.memory_budget * 1024 * 1024 if args.memory_budget else None)
+        pipeline = Pipeline(budget, stage_context=profile_thread)
+        executor = (ProcessPoolExecutor(args.workers, initializer=_quiet_worker)
+                    if args.workers > 0 else None)
+        batches = pipeline.queue(max(ingest.queue_depth, 2 * args.workers))
+        partitions = pipeline.queue(ingest.queue_depth)
+        files = pipeline.queue(ingest.queue_depth * args.upload_workers)
+
+        summaries: Dict[str, LogTypeSummary] = {}
+        uid_index_entries: Dict[str, List[pd.DataFrame]] = {}
+        written_parts: Dict[Tuple[str, str], int] = {}
+        index_lock = threading.Lock()
+
+        # Step 1: Read raw lines; blocks while the memory budget is exhausted
+        def read_stage():
+            for zeek_file in zeek_files:
+                logger.info(f"Source file: {zeek_file} ({zeek_file.stat().st_size / 1024 / 1024:.1f} MB)")
+                default_log_type = infer_log_type(zeek_file)
+                for first_line, lines in INGEST_METRICS.timed(
+                        'read', iter_zeek_batches(zeek_file, limit, ingest.batch_size),
+                        lambda batch: (len(batch[1]), sum(map(len, batch[1])))):
+                    size = sum(map(len, lines))
+                    budget.acquire(size)
+                    work = (lines, zeek_file.name, first_line, default_log_type, dead_letter.path)
+                    if executor is not None:
+                        work = executor.submit(transform_batch, *work)
+                    pipeline.put(batches, (work, size))
+            pipeline.put(batches, SENTINEL)
+
+        # Step 2 & 3: Transform (worker processes, consumed in order), enrich,
+        # validate and split by day
+        def enrich_stage():
+            sequence = 0
+            while (item := pipeline.get(batches)) is not SENTINEL:
+                work, size = item
+                frames, sink, timing = work.result() if executor else transform_batch(*work)
+                INGEST_METRICS.add(timing)
+                dead_letter.merge(sink)
+                budget.release(size)
+                sequence += 1
+
+                for log_type, df in sorted(frames.items(), key=lambda kv: kv[0] != 'dns'):
+                    stages = list(enrichment_stages)
+                    if passive_dns is not None and log_type != 'dns':
+                        stages.append(passive_dns)
+                    if anomaly_scorer is not None and log_type == 'conn':
+                        stages.append(anomaly_scorer)
+                    if stages:
+                        with INGEST_METRICS.stage('enrich', records=len(df), bytes_in=frame_nbytes(df)):
+                            df = apply_enrichments(df, stages)
+                        INGEST_METRICS.add(StageMetrics('enrich', bytes_out=frame_nbytes(df)))
+                    if passive_dns is not None and log_type == 'dns':
+                        passive_dns.observe(df)
+
+                    if args.validate:
+                        compliance = validate_ocsf_compliance(df, log_type)
+                        if not compliance.get('overall_compliance'):
+                            failed = sorted(c for c, ok in compliance.items() if not ok)
+                            raise ValueError(f"OCSF compliance validation failed for {log_type}: "
+                                             f"{', '.join(failed)}")
+
+                    summaries.setdefault(log_type, LogTypeSummary(log_type)).update(df)
+                    for partition, part_df in split_partitions(df):
+                        part_size = estimate_frame_bytes(part_df)
+                        budget.acquire(part_size, wait=False)
+                        pipeline.put(partitions, (sequence, log_type, partition, part_df, part_size))
+            pipeline.put(partitions, SENTINEL)
+
+        # Step 4a: Encode one Parquet file per partition, closing days the input has moved past
+        def encode_stage():
+            writer = PartitionFiles(ingest.row_group_size, PARQUET_WRITE_OPTIONS,
+                                    compression=ingest.compression)
+            try:
+                while (item := pipeline.get(partitions)) is not SENTINEL:
+                    sequence, log_type, partition, part_df, part_size = item
+                    with INGEST_METRICS.stage('encode', records=len(part_df)):
+                        closed = writer.write((log_type, partition), part_df, sequence)
+                        closed += writer.close_idle(sequence, ingest.partition_idle_batches)
+                    budget.release(part_size)
+                    for closed_file in closed:
+                        INGEST_METRICS.add(StageMetrics('encode', bytes_out=closed_file.path.stat().st_size))
+                        pipeline.put(files, closed_file)
+                for closed_file in writer.close_all():
+                    INGEST_METRICS.add(StageMetrics('encode', bytes_out=closed_file.path.stat().st_size))
+                    pipeline.put(files, closed_file)
+                written_parts.update(writer.parts())
+            finally:
+                writer.discard()
+            for _ in range(args.upload_workers):
+                pipeline.put(files, SENTINEL)
+
+        # Step 4b: Upload finished files (several in parallel)
+        def upload_stage():
+            while (closed_file := pipeline.get(files)) is not SENTINEL:
+                if pipeline.failed:
+                    closed_file.path.unlink(missing_ok=True)
+                    continue
+                index = upload_data_file(closed_file, build_index=not args.no_uid_index,
+                                         rollups=args.rollups)
+                if index is not None:
+                    with index_lock:
+                        uid_index_entries.setdefault(closed_file.key[1], []).append(index)
+
+        logger.info(f"Streaming {len(zeek_files)} file(s): batches of {ingest.batch_size:,} lines, "
+                    f"{args.workers or 'no'} transform workers, {args.upload_workers} uploaders, "
+                    f"memory budget {f'{args.memory_budget:,} MB' if args.memory_budget else 'off'}")
         logger.info(f"Record limit: {limit if limit else 'ALL'}")
         logger.info("")
-
-        # Step 1: Read Zeek data
-        zeek_records = read_zeek_json(zeek_file, limit=limit)
-
-        if not zeek_records:
-            logger.error("No records read from file")
-            return 1
-
-        # Step 2: Transform to OCSF-compliant schema
-        logger.info("Applying OCSF transformation...")
-        df = transform_zeek_to_ocsf_flat(zeek_records)
-
-        if df.empty:
+        try:
+            pipeline.spawn('read', read_stage)
+            pipeline.spawn('enrich', enrich_stage)
+            pipeline.spawn('encode', encode_stage)
+            for i in range(args.upload_workers):
+                pipeline.spawn(f'upload-{i}', upload_stage)
+            pipeline.join()
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+            # Files encoded but not uploaded when a stage failed
+            while not files.empty():
+                leftover = files.get_nowait()
+                if leftover is not SENTINEL:
+                    leftover.path.unlink(missing_ok=True)
+
+        if budget.waits:
+            logger.info(f"Backpressure: reader waited {budget.waits:,} times "
+                        f"({budget.wait_seconds:.1f}s) for the memory budget")
+        logger.info(f"Peak memory in flight between stages: {budget.peak / 1024 / 1024:.0f} MB")
+
+        if not summaries:
             logger.error("No records after OCSF transformation")
             return 1
 
-        # Step 3: Validate OCSF compliance
-        if args.validate:
+        # Step 5: Part numbering restarts at data.parquet, so delete parts of an
+        # earlier load of the same days that this run did not overwrite
+        removed_files: Dict[str, List[str]] = {}
+        for (log_type, partition), parts in sorted(written_parts.items()):
+            removed = remove_stale_parts(log_type, partition, parts)
+            if removed:
+                removed_files.setdefault(partition, []).extend(removed)
+
+        # Step 6: Maintain the uid join index alongside the data
+        if uid_index_entries or removed_files:
+            partitions_to_index = sorted(set(uid_index_entries) | set(removed_files))
             logger.info("")
-            logger.info("Validating OCSF compliance...")
-            compliance = validate_ocsf_compliance(df)
-            for check, result in sorted(compliance.items()):
-                status = "✓" if result else "✗"
-                logger.info(f"  {status} {check}: {result}")
-
-            if not compliance.get('overall_compliance'):
-                logger.error("OCSF compliance validation failed!")
-                return 1
+            logger.info(f"Updating uid index for {len(partitions_to_index)} partitions...")
+            for partition in partitions_to_index:
+                with INGEST_METRICS.stage('uid_index'):
+                    upload_uid_index(partition, uid_index_entries.get(partition, []),
+                                     removed_files.get(partition, []))
+
+        # Step 7: Let Dremio materialize the new partitions now, not at the next schedule
+        if args.refresh_reflections:
             logger.info("")
+            logger.info("Refreshing Dremio reflections...")
+            failed = refresh_after_ingest([settings.dataset_path(log_type) for log_type in summaries])
+            if failed:
+                logger.warning(f"Reflection refresh not triggered for {failed} dataset(s)")
 
-        # Show sample OCSF record
-        logger.info("Sample OCSF-compliant record:")
-        sample_fields = [
-            'class_uid', 'class_name',
-            'src_endpoint_ip', 'src_endpoint_port',
-            'dst_endpoint_ip', 'dst_endpoint_port',
-            'traffic_bytes_in', 'traffic_bytes_out',
-            'connection_info_protocol_name',
-            'activity_name', 'metadata_product_name'
-        ]
-        sample_record = {}
-        for field in sample_fields:
-            if field in df.columns:
-                sample_record[field] = df[field].iloc[0]
-        for key, value in sample_record.items():
-            logger.info(f"  {key}: {value}")
-        logger.info("")
-
-        # Show statistics
-        logger.info("OCSF Data Statistics:")
-        logger.info(f"  Total records: {len(df):,}")
-        logger.info(f"  OCSF fields: {len(df.columns)}")
-        logger.info(f"  Date range: {df['event_date'].min()} to {df['event_date'].max()}")
-
-        # Protocol distribution
-        if 'connection_info_protocol_name' in df.columns:
-            proto_counts = df['connection_info_protocol_name'].value_counts().head(5)
-            logger.info("  Top protocols:")
-            for proto, count in proto_counts.items():
-                logger.info(f"    {proto}: {count:,} ({count/len(df)*100:.1f}%)")
-
-        # Activity distribution
-        if 'activity_name' in df.columns:
-            activity_counts = df['activity_name'].value_counts().head(5)
-            logger.info("  Top activities:")
-            for activity, count in activity_counts.items():
-                logger.info(f"    {activity}: {count:,} ({count/len(df)*100:.1f}%)")
-        logger.info("")
-
-        # Step 4: Upload to MinIO
-        load_to_minio(df)
+        total_records = sum(s.records for s in summaries.values())
 
         logger.info("")
+        for summary in summaries.values():
+            summary.log()
+            logger.info("")
         logger.info("=" * 70)
         logger.info("✓ OCSF Pipeline completed successfully!")
         logger.info("=" * 70)
         logger.info("")
         logger.info("Next steps:")
-        logger.info("1. Open Dremio: http://localhost:9047")
-        logger.info("2. Navigate to: minio > zeek-data > network-activity-ocsf")
+        logger.info(f"1. Open Dremio: {settings.dremio.url}")
+        logger.info(f"2. Navigate to: {settings.dremio.source} > {settings.minio.bucket} > "
+                    f"{settings.folders['conn']}")
         logger.info("3. Format folder as Parquet")
         logger.info("4. Run OCSF queries (examples below)")
         logger.info("")
-        logger.info(f"Total OCSF records loaded: {len(df):,}")
-        logger.info(f"OCSF fields implemented: {len(df.columns)}")
-        logger.info(f"Storage location: s3://{BUCKET}/{FOLDER}/")
+        logger.info(f"Total OCSF records loaded: {total_records:,}")
+        for log_type, summary in summaries.items():
+            logger.info(f"  {log_type}: {summary.records:,} records, {summary.fields} fields "
+                        f"→ s3://{settings.minio.bucket}/{settings.folders[log_type]}/")
         logger.info("")
 
         # Show sample queries
@@ -351,6 +743,88 @@ def main():
         return 1
 
 
+def main():
+    """Main execution flow"""
+    try:
+        ingest = get_settings().ingest
+    except (OSError, ValueError) as e:
+        logger.error(f"Invalid settings: {e}")
+        return 1
+
+    parser = argparse.ArgumentParser(description='Load real Zeek data to OCSF-compliant MinIO')
+    parser.add_argument('--records', type=int, default=100000,
+                        help='Number of records to load (default: 100000)')
+    parser.add_argument('--all', action='store_true',
+                        help='Load all records from 1M record file')
+    parser.add_argument('--file', type=str, action='append',
+                        help='Specific Zeek JSON file to load (repeat for several log types)')
+    parser.add_argument('--validate', action='store_true',
+                        help='Run OCSF compliance validation')
+    parser.add_argument('--no-uid-index', action='store_true',
+                        help='Skip maintaining the per-day uid join index')
+    parser.add_argument('--geoip-db', type=str, action='append',
+                        help='IP range database CSV (MaxMind GeoLite2 or start_ip,end_ip) '
+                             'for country/ASN enrichment (repeatable)')
+    parser.add_argument('--local-networks', type=str,
+                        help='Comma-separated local CIDRs for is_local/direction/boundary '
+                             'enrichment (e.g. 10.0.0.0/8,192.168.0.0/16)')
+    parser.add_argument('--passive-dns', action='store_true',
+                        help='Fill endpoint hostnames from dns answers loaded in the same run')
+    parser.add_argument('--passive-dns-window', type=int, default=3600,
+                        help='Seconds a DNS answer is trusted for hostname enrichment (default: 3600)')
+    parser.add_argument('--anomaly-scoring', action='store_true',
+                        help='Score conn records for beaconing and exfil (risk_score, severity_id)')
+    parser.add_argument('--rollups', action='store_true',
+                        help='Write hourly/daily rollups and distinct-IP sketches next to the raw data')
+    parser.add_argument('--refresh-reflections', action='store_true',
+                        help='Refresh Dremio metadata and reflections of the loaded datasets after upload')
+    parser.add_argument('--workers', type=int, default=ingest.transform_workers,
+                        help=f'Transform worker processes, 0 to transform in-process '
+                             f'(default: {ingest.transform_workers})')
+    parser.add_argument('--upload-workers', type=int, default=ingest.upload_workers,
+                        help=f'Concurrent uploads (default: {ingest.upload_workers})')
+    parser.add_argument('--memory-budget', type=int, default=ingest.memory_budget_mb,
+                        help=f'MB of batches in flight before reading pauses, 0 for no limit '
+                             f'(default: {ingest.memory_budget_mb})')
+    parser.add_argument('--dead-letter', type=Path,
+                        help='Write unreadable/unmappable records here (.ndjson or .parquet)')
+    parser.add_argument('--metrics-output', type=Path,
+                        help='Write per-stage ingest metrics (.json, or .prom for Prometheus text)')
+    parser.add_argument('--metrics-port', type=int,
+                        help='Serve Prometheus metrics on this port while the load runs')
+    parser.add_argument('--profile', choices=PROFILERS,
+                        help='Profile the run, all stages (cprofile, or pyinstrument if installed); '
+                             'implies --workers 0')
+    parser.add_argument('--profile-dir', type=Path, default=PROFILE_DIR,
+                        help=f'Directory for per-run profiles (default: {PROFILE_DIR})')
+    args = parser.parse_args()
+
+
+    if args.metrics_port:
+        INGEST_METRICS.serve(args.metrics_port)
+
+    if args.profile and args.workers > 0:
+        # Worker processes are invisible to the profiler
+        logger.info(f"Profiling: transforming in-process (--workers 0 instead of {args.workers}) "
+                    "so the profile includes the transform")
+        args.workers = 0
+
+    dead_letter = DeadLetterSink(args.dead_letter)
+    try:
+        with profile_run(args.profile, args.profile_dir):
+            status = run_pipeline(args, dead_letter)
+    except RuntimeError as e:
+        logger.error(str(e))
+        return 1
+    finally:
+        dead_letter.close()
+
+    logger.info("")
+    logger.info("Ingest stages:")
+    INGEST_METRICS.log_summary()
+    if args.metrics_output:
+        INGEST_METRICS.write(args.metrics_output)
+    return status
+
 if __name__ == "__main__":
-    import sys
     sys.exit(main())
\ No newline at end of file
@@ -3,7 +3,8 @@
 Load Real Zeek Data → Parquet → MinIO
 
 Bypasses Hive Metastore (auth issues) and writes directly to MinIO.
-Works with the proven MinIO + Dremio direct S3 architecture.
+Works with the proven MinIO + Dremio direct S3 architecture. Endpoints,
+bucket, input directory and Parquet settings come from settings.py.
 
 Requirements:
     pip install pyarrow pandas boto3
@@ -23,7 +24,12 @@ from typing import List, Dict
 import pandas as pd
 import pyarrow as pa
 import pyarrow.parquet as pq
-import boto3
+import sys
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from dead_letter import JSON_DECODE, NOT_AN_OBJECT, DeadLetterSink
+from settings import get_settings, s3_client
 
 # Configure logging
 logging.basicConfig(
@@ -32,19 +38,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# MinIO Configuration
-S3_CLIENT = boto3.client(
-    's3',
-    endpoint_url='http://localhost:9000',
-    aws_access_key_id='minioadmin',
-    aws_secret_access_key='minioadmin'
-)
-
-# Data Configuration
-ZEEK_DATA_DIR = Path("/home/jerem/splunk-db-connect-benchmark/data/samples")
-BUCKET = "zeek-data"
+# Bucket folder for the legacy flat (non-OCSF) schema; MinIO and paths: see settings.py
 FOLDER = "network-activity-real"
-BATCH_SIZE = 50000  # Process 50K records at a time
 
 
 def read_zeek_json(file_path: Path, limit: int = None) -> List[Dict]:
@@ -61,6 +56,7 @@ def read_zeek_json(file_path: Path, limit: int = None) -> List[Dict]:
     logger.info(f"Reading Zeek logs from {file_path.name}")
     logger.info(f"File size: {file_path.stat().st_size / 1024 / 1024:.1f} MB")
 
+    dead_letter = DeadLetterSink()
     records = []
     with open(file_path, 'r') as f:
         for i, line in enumerate(f):
@@ -70,13 +66,19 @@ def read_zeek_json(file_path: Path, limit: int = None) -> List[Dict]:
             if i > 0 and i % 100000 == 0:
                 logger.info(f"  Read {i:,} records...")
 
+            if not line.strip():
+                continue
             try:
-                record = json.loads(line.strip())
-                records.append(record)
+                record = json.loads(line)
             except json.JSONDecodeError as e:
-                logger.warning(f"Skipping malformed JSON on line {i+1}: {e}")
+                dead_letter.add('conn', JSON_DECODE, line, e, file_path.name, i + 1)
                 continue
+            if isinstance(record, dict):
+                records.append(record)
+            else:
+                dead_letter.add('conn', NOT_AN_OBJECT, line, None, file_path.name, i + 1)
 
+    dead_letter.log_summary()
     logger.info(f"✓ Read {len(records):,} Zeek records")
     return records
 
@@ -95,6 +97,7 @@ def transform_zeek_to_flat_schema(zeek_records: List[Dict]) -> pd.DataFrame:
     """
     logger.info("Transforming Zeek records to Parquet schema")
 
+    dead_letter = DeadLetterSink()
     transformed = []
 
     for record in zeek_records:
@@ -131,9 +134,9 @@ def transform_zeek_to_flat_schema(zeek_records: List[Dict]) -> pd.DataFrame:
             transformed.append(flat_record)
 
         except Exception as e:
-            logger.warning(f"Error transforming record: {e}")
-            continue
+            dead_letter.add_error('conn', e, record)
 
+    dead_letter.log_summary()
     df = pd.DataFrame(transformed)
     logger.info(f"✓ Transformed {len(df):,} records")
     return df
@@ -147,6 +150,8 @@ def upload_partition_to_minio(df: pd.DataFrame, year: int, month: int, day: int)
         df: DataFrame for this partition
         year, month, day: Partition values
     """
+    settings = get_settings()
+
     # Create temporary file
     with tempfile.NamedTemporaryFile(suffix='.parquet', delete=False) as tmp:
         tmp_path = Path(tmp.name)
@@ -157,14 +162,15 @@ def upload_partition_to_minio(df: pd.DataFrame, year: int, month: int, day: int)
         pq.write_table(
             table,
             tmp_path,
-            compression='snappy',
+            compression=settings.ingest.compression,
+            row_group_size=settings.ingest.row_group_size,
             use_dictionary=True,
             write_statistics=True
         )
 
         # Upload to MinIO
         key = f'{FOLDER}/year={year}/month={month:02d}/day={day:02d}/data.parquet'
-        S3_CLIENT.upload_file(str(tmp_path), BUCKET, key)
+        s3_client().upload_file(str(tmp_path), settings.minio.bucket, key)
 
         file_size_mb = tmp_path.stat().st_size / 1024 / 1024
         logger.info(f"  ✓ Uploaded {key} ({len(df):,} records, {file_size_mb:.1f} MB)")
@@ -180,7 +186,7 @@ def load_to_minio(df: pd.DataFrame) -> None:
     Args:
         df: DataFrame with Zeek data
     """
-    logger.info(f"Uploading {len(df):,} records to MinIO bucket: {BUCKET}/{FOLDER}")
+    logger.info(f"Uploading {len(df):,} records to MinIO bucket: {get_settings().minio.bucket}/{FOLDER}")
 
     # Group by date partition
     df['_partition_date'] = pd.to_datetime(df['event_date'])
@@ -216,6 +222,8 @@ def main():
     logger.info("=" * 70)
 
     try:
+        settings = get_settings()
+
         # Find Zeek files
         if args.file:
             zeek_file = Path(args.file)
@@ -231,9 +239,10 @@ def main():
                 pattern = "zeek_100000_*.json"
                 limit = args.records
 
-            zeek_files = list(ZEEK_DATA_DIR.glob(pattern))
+            data_dir = settings.paths.zeek_data_dir
+            zeek_files = list(data_dir.glob(pattern))
             if not zeek_files:
-                logger.error(f"No Zeek files found matching {pattern} in {ZEEK_DATA_DIR}")
+                logger.error(f"No Zeek files found matching {pattern} in {data_dir}")
                 return 1
 
             zeek_file = zeek_files[0]
@@ -276,14 +285,15 @@ def main():
         logger.info("=" * 70)
         logger.info("")
         logger.info("Next steps:")
-        logger.info("1. Open Dremio: http://localhost:9047")
-        logger.info("2. Navigate to: minio > zeek-data > network-activity-real")
+        source, bucket = settings.dremio.source, settings.minio.bucket
+        logger.info(f"1. Open Dremio: {settings.dremio.url}")
+        logger.info(f"2. Navigate to: {source} > {bucket} > {FOLDER}")
         logger.info("3. Format folder as Parquet")
         logger.info("4. Run query:")
-        logger.info(f'   SELECT * FROM minio."zeek-data"."network-activity-real" LIMIT 10;')
+        logger.info(f'   SELECT * FROM {source}."{bucket}"."{FOLDER}" LIMIT 10;')
         logger.info("")
         logger.info(f"Total records loaded: {len(df):,}")
-        logger.info(f"Storage location: s3://{BUCKET}/{FOLDER}/")
+        logger.info(f"Storage location: s3://{bucket}/{FOLDER}/")
 
         return 0
 
@@ -2,6 +2,7 @@
 """
 Zeek → OCSF → Iceberg Loader (Standalone Python)
 Alternative to Spark pipeline - uses PyIceberg directly
+Metastore, warehouse, MinIO and data directory come from settings.py
 
 Requirements:
     pip install pyiceberg[s3fs,hive] pyarrow pandas
@@ -12,6 +13,7 @@ Usage:
 
 import json
 import logging
+import sys
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict
@@ -26,6 +28,10 @@ from pyiceberg.types import (
 from pyiceberg.partitioning import PartitionSpec, PartitionField
 from pyiceberg.transforms import DayTransform
 
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from settings import get_settings
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -262,16 +268,17 @@ def load_to_iceberg(df: pd.DataFrame, catalog_name: str = "demo",
     logger.info(f"Loading {len(df):,} records to Iceberg table {catalog_name}.{database}.{table}")
 
     # Load catalog configuration
-    # Note: Using localhost because script runs on host, not in Docker network
+    # Note: the default endpoints are localhost because the script runs on the host
+    settings = get_settings()
     catalog = load_catalog(
         catalog_name,
         **{
             "type": "hive",
-            "uri": "thrift://localhost:9083",
-            "warehouse": "s3a://iceberg-warehouse/",
-            "s3.endpoint": "http://localhost:9000",
-            "s3.access-key-id": "minioadmin",
-            "s3.secret-access-key": "minioadmin",
+            "uri": settings.iceberg.metastore_uri,
+            "warehouse": settings.iceberg.warehouse,
+            "s3.endpoint": settings.minio.endpoint,
+            "s3.access-key-id": settings.minio.access_key,
+            "s3.secret-access-key": settings.minio.secret_key,
             "s3.path-style-access": "true",
         }
     )
@@ -329,7 +336,7 @@ def main():
     logger.info("=" * 60)
 
     # Configuration
-    DATA_DIR = Path("/home/jerem/zeek-iceberg-demo/data")
+    DATA_DIR = get_settings().paths.demo_data_dir
     SAMPLE_SIZE = 10000  # Start with 10K records for testing
 
     # Find Zeek JSON files
@@ -370,7 +377,7 @@ def main():
         logger.info("=" * 60)
         logger.info("")
         logger.info("Next steps:")
-        logger.info("1. Open Dremio: http://localhost:9047")
+        logger.info(f"1. Open Dremio: {get_settings().dremio.url}")
         logger.info("2. Navigate to: hive_metastore.security_data.network_activity")
         logger.info("3. Run query: SELECT * FROM hive_metastore.security_data.network_activity LIMIT 10;")
 
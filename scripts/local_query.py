@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Local OCSF Query Engine (no Dremio required)
+
+Runs the OCSF sample queries directly against the year=/month=/day=
+Parquet layout written by the loaders, either in MinIO or in a local
+mirror of the bucket (e.g. `mc mirror local/zeek-data ./zeek-data`):
+
+- With DuckDB installed, any SQL from the query catalog (or --sql) runs as
+  written for Dremio: minio."zeek-data"."<folder>" references are mapped to
+  the local datasets and FROM_UNIXTIME is provided as a macro.
+- Without DuckDB, the show_ocsf_sample_queries set is implemented on
+  pyarrow.dataset (filters and aggregations in Arrow compute).
+
+Either way, --from/--to prune whole year=/month=/day= partitions before any
+file is opened, and column filters are pushed down to Parquet row-group
+statistics.
+
+Requirements:
+    pip install pyarrow pandas
+    pip install duckdb  # optional: arbitrary SQL
+
+Usage:
+    python3 scripts/local_query.py --list
+    python3 scripts/local_query.py sample_top_talkers --local-root ./zeek-data
+    python3 scripts/local_query.py sample_hourly --from 2023-11-13 --to 2023-11-13
+    python3 scripts/local_query.py pruning_day_egress --param day=2023-11-13  # DuckDB
+    python3 scripts/local_query.py --sql 'SELECT COUNT(*) FROM minio."zeek-data"."network-activity-ocsf"'
+"""
+
+import argparse
+import json
+import logging
+import re
+import sys
+import time
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from settings import MinioSettings, get_settings
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+logger = logging.getLogger(__name__)
+
+# Query Configuration (dataset folders and MinIO: see settings.py)
+DEFAULT_CATALOG = Path(__file__).parent.parent / "config" / "benchmarks" / "ocsf_queries.json"
+PARTITIONING = ds.partitioning(
+    pa.schema([('year', pa.int32()), ('month', pa.int32()), ('day', pa.int32())]),
+    flavor='hive'
+)
+PRINT_ROWS = 50
+
+# COUNT(*) semantics for group_by counts (the default mode skips nulls)
+COUNT_ALL = pc.CountOptions(mode='all')
+
+
+def dremio_table_pattern(source: str, bucket: str) -> re.Pattern:
+    """Matches Dremio table references (minio."zeek-data"."<folder>") in catalog SQL"""
+    return re.compile(re.escape(source) + r'\s*\.\s*"?' + re.escape(bucket) + r'"?\s*\.\s*"([^"]+)"',
+                      re.IGNORECASE)
+
+
+def date_filter(date_from: Optional[str] = None, date_to: Optional[str] = None) -> Optional[ds.Expression]:
+    """
+    Partition filter for an inclusive YYYY-MM-DD range.
+
+    Only references the year/month/day partition fields, so pyarrow
+    resolves it against each fragment's path and skips non-matching days
+    without opening their files.
+    """
+    day_key = pc.field('year') * 10000 + pc.field('month') * 100 + pc.field('day')
+    expression = None
+    for bound, op in ((date_from, 'ge'), (date_to, 'le')):
+        if bound:
+            value = int(date.fromisoformat(bound).strftime('%Y%m%d'))
+            term = day_key >= value if op == 'ge' else day_key <= value
+            expression = term if expression is None else expression & term
+    return expression
+
+
+def _and(*expressions: Optional[ds.Expression]) -> Optional[ds.Expression]:
+    result = None
+    for expression in expressions:
+        if expression is not None:
+            result = expression if result is None else result & expression
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Sample queries on pyarrow (same results as the catalog SQL)
+# ---------------------------------------------------------------------------
+
+def _activity_overview(dataset: ds.Dataset, where: Optional[ds.Expression]) -> pa.Table:
+    table = dataset.to_table(
+        columns=['activity_name', 'class_name', 'traffic_bytes_in', 'traffic_bytes_out'],
+        filter=_and(pc.field('category_uid') == 4, where))
+    table = table.append_column('bytes', pc.add(table['traffic_bytes_in'], table['traffic_bytes_out']))
+    result = table.group_by(['activity_name', 'class_name']).aggregate([
+        ('bytes', 'count', COUNT_ALL), ('bytes', 'sum')
+    ]).rename_columns(['activity_name', 'class_name', 'events', 'total_bytes'])
+    return result.sort_by([('total_bytes', 'descending')])
+
+
+def _top_talkers(dataset: ds.Dataset, where: Optional[ds.Expression]) -> pa.Table:
+    keys = ['src_endpoint_ip', 'dst_endpoint_ip', 'connection_info_protocol_name']
+    table = dataset.to_table(
+        columns=keys + ['traffic_bytes_in', 'traffic_bytes_out'],
+        filter=_and(pc.field('class_uid') == 4001, where))
+    table = table.append_column('bytes', pc.add(table['traffic_bytes_in'], table['traffic_bytes_out']))
+    result = table.group_by(keys).aggregate([
+        ('bytes', 'sum'), ('bytes', 'count', COUNT_ALL)
+    ]).rename_columns(keys + ['total_bytes', 'connection_count'])
+    return result.sort_by([('total_bytes', 'descending')]).slice(0, 20)
+
+
+def _egress(dataset: ds.Dataset, where: Optional[ds.Expression]) -> pa.Table:
+    keys = ['activity_name', 'src_endpoint_is_local', 'dst_endpoint_is_local']
+    table = dataset.to_table(
+        columns=keys + ['traffic_bytes_out'],
+        filter=_and((pc.field('class_uid') == 4001)
+                    & (pc.field('src_endpoint_is_local') == True)  # noqa: E712 (Arrow expression)
+                    & (pc.field('dst_endpoint_is_local') == False), where))  # noqa: E712
+    result = table.group_by(keys).aggregate([
+        ('traffic_bytes_out', 'count', COUNT_ALL), ('traffic_bytes_out', 'sum')
+    ]).rename_columns(keys + ['events', 'egress_bytes'])
+    return result.sort_by([('egress_bytes', 'descending')])
+
+
+def _hourly(dataset: ds.Dataset, where: Optional[ds.Expression]) -> pa.Table:
+    table = dataset.to_table(columns=['time', 'src_endpoint_ip', 'dst_endpoint_ip'], filter=where)
+    # Integer division truncates: epoch ms → start of the hour
+    hour = pc.multiply(pc.divide(table['time'], 3_600_000), 3_600_000)
+    table = table.append_column('hour', pc.cast(hour, pa.timestamp('ms')))
+    result = table.group_by('hour').aggregate([
+        ('time', 'count', COUNT_ALL),
+        ('src_endpoint_ip', 'count_distinct'),
+        ('dst_endpoint_ip', 'count_distinct'),
+    ]).rename_columns(['hour', 'events', 'unique_sources', 'unique_destinations'])
+    return result.sort_by('hour')
+
+
+ARROW_QUERIES: Dict[str, Callable[[ds.Dataset, Optional[ds.Expression]], pa.Table]] = {
+    'sample_activity_overview': _activity_overview,
+    'sample_top_talkers': _top_talkers,
+    'sample_egress': _egress,
+    'sample_hourly': _hourly,
+}
+
+
+def load_catalog(path: Path = DEFAULT_CATALOG) -> Dict:
+    """The benchmark query catalog (queries and their params)"""
+    return json.loads(Path(path).read_text())
+
+
+def load_catalog_sql(path: Path = DEFAULT_CATALOG) -> Dict[str, str]:
+    """Query name → SQL from the benchmark catalog"""
+    return {q['name']: q['sql'] for q in load_catalog(path).get('queries', [])}
+
+
+def render_sql(sql: str, params: Dict[str, str]) -> str:
+    """Substitute {name} placeholders (other braces are left alone)"""
+    for name, value in params.items():
+        sql = sql.replace("{" + name + "}", value)
+    return sql
+
+
+class LocalQueryEngine:
+    """Query the OCSF Parquet layout in place with pyarrow (and DuckDB if installed)"""
+
+    def __init__(self, filesystem: pafs.FileSystem, root: str):
+        self.filesystem = filesystem
+        self.root = root.rstrip('/')
+        self._datasets: Dict[str, ds.Dataset] = {}
+
+    @classmethod
+    def from_minio(cls, minio: Optional[MinioSettings] = None) -> 'LocalQueryEngine':
+        """Engine over the MinIO bucket written by the loaders (default: configured MinIO)"""
+        minio = minio or get_settings().minio
+        return cls(minio.arrow_filesystem(), minio.bucket)
+
+    @classmethod
+    def from_local(cls, root: Path) -> 'LocalQueryEngine':
+        """Engine over a local mirror of the bucket"""
+        return cls(pafs.LocalFileSystem(), str(Path(root).resolve()))
+
+    def dataset(self, folder: Optional[str] = None) -> ds.Dataset:
+        """Partitioned dataset for one loader folder, default conn (file listing is cached)"""
+        folder = folder or get_settings().folders['conn']
+        if folder not in self._datasets:
+            self._datasets[folder] = ds.dataset(
+                f"{self.root}/{folder}", filesystem=self.filesystem,
+                format='parquet', partitioning=PARTITIONING)
+        return self._datasets[folder]
+
+    def resolve_params(self, catalog: Dict, overrides: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """
+        Values for the catalog's SQL parameters, as benchmark_queries.py
+        resolves them but with {"sql": ...} params run locally on DuckDB.
+
+        Args:
+            catalog: Catalog with an optional "params" mapping
+            overrides: Values given on the command line
+
+        Returns:
+            Parameter name → value
+        """
+        overrides = overrides or {}
+        params = {}
+        for name, spec in catalog.get('params', {}).items():
+            if name in overrides:
+                params[name] = overrides[name]
+            elif isinstance(spec, dict) and 'sql' in spec:
+                table = self.sql(spec['sql'])
+                if table.num_rows == 0 or table.column(0)[0].as_py() is None:
+                    raise RuntimeError(f"Parameter {name!r} query returned no value")
+                params[name] = str(table.column(0)[0].as_py())
+            else:
+                params[name] = str(spec)
+        params.update({k: v for k, v in overrides.items() if k not in params})
+        return params
+
+    def run(self, name: str, date_from: Optional[str] = None, date_to: Optional[str] = None,
+            folder: Optional[str] = None, params: Optional[Dict[str, str]] = None) -> pa.Table:
+        """
+        Run a named sample query.
+
+        Args:
+            name: Query name (ARROW_QUERIES, or any catalog query with DuckDB)
+            date_from: First event date to include (YYYY-MM-DD)
+            date_to: Last event date to include (YYYY-MM-DD)
+            folder: Dataset folder for the pyarrow implementations (default: conn)
+            params: Catalog parameter overrides (others are resolved from the catalog)
+
+        Returns:
+            Query result
+        """
+        if duckdb is not None:
+            catalog = load_catalog()
+            queries = {q['name']: q['sql'] for q in catalog.get('queries', [])}
+            if name in queries:
+                sql = queries[name]
+                if '{' in sql:
+                    sql = render_sql(sql, self.resolve_params(catalog, params))
+                return self.sql(sql, date_from, date_to)
+        if name not in ARROW_QUERIES:
+            hint = "" if duckdb is not None else " (install duckdb to run any catalog query)"
+            raise KeyError(f"Unknown query {name!r}{hint}")
+        return ARROW_QUERIES[name](self.dataset(folder), date_filter(date_from, date_to))
+
+    def sql(self, sql: str, date_from: Optional[str] = None, date_to: Optional[str] = None) -> pa.Table:
+        """
+        Run Dremio-dialect OCSF SQL on DuckDB.
+
+        Each minio."zeek-data"."<folder>" reference becomes a view over the
+        pyarrow dataset for that folder, pre-filtered to the date range, so
+        DuckDB pushes projections and filters into the Parquet scan.
+        """
+        if duckdb is None:
+            raise RuntimeError("Arbitrary SQL requires DuckDB (pip install duckdb)")
+
+        con = duckdb.connect()
+        con.execute("CREATE MACRO from_unixtime(seconds) AS to_timestamp(seconds)")
+        where = date_filter(date_from, date_to)
+        settings = get_settings()
+        tables = dremio_table_pattern(settings.dremio.source, settings.minio.bucket)
+
+        def to_view(match: re.Match) -> str:
+            folder = match.group(1)
+            view = re.sub(r'\W', '_', folder)
+            dataset = self.dataset(folder)
+            con.register(view, dataset.filter(where) if where is not None else dataset)
+            return view
+
+        return con.execute(tables.sub(to_view, sql)).fetch_arrow_table()
+
+
+def main():
+    """Run a sample query from the command line"""
+    parser = argparse.ArgumentParser(description='Query OCSF Parquet locally without Dremio')
+    parser.add_argument('query', nargs='?', help='Sample query name (see --list)')
+    parser.add_argument('--sql', type=str, help='Dremio-dialect SQL to run (requires DuckDB)')
+    parser.add_argument('--list', action='store_true', help='List available queries')
+    parser.add_argument('--from', dest='date_from', type=str, help='First event date (YYYY-MM-DD)')
+    parser.add_argument('--to', dest='date_to', type=str, help='Last event date (YYYY-MM-DD)')
+    parser.add_argument('--local-root', type=str,
+                        help='Local mirror of the bucket instead of MinIO')
+    parser.add_argument('--param', action='append', default=[], metavar='NAME=VALUE',
+                        help='Catalog SQL parameter (e.g. day=2025-01-15); repeatable')
+    parser.add_argument('--output', type=Path, help='Write the result (.parquet or .csv)')
+    args = parser.parse_args()
+
+    if args.list:
+        names = sorted(load_catalog_sql()) if duckdb is not None else sorted(ARROW_QUERIES)
+        logger.info(f"Engine: {'DuckDB' if duckdb is not None else 'pyarrow'}")
+        for name in names:
+            logger.info(f"  {name}")
+        return 0
+    if not args.query and not args.sql:
+        parser.error("give a query name or --sql")
+    overrides = {}
+    for param in args.param:
+        name, sep, value = param.partition('=')
+        if not sep:
+            parser.error(f"--param expects NAME=VALUE, got {param!r}")
+        overrides[name] = value
+
+    if args.local_root:
+        engine = LocalQueryEngine.from_local(Path(args.local_root))
+    else:
+        engine = LocalQueryEngine.from_minio()
+
+    start = time.perf_counter()
+    try:
+        if args.sql:
+            result = engine.sql(args.sql, args.date_from, args.date_to)
+        else:
+            result = engine.run(args.query, args.date_from, args.date_to, params=overrides)
+    except (KeyError, RuntimeError) as e:
+        logger.error(str(e).strip("'\""))
+        return 1
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if args.output:
+        if args.output.suffix == '.csv':
+            import pyarrow.csv as pacsv
+            pacsv.write_csv(result, args.output)
+        else:
+            import pyarrow.parquet as pq
+            pq.write_table(result, args.output)
+        logger.info(f"✓ Wrote {result.num_rows:,} rows to {args.output}")
+    else:
+        print(result.slice(0, PRINT_ROWS).to_pandas().to_string(index=False))
+        if result.num_rows > PRINT_ROWS:
+            print(f"... {result.num_rows - PRINT_ROWS:,} more rows")
+
+    logger.info(f"✓ {result.num_rows:,} rows in {elapsed_ms:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    sys.exit(main())
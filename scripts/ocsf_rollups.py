@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Ingest-Time Rollups for OCSF Network Activity
+
+The sample and dashboard queries (top talkers, protocol distribution,
+hourly unique sources/destinations) all aggregate the raw conn table. The
+loader can instead compute small rollup tables for every partition it
+writes and store them next to the raw data:
+
+    network-activity-ocsf-rollups/<rollup>/year=YYYY/month=MM/day=DD/data.parquet
+
+Rollups:
+    hourly_protocol_activity  hour × protocol × activity: events, bytes, packets
+    daily_pairs               day × src/dst IP × protocol: connections, bytes
+    hourly_distinct           hour: events plus HyperLogLog sketches of source
+                              and destination IPs (merge them for any range)
+    hourly_sketches           hour: t-digests of connection duration and bytes,
+                              count-min sketch of bytes per destination IP
+
+Sketch columns are serialized states (suffix _hll, _tdigest, _cms) that
+merge across hours and days: summarize() turns any range of rollup rows
+into distinct counts, percentiles and per-IP totals without touching the
+raw data.
+
+Requirements:
+    pip install pyarrow pandas numpy
+
+Usage:
+    python3 scripts/load_real_zeek_to_ocsf.py --all --rollups
+    python3 scripts/ocsf_rollups.py --local-root ./zeek-data            # rebuild from raw data
+    python3 scripts/ocsf_rollups.py --local-root ./zeek-data --summary --from 2023-11-01 --to 2023-11-30
+    python3 scripts/ocsf_rollups.py --local-root ./zeek-data --summary --ip 8.8.8.8
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from ocsf_sketches import (
+    DEFAULT_HLL_PRECISION,
+    CountMinSketch,
+    HyperLogLog,
+    TDigest,
+    grouped_hll,
+    hash_values,
+    hll_estimate
+)
+from settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Rollup Configuration
+ROLLUP_SUFFIX = "-rollups"
+ROLLUP_LOG_TYPES = {'conn'}  # log types whose class carries traffic counters
+HOUR_MS = 3_600_000
+TRAFFIC_COLUMNS = ['traffic_bytes_in', 'traffic_bytes_out', 'traffic_packets_in', 'traffic_packets_out']
+DURATION_COLUMN = 'unmapped_duration'
+SUMMARY_QUANTILES = (0.5, 0.95, 0.99)
+
+# Serialized sketch columns, recognized by suffix
+SKETCH_TYPES = {'_hll': HyperLogLog, '_tdigest': TDigest, '_cms': CountMinSketch}
+
+
+def rollup_folder(folder: str) -> str:
+    """Folder holding the rollups of a raw data folder"""
+    return f"{folder}{ROLLUP_SUFFIX}"
+
+
+def rollup_key(folder: str, name: str, partition: str, filename: str = 'data.parquet') -> str:
+    """Object key of one rollup file (named after the data file it summarizes)"""
+    return f"{rollup_folder(folder)}/{name}/{partition}/{filename}"
+
+
+def _hours(df: pd.DataFrame) -> pd.Series:
+    """Start of the hour as a timestamp, from epoch-ms `time`"""
+    return pd.to_datetime((df['time'].to_numpy(dtype=np.int64) // HOUR_MS) * HOUR_MS, unit='ms')
+
+
+def _numeric(df: pd.DataFrame, columns) -> pd.DataFrame:
+    return df[columns].apply(pd.to_numeric, errors='coerce').fillna(0).astype('int64')
+
+
+def hourly_protocol_activity(df: pd.DataFrame) -> pd.DataFrame:
+    """Events, bytes and packets per hour × protocol × activity"""
+    columns = [c for c in TRAFFIC_COLUMNS if c in df.columns]
+    frame = _numeric(df, columns)
+    frame['hour'] = _hours(df)
+    frame['event_date'] = df['event_date'].to_numpy()
+    frame['connection_info_protocol_name'] = df['connection_info_protocol_name'].fillna('').to_numpy()
+    frame['activity_name'] = df['activity_name'].fillna('').to_numpy()
+    frame['events'] = 1
+
+    keys = ['event_date', 'hour', 'connection_info_protocol_name', 'activity_name']
+    return frame.groupby(keys, sort=True, as_index=False)[['events'] + columns].sum()
+
+
+def daily_pairs(df: pd.DataFrame) -> pd.DataFrame:
+    """Connections and bytes per day × source/destination IP × protocol"""
+    frame = _numeric(df, ['traffic_bytes_in', 'traffic_bytes_out'])
+    frame['total_bytes'] = frame['traffic_bytes_in'] + frame['traffic_bytes_out']
+    for column in ['event_date', 'src_endpoint_ip', 'dst_endpoint_ip', 'connection_info_protocol_name']:
+        frame[column] = df[column].fillna('').to_numpy()
+    frame['connections'] = 1
+
+    keys = ['event_date', 'src_endpoint_ip', 'dst_endpoint_ip', 'connection_info_protocol_name']
+    result = frame.groupby(keys, sort=False, as_index=False)[
+        ['connections', 'traffic_bytes_in', 'traffic_bytes_out', 'total_bytes']].sum()
+    # Largest pairs first so top-N readers can stop after the first row group
+    return result.sort_values('total_bytes', ascending=False, ignore_index=True)
+
+
+def hourly_distinct(df: pd.DataFrame, precision: int = DEFAULT_HLL_PRECISION) -> pd.DataFrame:
+    """Events and HyperLogLog sketches of source/destination IPs per hour"""
+    hours = _hours(df)
+    codes, unique_hours = pd.factorize(hours, sort=True)
+    result = pd.DataFrame({
+        'event_date': pd.Series(df['event_date'].to_numpy()).groupby(codes).first().to_numpy(),
+        'hour': unique_hours,
+        'events': np.bincount(codes, minlength=len(unique_hours)),
+    })
+    for column, name in (('src_endpoint_ip', 'sources'), ('dst_endpoint_ip', 'destinations')):
+        values = df[column].fillna('').to_numpy(dtype=object)
+        registers = grouped_hll(codes, len(unique_hours), hash_values(values), precision)
+        result[f'unique_{name}_estimate'] = np.round(hll_estimate(registers)).astype('int64')
+        result[f'{name}_hll'] = [row.tobytes() for row in registers]
+    return result
+
+
+def hourly_sketches(df: pd.DataFrame) -> pd.DataFrame:
+    """Duration/bytes t-digests and bytes-per-destination count-min per hour"""
+    codes, unique_hours = pd.factorize(_hours(df), sort=True)
+    traffic = _numeric(df, ['traffic_bytes_in', 'traffic_bytes_out'])
+    total_bytes = (traffic['traffic_bytes_in'] + traffic['traffic_bytes_out']).to_numpy()
+    duration = (pd.to_numeric(df[DURATION_COLUMN], errors='coerce').to_numpy(dtype=np.float64)
+                if DURATION_COLUMN in df.columns else np.full(len(df), np.nan))
+    destinations = df['dst_endpoint_ip'].fillna('').to_numpy(dtype=object)
+    event_dates = df['event_date'].to_numpy()
+
+    rows = []
+    for code, hour in enumerate(unique_hours):
+        mask = codes == code
+        rows.append({
+            'event_date': event_dates[mask][0],
+            'hour': hour,
+            'events': int(mask.sum()),
+            'duration_tdigest': TDigest.from_values(duration[mask]).to_bytes(),
+            'bytes_tdigest': TDigest.from_values(total_bytes[mask]).to_bytes(),
+            'dst_bytes_cms': CountMinSketch.from_values(destinations[mask], total_bytes[mask]).to_bytes(),
+        })
+    return pd.DataFrame(rows)
+
+
+ROLLUPS = {
+    'hourly_protocol_activity': hourly_protocol_activity,
+    'daily_pairs': daily_pairs,
+    'hourly_distinct': hourly_distinct,
+    'hourly_sketches': hourly_sketches,
+}
+
+
+def build_rollups(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """All rollups for one partition of OCSF network activity"""
+    if df.empty:
+        return {}
+    return {name: rollup(df) for name, rollup in ROLLUPS.items()}
+
+
+def write_rollup(rollup: pd.DataFrame, output_path: Path) -> None:
+    """Write a rollup table (zstd compresses the sketch registers well)"""
+    table = pa.Table.from_pandas(rollup, preserve_index=False)
+    pq.write_table(table, output_path, compression='zstd', write_statistics=True)
+
+
+def merge_sketches(states: Iterable[bytes], suffix: str):
+    """
+    Merge serialized sketch states of one column.
+
+    Args:
+        states: Serialized sketches (e.g. a rollup column over a time range)
+        suffix: Column suffix selecting the sketch type (_hll, _tdigest, _cms)
+
+    Returns:
+        Merged sketch, or None if there were no states
+    """
+    sketch_type = SKETCH_TYPES[suffix]
+    merged = None
+    for data in states:
+        sketch = sketch_type.from_bytes(data)
+        merged = sketch if merged is None else merged.merge(sketch)
+    return merged
+
+
+def merge_rollup_sketches(rollup: pd.DataFrame) -> Dict[str, object]:
+    """Merge every sketch column of a set of rollup rows"""
+    merged = {}
+    for column in rollup.columns:
+        suffix = next((s for s in SKETCH_TYPES if column.endswith(s)), None)
+        if suffix:
+            merged[column] = merge_sketches(rollup[column], suffix)
+    return merged
+
+
+def merge_distinct(hourly: pd.DataFrame) -> Dict[str, float]:
+    """
+    Distinct sources/destinations over any set of hourly_distinct rows.
+
+    Args:
+        hourly: hourly_distinct rows for the hours of interest
+
+    Returns:
+        {"events", "unique_sources", "unique_destinations"}
+    """
+    sketches = merge_rollup_sketches(hourly)
+    result = {'events': int(hourly['events'].sum())}
+    for name in ('sources', 'destinations'):
+        sketch = sketches.get(f'{name}_hll')
+        result[f'unique_{name}'] = sketch.count() if sketch is not None else 0.0
+    return result
+
+
+def summarize(hourly_distinct_rows: pd.DataFrame, hourly_sketch_rows: pd.DataFrame,
+              quantiles: Sequence[float] = SUMMARY_QUANTILES,
+              ips: Sequence[str] = ()) -> Dict[str, float]:
+    """
+    Dashboard numbers for any time range from its rollup rows.
+
+    Args:
+        hourly_distinct_rows: hourly_distinct rows of the range
+        hourly_sketch_rows: hourly_sketches rows of the range
+        quantiles: Percentiles of duration and bytes to report
+        ips: Destination IPs to estimate total bytes for
+
+    Returns:
+        Flat dictionary (events, unique_*, duration_p*, bytes_p*, dst_bytes[ip])
+    """
+    result = merge_distinct(hourly_distinct_rows)
+    sketches = merge_rollup_sketches(hourly_sketch_rows)
+    for name in ('duration', 'bytes'):
+        digest = sketches.get(f'{name}_tdigest')
+        for q in quantiles:
+            result[f'{name}_p{q * 100:g}'] = digest.quantile(q) if digest is not None else float('nan')
+    cms = sketches.get('dst_bytes_cms')
+    for ip in ips:
+        result[f'dst_bytes[{ip}]'] = cms.estimate(ip) if cms is not None else 0
+    return result
+
+
+def read_rollup(root: Path, folder: str, name: str, date_from: Optional[str] = None,
+                date_to: Optional[str] = None) -> pd.DataFrame:
+    """Rollup rows for a date range from a local mirror (partition-pruned)"""
+    import pyarrow.dataset as ds
+    from local_query import PARTITIONING, date_filter
+
+    path = Path(root) / rollup_folder(folder) / name
+    if not path.exists():
+        raise FileNotFoundError(f"No {name} rollups under {path}")
+    return ds.dataset(path, format='parquet', partitioning=PARTITIONING).to_table(
+        filter=date_filter(date_from, date_to)).to_pandas()
+
+
+def main():
+    """Rebuild rollups from raw partitions, or summarize a range from them"""
+    parser = argparse.ArgumentParser(description='Build or read OCSF ingest-time rollups')
+    parser.add_argument('--local-root', type=Path, required=True,
+                        help='Local mirror of the bucket (raw folders and rollups)')
+    conn_folder = get_settings().folders['conn']
+    parser.add_argument('--folder', type=str, default=conn_folder,
+                        help=f'Raw data folder (default: {conn_folder})')
+    parser.add_argument('--summary', action='store_true',
+                        help='Print distinct counts, percentiles (and --ip totals) merged from sketches')
+    parser.add_argument('--ip', action='append', default=[],
+                        help='Destination IP to estimate total bytes for (with --summary, repeatable)')
+    parser.add_argument('--from', dest='date_from', type=str, help='First event date (YYYY-MM-DD)')
+    parser.add_argument('--to', dest='date_to', type=str, help='Last event date (YYYY-MM-DD)')
+    args = parser.parse_args()
+
+    root = args.local_root.resolve()
+
+    if args.summary:
+        try:
+            distinct = read_rollup(root, args.folder, 'hourly_distinct', args.date_from, args.date_to)
+            sketches = read_rollup(root, args.folder, 'hourly_sketches', args.date_from, args.date_to)
+        except FileNotFoundError as e:
+            logger.error(str(e))
+            return 1
+        for key, value in summarize(distinct, sketches, ips=args.ip).items():
+            logger.info(f"{key:<28} {value:,.1f}" if isinstance(value, float) else f"{key:<28} {value:,}")
+        return 0
+
+    raw_files = sorted((root / args.folder).glob('year=*/month=*/day=*/*.parquet'))
+    if not raw_files:
+        logger.error(f"No raw partitions under {root / args.folder}")
+        return 1
+
+    # One rollup per raw file, named after it, like the loader writes them
+    for raw_file in raw_files:
+        partition = str(raw_file.parent.relative_to(root / args.folder))
+        for name, rollup in build_rollups(pq.read_table(raw_file).to_pandas()).items():
+            key = rollup_key(args.folder, name, partition, raw_file.name)
+            output_path = root / key
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            write_rollup(rollup, output_path)
+            logger.info(f"  ✓ {key} ({len(rollup):,} rows, {output_path.stat().st_size / 1024:.1f} KB)")
+
+    # Rollups of raw files that no longer exist would be merged (counted) too
+    rebuilt = {root / rollup_key(args.folder, name, str(f.parent.relative_to(root / args.folder)), f.name)
+               for f in raw_files for name in ROLLUPS}
+    for stale in sorted((root / rollup_folder(args.folder)).glob('*/year=*/month=*/day=*/*.parquet')):
+        if stale not in rebuilt:
+            stale.unlink()
+            logger.info(f"  ✓ Removed {stale.relative_to(root)} (no matching raw file)")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    sys.exit(main())
@@ -0,0 +1,690 @@
+#!/usr/bin/env python3
+"""
+Workload-Driven Dremio Reflection Recommender
+
+Proposes reflections from the queries that are actually run, instead of the
+hand-maintained dimension/measure lists in config/reflections.yaml:
+
+1. Pull completed jobs touching the OCSF datasets from sys.jobs_recent
+   (or read them offline from a JSON job list / benchmark_queries.py output)
+2. Parse each query's dataset, GROUP BY dimensions, filter columns and
+   aggregate measures (SUM/MIN/MAX/COUNT/AVG)
+3. Cluster query shapes with similar dimension sets (Jaccard merge, capped
+   at --max-dimensions so reflections stay small)
+4. Greedily pick the reflections that cover the most query time until
+   --coverage is reached; every selected cluster becomes an aggregation
+   reflection, non-aggregate scans share one raw reflection per dataset
+5. Emit Dremio reflection definitions (partition/sort fields included) as
+   JSON; --apply adds them to the reflection spec (config/reflections.yaml)
+   and reconciles Dremio with it, so re-runs update rather than duplicate
+   and reconcile_reflections.py keeps them
+
+Parsing is regex based and handles single-table SELECTs with the shapes
+used in this project; joins and subqueries are reported and skipped.
+
+Requirements:
+    pip install requests pyarrow
+
+Usage:
+    python3 scripts/recommend_reflections.py --days 7 --output reflections.recommended.json
+    python3 scripts/recommend_reflections.py --jobs-file results/queries-baseline.json
+    python3 scripts/recommend_reflections.py --apply --spec config/reflections.yaml
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import re
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from dremio_client import DremioClient
+from dremio_query import run_query
+from settings import get_settings
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Recommender Configuration (dataset folders: see settings.py)
+DEFAULT_SPEC = Path(__file__).parent.parent / "config" / "reflections.yaml"
+DEFAULT_DAYS = 7
+DEFAULT_COVERAGE = 0.9
+DEFAULT_MAX_REFLECTIONS = 5
+DEFAULT_MAX_DIMENSIONS = 8
+PARTITION_COLUMN = "event_date"
+SORT_COLUMN = "time"
+
+AGGREGATE_MEASURES = {
+    "SUM": ["SUM"],
+    "MIN": ["MIN"],
+    "MAX": ["MAX"],
+    "COUNT": ["COUNT"],
+    "AVG": ["SUM", "COUNT"],
+}
+
+SQL_KEYWORDS = {
+    'select', 'from', 'where', 'group', 'by', 'order', 'having', 'limit', 'offset',
+    'and', 'or', 'not', 'in', 'is', 'null', 'as', 'on', 'case', 'when', 'then', 'else',
+    'end', 'asc', 'desc', 'distinct', 'between', 'like', 'ilike', 'true', 'false',
+    'cast', 'double', 'bigint', 'int', 'integer', 'varchar', 'date', 'timestamp',
+    'interval', 'over', 'partition', 'day', 'hour', 'minute', 'second', 'month', 'year',
+    'float', 'decimal', 'boolean', 'nulls', 'first', 'last', 'all', 'any', 'exists',
+}
+
+JOB_HISTORY_SQL = """
+SELECT query, TIMESTAMPDIFF(MILLISECOND, submitted_ts, final_state_ts) AS duration_ms
+FROM sys.jobs_recent
+WHERE status = 'COMPLETED'
+  AND submitted_ts > TIMESTAMPADD(DAY, -{days}, CURRENT_TIMESTAMP)
+  AND ({dataset_filter})
+"""
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_IDENTIFIER = re.compile(r'"([^"]+)"|\b([A-Za-z_][A-Za-z0-9_]*)\b(?!\s*\()')
+_AGGREGATE = re.compile(r'\b(SUM|MIN|MAX|COUNT|AVG)\s*\(', re.IGNORECASE)
+_FROM = re.compile(r'\bFROM\s+((?:"[^"]+"|[\w-]+)(?:\s*\.\s*(?:"[^"]+"|[\w-]+))*)', re.IGNORECASE)
+_CLAUSE = re.compile(r'\b(SELECT|FROM|WHERE|GROUP\s+BY|HAVING|ORDER\s+BY|LIMIT)\b', re.IGNORECASE)
+
+
+@dataclass
+class QueryShape:
+    """Columns a query needs from its dataset"""
+    dataset: Tuple[str, ...]
+    dimensions: FrozenSet[str]
+    measures: Dict[str, Set[str]]
+    filters: FrozenSet[str]
+    columns: FrozenSet[str]
+    aggregate: bool
+    seconds: float = 0.0
+    count: int = 0
+    examples: List[str] = field(default_factory=list)
+
+
+# ============================================================================
+# SQL parsing
+# ============================================================================
+
+def _split_top_level(text: str) -> List[str]:
+    """Split on commas outside parentheses"""
+    parts, depth, start = [], 0, 0
+    for i, char in enumerate(text):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _clauses(sql: str) -> Dict[str, str]:
+    """Top-level clause bodies keyed by normalized keyword"""
+    # Blank out parenthesised text so nested SELECT/ORDER BY (e.g. OVER()) are ignored
+    masked, depth = [], 0
+    for char in sql:
+        depth += char == '('
+        masked.append(char if depth == 0 else ' ')
+        depth -= char == ')'
+    masked = ''.join(masked)
+
+    matches = list(_CLAUSE.finditer(masked))
+    clauses = {}
+    for match, following in zip(matches, matches[1:] + [None]):
+        key = re.sub(r'\s+', ' ', match.group(1).upper())
+        clauses[key] = sql[match.end():following.start() if following else len(sql)].strip()
+    return clauses
+
+
+def _identifiers(expression: str) -> Set[str]:
+    """Column-like identifiers in an expression (no keywords, functions or literals)"""
+    expression = _STRING_LITERAL.sub(' ', expression)
+    names = set()
+    for quoted, bare in _IDENTIFIER.findall(expression):
+        name = quoted or bare
+        if name and name.lower() not in SQL_KEYWORDS and not name[0].isdigit():
+            names.add(name)
+    return names
+
+
+def _select_items(select: str) -> List[Tuple[str, Optional[str]]]:
+    """(expression, alias) pairs of a SELECT list"""
+    items = []
+    for item in _split_top_level(select):
+        match = re.match(r'(.*?)\s+(?:AS\s+)?("?[A-Za-z_][\w]*"?)$', item, re.IGNORECASE | re.DOTALL)
+        if match and not match.group(1).rstrip().endswith(('.', '(')) \
+                and match.group(2).lower() not in SQL_KEYWORDS:
+            items.append((match.group(1).strip(), match.group(2).strip('"')))
+        else:
+            items.append((item, None))
+    return items
+
+
+def _aggregate_calls(expression: str) -> List[Tuple[str, str]]:
+    """(function, argument) for each aggregate call, outermost first"""
+    calls = []
+    for match in _AGGREGATE.finditer(expression):
+        depth, start = 1, match.end()
+        for i in range(start, len(expression)):
+            depth += {'(': 1, ')': -1}.get(expression[i], 0)
+            if depth == 0:
+                calls.append((match.group(1).upper(), expression[start:i].strip()))
+                break
+    return calls
+
+
+def parse_query(sql: str, known_columns: Optional[Set[str]] = None) -> Optional[QueryShape]:
+    """
+    Extract the columns a single-table query needs.
+
+    Args:
+        sql: Query text
+        known_columns: Dataset columns, used to drop aliases and stray tokens
+
+    Returns:
+        QueryShape, or None for joins, subqueries and unrecognized statements
+    """
+    clauses = _clauses(sql.strip().rstrip(';'))
+    if 'SELECT' not in clauses or 'FROM' not in clauses:
+        return None
+    if re.search(r'\bJOIN\b|\(\s*SELECT\b', sql, re.IGNORECASE):
+        return None
+
+    from_match = _FROM.search('FROM ' + clauses['FROM'])
+    if not from_match:
+        return None
+    dataset = tuple(
+        part.strip().strip('"') for part in re.findall(r'"[^"]+"|[\w-]+', from_match.group(1))
+    )
+
+    items = _select_items(clauses['SELECT'])
+    aliases = {alias: expr for expr, alias in items if alias}
+
+    def columns_of(expression: str) -> Set[str]:
+        names = _identifiers(expression)
+        # Resolve references to SELECT aliases (GROUP BY hour, ORDER BY total_bytes)
+        resolved = set()
+        for name in names:
+            if name in aliases and aliases[name] != name:
+                resolved |= _identifiers(aliases[name])
+            else:
+                resolved.add(name)
+        if known_columns is not None:
+            resolved &= known_columns
+        return resolved
+
+    dimensions: Set[str] = set()
+    for expression in _split_top_level(clauses.get('GROUP BY', '')):
+        if expression.isdigit() and 0 < int(expression) <= len(items):
+            expression = items[int(expression) - 1][0]
+        dimensions |= columns_of(expression)
+
+    filters = columns_of(clauses.get('WHERE', ''))
+    measures: Dict[str, Set[str]] = defaultdict(set)
+    aggregate = bool(dimensions) or any(_aggregate_calls(expr) for expr, _ in items)
+
+    for expression, _ in items:
+        for function, argument in _aggregate_calls(expression):
+            argument_columns = columns_of(argument)
+            if function == 'COUNT' and re.match(r'DISTINCT\b', argument, re.IGNORECASE):
+                # Exact distinct counts are only answerable from dimensions
+                dimensions |= argument_columns
+            elif re.fullmatch(r'[\s\w"+]+', argument) or function == 'COUNT':
+                # Bare columns (or sums of columns) map onto measures
+                for column in argument_columns:
+                    measures[column].update(AGGREGATE_MEASURES[function])
+            else:
+                # CASE/CAST/arithmetics: the reflection must keep the raw values
+                dimensions |= argument_columns
+
+    if aggregate:
+        # Filtered columns must survive aggregation to be filterable
+        dimensions |= filters
+    select_columns = set()
+    for expression, _ in items:
+        select_columns |= columns_of(expression)
+
+    return QueryShape(
+        dataset=dataset,
+        dimensions=frozenset(dimensions),
+        measures=dict(measures),
+        filters=frozenset(filters),
+        columns=frozenset(select_columns | filters | dimensions),
+        aggregate=aggregate,
+    )
+
+
+def normalize_sql(sql: str) -> str:
+    """Query shape key: literals replaced, whitespace and case folded"""
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = re.sub(r'\b\d+(\.\d+)?\b', '?', sql)
+    return re.sub(r'\s+', ' ', sql).strip().lower()
+
+
+# ============================================================================
+# Workload input
+# ============================================================================
+
+def fetch_job_history(client: DremioClient, days: int) -> List[Dict]:
+    """Completed jobs against the OCSF datasets from sys.jobs_recent"""
+    folders = sorted(set(get_settings().folders.values()))
+    dataset_filter = " OR ".join(f"query LIKE '%{folder}%'" for folder in folders)
+    sql = JOB_HISTORY_SQL.format(days=days, dataset_filter=dataset_filter)
+    table = run_query(client, sql).table
+    jobs = [
+        {"sql": row["query"], "duration_ms": row["duration_ms"] or 0}
+        for row in table.to_pylist()
+        if 'sys.jobs_recent' not in row["query"]
+    ]
+    logger.info(f"✓ Loaded {len(jobs):,} jobs from the last {days} days")
+    return jobs
+
+
+def load_jobs_file(path: Path) -> List[Dict]:
+    """
+    Jobs from a file: a list of {"sql", "duration_ms"} or a
+    benchmark_queries.py result (each timed run counts as one job).
+    """
+    data = json.loads(Path(path).read_text())
+    if isinstance(data, dict) and data.get("kind") == "query":
+        return [
+            {"sql": query["sql"], "duration_ms": sample["wall_seconds"] * 1000}
+            for query in data["queries"]
+            for sample in query.get("samples", [])
+        ]
+    return [{"sql": job["sql"], "duration_ms": job.get("duration_ms", 0)} for job in data]
+
+
+def build_shapes(jobs: List[Dict], known_columns: Optional[Dict[Tuple[str, ...], Set[str]]] = None
+                 ) -> Tuple[List[QueryShape], int]:
+    """
+    Parse jobs and merge identical query shapes.
+
+    Returns:
+        (shapes, number of jobs that could not be parsed)
+    """
+    shapes: Dict[str, QueryShape] = {}
+    skipped = 0
+    for job in jobs:
+        key = normalize_sql(job["sql"])
+        if key not in shapes:
+            shape = parse_query(job["sql"])
+            if shape is None:
+                skipped += 1
+                continue
+            if known_columns and shape.dataset in known_columns:
+                shape = parse_query(job["sql"], known_columns[shape.dataset])
+            shape.examples.append(job["sql"])
+            shapes[key] = shape
+        shapes[key].seconds += (job.get("duration_ms") or 0) / 1000
+        shapes[key].count += 1
+    return list(shapes.values()), skipped
+
+
+# ============================================================================
+# Clustering and selection
+# ============================================================================
+
+@dataclass
+class Candidate:
+    """A proposed aggregation reflection and the shapes it was built from"""
+    dataset: Tuple[str, ...]
+    dimensions: FrozenSet[str]
+    measures: Dict[str, Set[str]]
+    filters: Dict[str, float]      # Filter column → query seconds filtering on it
+
+    def covers(self, shape: QueryShape) -> bool:
+        if shape.dataset != self.dataset or not shape.dimensions <= self.dimensions:
+            return False
+        return all(types <= self.measures.get(column, set())
+                   for column, types in shape.measures.items())
+
+
+def _jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+def cluster_shapes(shapes: List[QueryShape], max_dimensions: int) -> List[Candidate]:
+    """
+    Agglomeratively merge aggregate query shapes of the same dataset.
+
+    The most similar pair (Jaccard over dimensions) is merged while the
+    union stays within max_dimensions.
+    """
+    candidates = []
+    by_dataset = defaultdict(list)
+    for shape in shapes:
+        if shape.aggregate:
+            by_dataset[shape.dataset].append(shape)
+
+    for dataset, members in by_dataset.items():
+        clusters = []
+        for shape in members:
+            filters = {column: shape.seconds for column in shape.filters}
+            clusters.append(Candidate(dataset, shape.dimensions,
+                                      {c: set(t) for c, t in shape.measures.items()}, filters))
+
+        while len(clusters) > 1:
+            best = None
+            for i in range(len(clusters)):
+                for j in range(i + 1, len(clusters)):
+                    union = clusters[i].dimensions | clusters[j].dimensions
+                    if len(union) > max_dimensions:
+                        continue
+                    score = _jaccard(clusters[i].dimensions, clusters[j].dimensions)
+                    if best is None or score > best[0]:
+                        best = (score, i, j)
+            if best is None or best[0] == 0:
+                break
+
+            _, i, j = best
+            merged_measures = defaultdict(set)
+            merged_filters = defaultdict(float)
+            for cluster in (clusters[i], clusters[j]):
+                for column, types in cluster.measures.items():
+                    merged_measures[column] |= types
+                for column, seconds in cluster.filters.items():
+                    merged_filters[column] += seconds
+            merged = Candidate(dataset, clusters[i].dimensions | clusters[j].dimensions,
+                               dict(merged_measures), dict(merged_filters))
+            clusters = [c for k, c in enumerate(clusters) if k not in (i, j)] + [merged]
+
+        # Individual shapes stay candidates too: a small exact reflection can beat a merged one
+        seen = {(c.dimensions, frozenset(c.measures)) for c in clusters}
+        for shape in members:
+            if len(shape.dimensions) <= max_dimensions and \
+                    (shape.dimensions, frozenset(shape.measures)) not in seen:
+                clusters.append(Candidate(dataset, shape.dimensions,
+                                          {c: set(t) for c, t in shape.measures.items()},
+                                          {column: shape.seconds for column in shape.filters}))
+        candidates.extend(c for c in clusters if len(c.dimensions) <= max_dimensions)
+    return candidates
+
+
+def select_reflections(candidates: List[Candidate], shapes: List[QueryShape],
+                       coverage: float, max_reflections: int) -> List[Tuple[Candidate, List[QueryShape]]]:
+    """
+    Greedy weighted set cover over aggregate query time.
+
+    Each round picks the candidate covering the most not-yet-covered query
+    seconds, preferring fewer dimensions on ties, until the coverage target
+    or the reflection budget is reached.
+    """
+    aggregate_shapes = [s for s in shapes if s.aggregate]
+    total = sum(s.seconds for s in aggregate_shapes) or 1.0
+    uncovered = set(range(len(aggregate_shapes)))
+    selected = []
+
+    while uncovered and len(selected) < max_reflections:
+        if 1 - sum(aggregate_shapes[i].seconds for i in uncovered) / total >= coverage:
+            break
+        best, best_gain, best_covered = None, 0.0, []
+        for candidate in candidates:
+            covered = [i for i in uncovered if candidate.covers(aggregate_shapes[i])]
+            gain = sum(aggregate_shapes[i].seconds for i in covered)
+            if gain > best_gain or (gain == best_gain and best is not None and covered
+                                    and len(candidate.dimensions) < len(best.dimensions)):
+                best, best_gain, best_covered = candidate, gain, covered
+        if best is None:
+            break
+        selected.append((best, [aggregate_shapes[i] for i in best_covered]))
+        uncovered -= set(best_covered)
+    return selected
+
+
+# ============================================================================
+# Reflection definitions
+# ============================================================================
+
+def _reflection_name(kind: str, dataset: Tuple[str, ...], columns) -> str:
+    digest = hashlib.sha1(",".join(sorted(columns)).encode()).hexdigest()[:8]
+    return f"Recommended {kind} {dataset[-1]} {digest}"
+
+
+def _sort_fields(filters: Dict[str, float], allowed: Set[str]) -> List[Dict]:
+    ranked = sorted((c for c in filters if c in allowed and c != PARTITION_COLUMN),
+                    key=lambda c: -filters[c])
+    return [{"name": column} for column in ranked[:1]]
+
+
+def aggregation_definition(candidate: Candidate, covered: List[QueryShape], total: float) -> Dict:
+    """Dremio aggregation reflection definition for a selected candidate"""
+    dimensions = sorted(candidate.dimensions)
+    measure_columns = sorted(c for c in candidate.measures if c not in candidate.dimensions)
+    seconds = sum(s.seconds for s in covered)
+    return {
+        "dataset": list(candidate.dataset),
+        "name": _reflection_name("Aggregation", candidate.dataset, dimensions),
+        "type": "AGGREGATION",
+        "enabled": True,
+        "dimensionFields": [{"name": d} for d in dimensions],
+        "measureFields": [
+            {"name": c, "measureTypes": sorted(candidate.measures[c])} for c in measure_columns
+        ],
+        "partitionFields": [{"name": PARTITION_COLUMN}] if PARTITION_COLUMN in candidate.dimensions else [],
+        "sortFields": _sort_fields(candidate.filters, set(dimensions)),
+        "distributionFields": [],
+        "partitionDistributionStrategy": "CONSOLIDATED",
+        "_recommendation": {
+            "query_shapes": len(covered),
+            "queries": sum(s.count for s in covered),
+            "query_seconds": round(seconds, 3),
+            "share_of_aggregate_time": round(seconds / total, 4) if total else 0.0,
+        },
+    }
+
+
+def raw_definitions(shapes: List[QueryShape], min_share: float = 0.05) -> List[Dict]:
+    """One raw reflection per dataset whose non-aggregate queries are a meaningful share of time"""
+    total = sum(s.seconds for s in shapes) or 1.0
+    definitions = []
+    by_dataset = defaultdict(list)
+    for shape in shapes:
+        if not shape.aggregate:
+            by_dataset[shape.dataset].append(shape)
+
+    for dataset, members in by_dataset.items():
+        seconds = sum(s.seconds for s in members)
+        if seconds / total < min_share:
+            continue
+        columns = sorted(set().union(*(s.columns for s in members)) | {PARTITION_COLUMN})
+        filters = defaultdict(float)
+        for shape in members:
+            for column in shape.filters:
+                filters[column] += shape.seconds
+        sort = _sort_fields(filters, set(columns)) or [{"name": SORT_COLUMN}]
+        definitions.append({
+            "dataset": list(dataset),
+            "name": _reflection_name("Raw", dataset, columns),
+            "type": "RAW",
+            "enabled": True,
+            "displayFields": [{"name": c} for c in columns],
+            "partitionFields": [{"name": PARTITION_COLUMN}],
+            "sortFields": sort,
+            "distributionFields": [],
+            "partitionDistributionStrategy": "CONSOLIDATED",
+            "_recommendation": {
+                "query_shapes": len(members),
+                "queries": sum(s.count for s in members),
+                "query_seconds": round(seconds, 3),
+                "share_of_total_time": round(seconds / total, 4),
+            },
+        })
+    return definitions
+
+
+def _spec_fields(fields: List[Dict]) -> List:
+    """Field list as written in the spec: plain names where only the name is set"""
+    return [f["name"] if set(f) == {"name"} else dict(f) for f in fields]
+
+
+def add_to_spec(reflections: List[Dict], spec_path: Path) -> int:
+    """
+    Add recommended reflections to a reconcile_reflections.py spec file.
+
+    Recommendations replace spec reflections of the same name (names are
+    derived from the columns, so a re-run updates rather than duplicates)
+    and datasets missing from the spec are appended. The file's leading
+    comment block is kept.
+
+    Args:
+        reflections: Definitions from recommend()
+        spec_path: Spec YAML to update (created if missing)
+
+    Returns:
+        Number of reflections added or replaced
+    """
+    import yaml
+    from reconcile_reflections import spec_dataset_path
+
+    text = spec_path.read_text() if spec_path.exists() else ""
+    header = []
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            break
+        header.append(line)
+    spec = yaml.safe_load(text) or {}
+    datasets = spec.setdefault("datasets", [])
+
+    settings = get_settings()
+    log_types = {tuple(settings.dataset_path(t)): t for t in settings.folders}
+    for reflection in reflections:
+        path = tuple(reflection["dataset"])
+        entry = next((d for d in datasets if spec_dataset_path(d) == path), None)
+        if entry is None:
+            entry = {"log_type": log_types[path]} if path in log_types else {"path": list(path)}
+            datasets.append(entry)
+        definition = {
+            key: _spec_fields(value) if key.endswith("Fields") and key != "measureFields" else value
+            for key, value in reflection.items()
+            if key != "dataset" and not key.startswith("_")
+        }
+        existing = entry.setdefault("reflections", [])
+        entry["reflections"] = [r for r in existing if r.get("name") != definition["name"]]
+        entry["reflections"].append(definition)
+
+    body = yaml.safe_dump(spec, sort_keys=False, default_flow_style=None, width=100)
+    spec_path.parent.mkdir(parents=True, exist_ok=True)
+    spec_path.write_text(("\n".join(header) + "\n" if header else "") + body)
+    return len(reflections)
+
+
+def recommend(jobs: List[Dict], coverage: float = DEFAULT_COVERAGE,
+              max_reflections: int = DEFAULT_MAX_REFLECTIONS,
+              max_dimensions: int = DEFAULT_MAX_DIMENSIONS,
+              known_columns: Optional[Dict[Tuple[str, ...], Set[str]]] = None) -> Dict:
+    """
+    Recommend reflections for a job list.
+
+    Args:
+        jobs: [{"sql", "duration_ms"}]
+        coverage: Target share of aggregate query time to cover
+        max_reflections: Aggregation reflection budget
+        max_dimensions: Largest dimension set per aggregation reflection
+        known_columns: Optional dataset path → column names for stricter parsing
+
+    Returns:
+        {"reflections": [...definitions], "summary": {...}}
+    """
+    shapes, skipped = build_shapes(jobs, known_columns)
+    candidates = cluster_shapes(shapes, max_dimensions)
+    selected = select_reflections(candidates, shapes, coverage, max_reflections)
+
+    aggregate_total = sum(s.seconds for s in shapes if s.aggregate)
+    reflections = [aggregation_definition(c, covered, aggregate_total) for c, covered in selected]
+    reflections += raw_definitions(shapes)
+
+    covered_seconds = sum(s.seconds for _, covered in selected for s in covered)
+    return {
+        "reflections": reflections,
+        "summary": {
+            "jobs": len(jobs),
+            "unparsed_jobs": skipped,
+            "query_shapes": len(shapes),
+            "aggregate_query_seconds": round(aggregate_total, 3),
+            "aggregate_coverage": round(covered_seconds / aggregate_total, 4) if aggregate_total else 0.0,
+        },
+    }
+
+
+def main():
+    """Main execution flow"""
+    parser = argparse.ArgumentParser(description='Recommend Dremio reflections from job history')
+    parser.add_argument('--jobs-file', type=Path,
+                        help='Offline job list JSON or benchmark_queries.py results instead of sys.jobs_recent')
+    parser.add_argument('--days', type=int, default=DEFAULT_DAYS,
+                        help=f'Job history window in days (default: {DEFAULT_DAYS})')
+    parser.add_argument('--coverage', type=float, default=DEFAULT_COVERAGE,
+                        help=f'Target share of aggregate query time (default: {DEFAULT_COVERAGE})')
+    parser.add_argument('--max-reflections', type=int, default=DEFAULT_MAX_REFLECTIONS,
+                        help=f'Aggregation reflection budget (default: {DEFAULT_MAX_REFLECTIONS})')
+    parser.add_argument('--max-dimensions', type=int, default=DEFAULT_MAX_DIMENSIONS,
+                        help=f'Dimensions per aggregation reflection (default: {DEFAULT_MAX_DIMENSIONS})')
+    parser.add_argument('--output', type=Path,
+                        help='Write reflection definitions JSON here (default: stdout)')
+    parser.add_argument('--apply', action='store_true',
+                        help='Add the recommendations to --spec and reconcile Dremio with it')
+    parser.add_argument('--spec', type=Path, default=DEFAULT_SPEC,
+                        help=f'Reflection spec updated by --apply (default: config/{DEFAULT_SPEC.name})')
+    args = parser.parse_args()
+
+    client = None
+    known_columns = None
+    if args.jobs_file:
+        jobs = load_jobs_file(args.jobs_file)
+    else:
+        client = DremioClient(interactive=True)
+        jobs = fetch_job_history(client, args.days)
+
+    if client is not None:
+        # Dataset schemas make alias/column separation exact
+        known_columns = {}
+        for shape in build_shapes(jobs)[0]:
+            if shape.dataset not in known_columns:
+                entity = client.get_catalog_by_path(list(shape.dataset))
+                if entity:
+                    known_columns[shape.dataset] = {f["name"] for f in entity.get("fields", [])}
+
+    result = recommend(jobs, args.coverage, args.max_reflections, args.max_dimensions, known_columns)
+    summary = result["summary"]
+    logger.info(f"Parsed {summary['jobs'] - summary['unparsed_jobs']:,}/{summary['jobs']:,} jobs "
+                f"into {summary['query_shapes']} query shapes")
+    logger.info(f"Recommended {len(result['reflections'])} reflections covering "
+                f"{summary['aggregate_coverage']:.0%} of aggregate query time")
+    for reflection in result["reflections"]:
+        fields = reflection.get("dimensionFields") or reflection.get("displayFields")
+        logger.info(f"  {reflection['type']:<11} {reflection['name']}: "
+                    f"{', '.join(f['name'] for f in fields)}")
+
+    output = json.dumps(result, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n")
+        logger.info(f"✓ Definitions written to {args.output}")
+    else:
+        print(output)
+
+    if args.apply:
+        from reconcile_reflections import reconcile
+        added = add_to_spec(result["reflections"], args.spec)
+        logger.info(f"✓ {added} recommendations written to {args.spec}")
+        client = client or DremioClient(interactive=True)
+        failures = reconcile(client, args.spec)
+        if failures:
+            logger.error(f"✗ {failures} reflection changes failed")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Reconcile Dremio Reflections with a Declarative Spec
+
+Diffs config/reflections.yaml against /api/v3/reflection and applies only
+the differences:
+
+    + create   reflection in the spec but not in Dremio
+    ~ update   same name, different definition (PUT with the current tag,
+               so the reflection keeps its id and only it is rebuilt)
+    = keep     identical definition; the materialization is untouched
+    - drop     reflection on a managed dataset that is not in the spec
+               (or a duplicate of a spec name left by earlier runs)
+
+A type change (RAW ↔ AGGREGATION) cannot be done in place and becomes a
+drop followed by a create. A dataset's refresh_policy, if given, is set
+after the reflections (only when it differs from Dremio's).
+
+Requirements:
+    pip install requests pyyaml
+
+Usage:
+    python3 scripts/reconcile_reflections.py --dry-run
+    python3 scripts/reconcile_reflections.py
+    python3 scripts/reconcile_reflections.py --spec my-reflections.yaml --no-prune
+"""
+
+import argparse
+import logging
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from create_dremio_reflections import DremioReflectionManager
+from dremio_client import DremioClient
+from settings import get_settings
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_SPEC = Path(__file__).parent.parent / "config" / "reflections.yaml"
+
+DEFAULT_MEASURE_TYPES = ["COUNT", "SUM"]
+NAME_FIELD_KEYS = ["displayFields", "partitionFields", "sortFields", "distributionFields"]
+REFRESH_POLICY_KEYS = {"method", "refresh_field", "refresh_period_ms", "grace_period_ms"}
+DEFINITION_DEFAULTS = {
+    "enabled": True,
+    "arrowCachingEnabled": False,
+    "partitionDistributionStrategy": "CONSOLIDATED",
+}
+
+
+@dataclass
+class Action:
+    """One reconcile step"""
+    op: str                          # create | update | keep | drop
+    dataset: Tuple[str, ...]
+    name: str
+    desired: Optional[Dict] = None
+    existing: Optional[Dict] = None
+    changes: Tuple[str, ...] = ()
+
+
+def _named(fields) -> List[Dict]:
+    return [{"name": f} if isinstance(f, str) else dict(f) for f in fields or []]
+
+
+def normalize_definition(definition: Dict) -> Dict:
+    """
+    Canonical form of a reflection definition for comparison and submission.
+
+    Accepts plain column names in field lists and fills Dremio's defaults.
+    """
+    canonical = {"name": definition["name"], "type": definition["type"].upper()}
+    for key, default in DEFINITION_DEFAULTS.items():
+        canonical[key] = definition.get(key, default)
+
+    for key in NAME_FIELD_KEYS:
+        canonical[key] = [{"name": f["name"]} for f in _named(definition.get(key))]
+    # Field order is irrelevant for display fields only
+    canonical["displayFields"].sort(key=lambda f: f["name"])
+
+    dimensions = []
+    for field in _named(definition.get("dimensionFields")):
+        dimension = {"name": field["name"]}
+        if field.get("granularity"):
+            dimension["granularity"] = field["granularity"]
+        dimensions.append(dimension)
+    canonical["dimensionFields"] = sorted(dimensions, key=lambda f: f["name"])
+
+    canonical["measureFields"] = sorted((
+        {"name": f["name"], "measureTypes": sorted(f.get("measureTypes") or DEFAULT_MEASURE_TYPES)}
+        for f in _named(definition.get("measureFields"))
+    ), key=lambda f: f["name"])
+    return canonical
+
+
+def _comparable(existing: Dict, desired: Dict) -> Dict:
+    """Existing reflection in canonical form, honouring only what the spec pins"""
+    canonical = normalize_definition(existing)
+    # Dremio always reports a granularity; compare it only where the spec sets one
+    pinned = {d["name"] for d in desired["dimensionFields"] if "granularity" in d}
+    for dimension in canonical["dimensionFields"]:
+        if dimension["name"] not in pinned:
+            dimension.pop("granularity", None)
+    return canonical
+
+
+def _check_layout(definition: Dict) -> None:
+    """Partition/sort/distribution columns must be materialized by the reflection"""
+    columns_key = "displayFields" if definition["type"] == "RAW" else "dimensionFields"
+    columns = {f["name"] for f in definition[columns_key]}
+    for key in ("partitionFields", "sortFields", "distributionFields"):
+        missing = [f["name"] for f in definition[key] if f["name"] not in columns]
+        if missing:
+            raise ValueError(f"{definition['name']}: {key} {missing} must also be in {columns_key}")
+
+
+def spec_dataset_path(dataset: Dict) -> Tuple[str, ...]:
+    """
+    Dremio path of a spec dataset: an explicit `path`, or `log_type`
+    resolved from settings as [source, bucket, folder].
+    """
+    if "path" in dataset:
+        return tuple(dataset["path"])
+    if "log_type" in dataset:
+        return tuple(get_settings().dataset_path(dataset["log_type"]))
+    raise ValueError(f"Spec dataset needs a path or a log_type: {dataset}")
+
+
+def load_spec(path: Path) -> Dict[Tuple[str, ...], List[Dict]]:
+    """
+    Load the spec as dataset path → canonical reflection definitions.
+
+    Raises:
+        ValueError: on duplicate reflection names within a dataset, or
+            partition/sort/distribution fields the reflection does not contain
+    """
+    spec = yaml.safe_load(Path(path).read_text()) or {}
+    datasets = {}
+    for dataset in spec.get("datasets", []):
+        path_key = spec_dataset_path(dataset)
+        definitions = [normalize_definition(r) for r in dataset.get("reflections", [])]
+        for definition in definitions:
+            _check_layout(definition)
+        names = [d["name"] for d in definitions]
+        if len(names) != len(set(names)):
+            raise ValueError(f"Duplicate reflection names for {'.'.join(path_key)}")
+        datasets[path_key] = definitions
+    return datasets
+
+
+def load_refresh_policies(path: Path) -> Dict[Tuple[str, ...], Dict]:
+    """
+    Dataset path → refresh policy arguments, for datasets that declare one.
+
+    Raises:
+        ValueError: on unknown refresh_policy keys
+    """
+    spec = yaml.safe_load(Path(path).read_text()) or {}
+    policies = {}
+    for dataset in spec.get("datasets", []):
+        policy = dataset.get("refresh_policy")
+        if not policy:
+            continue
+        path_key = spec_dataset_path(dataset)
+        unknown = set(policy) - REFRESH_POLICY_KEYS
+        if unknown:
+            raise ValueError(f"Unknown refresh_policy keys for {'.'.join(path_key)}: "
+                             f"{', '.join(sorted(unknown))}")
+        policies[path_key] = policy
+    return policies
+
+
+def plan(spec: Dict[Tuple[str, ...], List[Dict]], dataset_ids: Dict[Tuple[str, ...], str],
+         existing: List[Dict], prune: bool = True) -> List[Action]:
+    """
+    Diff the spec against existing reflections.
+
+    Args:
+        spec: Dataset path → desired canonical definitions
+        dataset_ids: Dataset path → Dremio dataset id (missing datasets are skipped)
+        existing: Reflections from /api/v3/reflection
+        prune: Drop reflections on managed datasets that are not in the spec
+
+    Returns:
+        Actions in execution order (drops first, so names can be reused)
+    """
+    actions = []
+    for path, definitions in spec.items():
+        dataset_id = dataset_ids.get(path)
+        if dataset_id is None:
+            continue
+
+        by_name: Dict[str, List[Dict]] = {}
+        for reflection in existing:
+            if reflection.get("datasetId") == dataset_id:
+                by_name.setdefault(reflection["name"], []).append(reflection)
+
+        for desired in definitions:
+            current, *duplicates = by_name.pop(desired["name"], [None])
+            actions.extend(Action("drop", path, d["name"], existing=d, changes=("duplicate",))
+                           for d in duplicates)
+
+            if current is None:
+                actions.append(Action("create", path, desired["name"], desired=desired))
+                continue
+
+            current_canonical = _comparable(current, desired)
+            changes = tuple(k for k in desired if desired[k] != current_canonical.get(k))
+            if "type" in changes:
+                actions.append(Action("drop", path, desired["name"], existing=current, changes=("type",)))
+                actions.append(Action("create", path, desired["name"], desired=desired))
+            elif changes:
+                actions.append(Action("update", path, desired["name"], desired, current, changes))
+            else:
+                actions.append(Action("keep", path, desired["name"], desired, current))
+
+        if prune:
+            for name, reflections in by_name.items():
+                actions.extend(Action("drop", path, name, existing=r) for r in reflections)
+
+    order = {"drop": 0, "update": 1, "create": 2, "keep": 3}
+    return sorted(actions, key=lambda a: order[a.op])
+
+
+def resolve_dataset_ids(client: DremioClient, paths) -> Dict[Tuple[str, ...], str]:
+    """Dataset path → id for every path that exists in the catalog"""
+    ids = {}
+    for path in paths:
+        entity = client.get_catalog_by_path(list(path))
+        if entity and entity.get("id"):
+            ids[path] = entity["id"]
+        else:
+            logger.warning(f"Dataset not found (format the folder in Dremio first): {'.'.join(path)}")
+    return ids
+
+
+def apply(client: DremioClient, actions: List[Action],
+          dataset_ids: Dict[Tuple[str, ...], str]) -> int:
+    """
+    Execute create/update/drop actions.
+
+    Returns:
+        Number of failed actions
+    """
+    failures = 0
+    for action in actions:
+        if action.op == "keep":
+            continue
+        if action.op == "drop":
+            response = client.delete(f"/api/v3/reflection/{action.existing['id']}")
+        elif action.op == "create":
+            body = dict(action.desired, datasetId=dataset_ids[action.dataset])
+            response = client.post("/api/v3/reflection", json=body)
+        else:
+            body = dict(action.desired, datasetId=dataset_ids[action.dataset],
+                        id=action.existing["id"], tag=action.existing["tag"])
+            response = client.put(f"/api/v3/reflection/{action.existing['id']}", json=body)
+
+        if response.status_code in (200, 201, 204):
+            logger.info(f"  ✓ {action.op} {action.name}")
+        else:
+            failures += 1
+            logger.error(f"  ✗ {action.op} {action.name}: {response.status_code} {response.text[:300]}")
+    return failures
+
+
+def reconcile(client: DremioClient, spec_path: Path = DEFAULT_SPEC,
+              prune: bool = True, dry_run: bool = False) -> int:
+    """
+    Bring Dremio's reflections in line with the spec.
+
+    Returns:
+        Number of failed actions (0 on success)
+    """
+    spec = load_spec(spec_path)
+    policies = load_refresh_policies(spec_path)
+    dataset_ids = resolve_dataset_ids(client, spec)
+
+    response = client.get("/api/v3/reflection")
+    if response.status_code != 200:
+        logger.error(f"Failed to list reflections: {response.text}")
+        return 1
+
+    actions = plan(spec, dataset_ids, response.json().get("data", []), prune)
+    symbols = {"create": "+", "update": "~", "keep": "=", "drop": "-"}
+    for action in actions:
+        detail = f" ({', '.join(action.changes)})" if action.changes else ""
+        logger.info(f"{symbols[action.op]} {action.op:<6} {'.'.join(action.dataset)} :: {action.name}{detail}")
+
+    counts = {op: sum(a.op == op for a in actions) for op in symbols}
+    logger.info(f"Plan: {counts['create']} to create, {counts['update']} to update, "
+                f"{counts['drop']} to drop, {counts['keep']} unchanged")
+
+    if dry_run:
+        for path, policy in policies.items():
+            logger.info(f"  refresh policy {'.'.join(path)}: {policy}")
+        return 0
+
+    failures = apply(client, actions, dataset_ids)
+    if policies:
+        manager = DremioReflectionManager(client.url, client.username, client=client)
+        failures += sum(
+            not manager.set_refresh_policy(dataset_ids[path], **policy)
+            for path, policy in policies.items() if path in dataset_ids
+        )
+    return failures
+
+
+def main():
+    """Main execution flow"""
+    parser = argparse.ArgumentParser(description='Reconcile Dremio reflections with a declarative spec')
+    parser.add_argument('--spec', type=Path, default=DEFAULT_SPEC,
+                        help=f'Reflection spec YAML (default: config/{DEFAULT_SPEC.name})')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Show the plan without changing anything')
+    parser.add_argument('--no-prune', action='store_true',
+                        help='Keep reflections on managed datasets that are not in the spec')
+    args = parser.parse_args()
+
+    client = DremioClient(interactive=True)
+    failures = reconcile(client, args.spec, prune=not args.no_prune, dry_run=args.dry_run)
+    if failures:
+        logger.error(f"✗ {failures} reflection changes failed")
+        return 1
+    logger.info("✓ Reflections match the spec")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Watch Dremio Reflection Builds
+
+Waits for the reflections of one or more datasets to become usable:
+
+- Lists reflections once, then polls only the ones still pending, each by
+  id (GET /api/v3/reflection/{id}), concurrently across datasets
+- Polls with exponential backoff and jitter: quick checks right after a
+  build starts or makes progress, slowing down to POLL_MAX on long builds
+- Reports progress (materialized bytes) as it changes and returns as soon
+  as every reflection is available or has failed
+
+Requirements:
+    pip install requests
+
+Usage:
+    python3 scripts/reflection_watcher.py
+    python3 scripts/reflection_watcher.py --dataset minio/zeek-data/dns-activity-ocsf --timeout 900
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from dremio_client import DremioAuthError, DremioClient
+from settings import get_settings
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Watcher Configuration
+POLL_INITIAL = 1.0      # seconds before the first re-check
+POLL_MAX = 30.0         # backoff ceiling
+POLL_GROWTH = 2.0       # backoff multiplier per unchanged round
+POLL_JITTER = 0.25      # ± fraction of the delay, spreads concurrent watchers
+MAX_CONCURRENCY = 8     # status requests in flight
+WAIT_TIMEOUT = 300
+
+# combinedStatus values that end the wait
+READY_STATES = {"CAN_ACCELERATE", "CAN_ACCELERATE_WITH_FAILURES"}
+FAILED_STATES = {"FAILED", "INVALID", "DISABLED", "EXPIRED", "CANNOT_ACCELERATE_MANUAL"}
+
+
+@dataclass
+class ReflectionProgress:
+    """Build state of one reflection"""
+    id: str
+    name: str
+    dataset_id: str
+    status: str = "UNKNOWN"          # combinedStatus, or availability on older Dremio
+    refresh: str = "UNKNOWN"
+    current_size_bytes: int = 0
+    total_size_bytes: int = 0
+    failure_count: int = 0
+
+    @property
+    def ready(self) -> bool:
+        return self.status in READY_STATES or self.status == "AVAILABLE"
+
+    @property
+    def failed(self) -> bool:
+        return self.status in FAILED_STATES
+
+    @property
+    def done(self) -> bool:
+        return self.ready or self.failed
+
+    @classmethod
+    def from_api(cls, reflection: Dict) -> 'ReflectionProgress':
+        status = reflection.get("status", {})
+        return cls(
+            id=reflection["id"],
+            name=reflection.get("name", reflection["id"]),
+            dataset_id=reflection.get("datasetId", ""),
+            status=status.get("combinedStatus") or status.get("availability", "UNKNOWN"),
+            refresh=status.get("refresh", "UNKNOWN"),
+            current_size_bytes=reflection.get("currentSizeBytes", 0) or 0,
+            total_size_bytes=reflection.get("totalSizeBytes", 0) or 0,
+            failure_count=status.get("failureCount", 0) or 0,
+        )
+
+    def _key(self):
+        return (self.status, self.refresh, self.current_size_bytes, self.failure_count)
+
+
+def format_bytes(size: float) -> str:
+    """Human-readable byte count"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}" if unit != "B" else f"{int(size)} B"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def log_progress(progress: ReflectionProgress) -> None:
+    """Default progress callback: one line per state or size change"""
+    icon = "✓" if progress.ready else "✗" if progress.failed else "⏳"
+    size = f", {format_bytes(progress.current_size_bytes)}" if progress.current_size_bytes else ""
+    failures = f", {progress.failure_count} failures" if progress.failure_count else ""
+    logger.info(f"  {icon} {progress.name}: {progress.status} (refresh {progress.refresh}{size}{failures})")
+
+
+class ReflectionWatcher:
+    """Poll reflection status with backoff until builds finish"""
+
+    def __init__(self, client: DremioClient, poll_initial: float = POLL_INITIAL,
+                 poll_max: float = POLL_MAX, growth: float = POLL_GROWTH,
+                 jitter: float = POLL_JITTER, max_concurrency: int = MAX_CONCURRENCY):
+        self.client = client
+        self.poll_initial = poll_initial
+        self.poll_max = poll_max
+        self.growth = growth
+        self.jitter = jitter
+        self.max_concurrency = max_concurrency
+
+    def _delay(self, base: float) -> float:
+        return base * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def list_reflections(self, dataset_ids: List[str]) -> List[ReflectionProgress]:
+        """All reflections on the given datasets (one listing call)"""
+        response = self.client.get("/api/v3/reflection")
+        if response.status_code != 200:
+            raise RuntimeError(f"Failed to list reflections: {response.status_code} {response.text[:300]}")
+        wanted = set(dataset_ids)
+        return [
+            ReflectionProgress.from_api(r) for r in response.json().get("data", [])
+            if r.get("datasetId") in wanted
+        ]
+
+    def get_status(self, reflection_id: str) -> Optional[ReflectionProgress]:
+        """Current state of one reflection, or None if it disappeared"""
+        response = self.client.get(f"/api/v3/reflection/{reflection_id}")
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            raise RuntimeError(f"Failed to get reflection {reflection_id}: {response.status_code}")
+        return ReflectionProgress.from_api(response.json())
+
+    async def watch(self, dataset_ids: List[str], timeout: float = WAIT_TIMEOUT,
+                    on_progress: Callable[[ReflectionProgress], None] = log_progress
+                    ) -> Dict[str, ReflectionProgress]:
+        """
+        Wait for the reflections of several datasets.
+
+        Args:
+            dataset_ids: Datasets to watch
+            timeout: Seconds to wait in total
+            on_progress: Called whenever a reflection's state or size changes
+
+        Returns:
+            Reflection id → last known progress (check .ready / .failed)
+        """
+        state = {p.id: p for p in await asyncio.to_thread(self.list_reflections, dataset_ids)}
+        for dataset_id in set(dataset_ids) - {p.dataset_id for p in state.values()}:
+            logger.warning(f"No reflections on dataset {dataset_id}")
+        for progress in state.values():
+            on_progress(progress)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def poll(reflection_id: str) -> Optional[ReflectionProgress]:
+            async with semaphore:
+                return await asyncio.to_thread(self.get_status, reflection_id)
+
+        deadline = time.monotonic() + timeout
+        delay = self.poll_initial
+        pending = [p.id for p in state.values() if not p.done]
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning(f"Timeout after {timeout:.0f}s - {len(pending)} reflections still building")
+                break
+            await asyncio.sleep(min(self._delay(delay), remaining))
+
+            transitioned = False
+            for reflection_id, progress in zip(pending, await asyncio.gather(*(poll(i) for i in pending))):
+                previous = state[reflection_id]
+                if progress is None:
+                    logger.warning(f"  Reflection {previous.name} was removed")
+                    previous.status = "REMOVED"
+                    transitioned = True
+                    continue
+                if progress._key() != previous._key():
+                    state[reflection_id] = progress
+                    on_progress(progress)
+                    transitioned |= (progress.status, progress.refresh) != (previous.status, previous.refresh)
+
+            pending = [i for i in pending if state[i].status != "REMOVED" and not state[i].done]
+            # A state change often precedes another (refresh → available): check
+            # again soon. Growing sizes alone do not reset the backoff.
+            delay = self.poll_initial if transitioned else min(delay * self.growth, self.poll_max)
+
+        return state
+
+
+async def watch_reflections(client: DremioClient, dataset_ids: List[str],
+                            timeout: float = WAIT_TIMEOUT, **kwargs) -> bool:
+    """
+    Wait for reflections from async code (e.g. the Playwright scripts).
+
+    Returns:
+        True if every reflection is ready
+    """
+    started = time.monotonic()
+    state = await ReflectionWatcher(client, **kwargs).watch(dataset_ids, timeout)
+    ready = [p for p in state.values() if p.ready]
+    failed = [p for p in state.values() if p.failed]
+    if state and len(ready) == len(state):
+        logger.info(f"✓ All {len(state)} reflections available! "
+                    f"(took {time.monotonic() - started:.0f}s, "
+                    f"{format_bytes(sum(p.current_size_bytes for p in ready))})")
+        return True
+    if failed:
+        logger.error(f"✗ {len(failed)} reflections failed: {', '.join(p.name for p in failed)}")
+    return False
+
+
+async def watch_dataset_paths(client: DremioClient, paths: List[List[str]],
+                              timeout: float = WAIT_TIMEOUT, **kwargs) -> bool:
+    """
+    watch_reflections() for catalog paths instead of dataset ids.
+
+    Returns:
+        True if every dataset exists and all its reflections are ready
+    """
+    dataset_ids = []
+    for path in paths:
+        entity = await asyncio.to_thread(client.get_catalog_by_path, path)
+        if not entity:
+            logger.error(f"Dataset not found: {'/'.join(path)}")
+            return False
+        dataset_ids.append(entity["id"])
+    return await watch_reflections(client, dataset_ids, timeout, **kwargs)
+
+
+def wait_for_reflections(client: DremioClient, dataset_ids: List[str],
+                         timeout: float = WAIT_TIMEOUT, **kwargs) -> bool:
+    """Blocking wrapper around watch_reflections()"""
+    return asyncio.run(watch_reflections(client, dataset_ids, timeout, **kwargs))
+
+
+def main():
+    """Main execution flow"""
+    default_path = get_settings().dataset_path()
+    parser = argparse.ArgumentParser(description='Wait for Dremio reflections to finish building')
+    parser.add_argument('--dataset', action='append',
+                        help=f'Dataset path, slash-separated (repeatable, default: {"/".join(default_path)})')
+    parser.add_argument('--timeout', type=float, default=WAIT_TIMEOUT,
+                        help=f'Seconds to wait (default: {WAIT_TIMEOUT})')
+    parser.add_argument('--poll-max', type=float, default=POLL_MAX,
+                        help=f'Longest interval between status checks (default: {POLL_MAX:g}s)')
+    parser.add_argument('--url', type=str, help='Dremio URL (default: dremio.url setting)')
+    parser.add_argument('--username', type=str, help='Dremio user (default: dremio.username setting)')
+    args = parser.parse_args()
+
+    paths = [d.split('/') for d in args.dataset] if args.dataset else [default_path]
+
+    try:
+        client = DremioClient(args.url, args.username, interactive=True)
+        client.login()
+    except DremioAuthError as e:
+        logger.error(str(e))
+        return 1
+
+    logger.info(f"Watching reflections on {len(paths)} dataset(s)...")
+    ready = asyncio.run(watch_dataset_paths(client, paths, args.timeout, poll_max=args.poll_max))
+    return 0 if ready else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
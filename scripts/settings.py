@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Shared Settings for Loaders, Query Tools and Dremio Scripts
+
+One typed configuration for endpoints, credentials, data paths, the
+bucket/folder layout and ingest tuning, so the same code can point at a
+laptop stack or a production MinIO/Dremio without editing source.
+
+Values are resolved on first use, in this order:
+
+1. Defaults below (the local docker-compose stack)
+2. A YAML or JSON file: $ZEEK_DEMO_CONFIG, else config/settings.yaml if it
+   exists (see config/settings.example.yaml)
+3. Environment variables ZEEK_DEMO_<SECTION>_<FIELD>, e.g.
+   ZEEK_DEMO_MINIO_ENDPOINT or ZEEK_DEMO_INGEST_BATCH_SIZE
+
+Importing this module reads nothing and connects nowhere: get_settings()
+loads the configuration once, s3_client() creates one shared boto3 client
+on first call (boto3 clients are thread-safe).
+
+Requirements:
+    pip install boto3 PyYAML
+
+Usage:
+    from settings import get_settings, s3_client
+    settings = get_settings()
+    s3_client().upload_file(path, settings.minio.bucket, key)
+
+    python3 scripts/settings.py                  # effective settings, secrets masked
+    ZEEK_DEMO_CONFIG=config/prod.yaml python3 scripts/settings.py --show-secrets
+"""
+
+import argparse
+import dataclasses
+import json
+import logging
+import os
+import sys
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Union, get_args, get_origin, get_type_hints
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CONFIG = REPO_ROOT / "config" / "settings.yaml"
+CONFIG_ENV = "ZEEK_DEMO_CONFIG"
+ENV_PREFIX = "ZEEK_DEMO_"
+
+# Environment variables the scripts honoured before this module existed
+LEGACY_ENV = {
+    'DREMIO_USERNAME': ('dremio', 'username'),
+    'DREMIO_TOKEN_CACHE': ('dremio', 'token_cache'),
+}
+
+SECRET_FIELDS = {'secret_key'}
+
+
+@dataclass
+class MinioSettings:
+    """S3-compatible object store holding the OCSF datasets"""
+    endpoint: str = "http://localhost:9000"
+    access_key: str = "minioadmin"
+    secret_key: str = "minioadmin"
+    bucket: str = "zeek-data"
+    region: Optional[str] = None
+
+    @property
+    def scheme(self) -> str:
+        return urlsplit(self.endpoint).scheme or 'http'
+
+    @property
+    def host(self) -> str:
+        """host:port of the endpoint (for clients that take no URL)"""
+        parts = urlsplit(self.endpoint)
+        return parts.netloc or parts.path
+
+    def arrow_filesystem(self):
+        """pyarrow S3 filesystem over this store"""
+        import pyarrow.fs as pafs
+
+        options = {'region': self.region} if self.region else {}
+        return pafs.S3FileSystem(
+            endpoint_override=self.host,
+            access_key=self.access_key,
+            secret_key=self.secret_key,
+            scheme=self.scheme,
+            **options,
+        )
+
+
+@dataclass
+class DremioSettings:
+    """Dremio endpoints and the source the bucket is mounted as"""
+    url: str = "http://localhost:9047"
+    flight_port: int = 32010
+    username: str = "admin"
+    source: str = "minio"
+    minio_endpoint: str = "http://minio:9000"  # MinIO as Dremio reaches it (docker network)
+    token_cache: Path = Path.home() / ".cache" / "zeek-iceberg-demo" / "dremio-tokens.json"
+
+
+@dataclass
+class IcebergSettings:
+    """Hive metastore catalog used by the PyIceberg loader"""
+    metastore_uri: str = "thrift://localhost:9083"
+    warehouse: str = "s3a://iceberg-warehouse/"
+
+
+@dataclass
+class PathSettings:
+    """Local input locations"""
+    zeek_data_dir: Path = Path("/home/jerem/splunk-db-connect-benchmark/data/samples")
+    demo_data_dir: Path = REPO_ROOT / "data"  # fallback for zeek_*.json samples
+
+
+@dataclass
+class IngestSettings:
+    """Batching, Parquet layout and pipeline sizing for the loaders"""
+    batch_size: int = 50000               # NDJSON lines per transform batch
+    row_group_size: int = 50000           # Parquet rows per row group
+    compression: str = "snappy"
+    transform_workers: int = field(default_factory=lambda: min(4, os.cpu_count() or 1))
+    upload_workers: int = 4               # concurrent MinIO uploads
+    memory_budget_mb: int = 1024          # bytes in flight before the reader waits
+    queue_depth: int = 4                  # batches queued between two stages
+    partition_idle_batches: int = 8       # close (and upload) an idle day after this many batches
+
+
+def _default_folders() -> Dict[str, str]:
+    return {
+        'conn': "network-activity-ocsf",
+        'dns': "dns-activity-ocsf",
+        'http': "http-activity-ocsf",
+        'ssl': "tls-activity-ocsf",
+        'files': "file-activity-ocsf",
+    }
+
+
+@dataclass
+class Settings:
+    """Everything the scripts need to know about the environment"""
+    minio: MinioSettings = field(default_factory=MinioSettings)
+    dremio: DremioSettings = field(default_factory=DremioSettings)
+    iceberg: IcebergSettings = field(default_factory=IcebergSettings)
+    paths: PathSettings = field(default_factory=PathSettings)
+    ingest: IngestSettings = field(default_factory=IngestSettings)
+    # One bucket folder (Dremio dataset) per Zeek log type
+    folders: Dict[str, str] = field(default_factory=_default_folders)
+
+    def dataset_path(self, log_type: str = 'conn') -> List[str]:
+        """Dremio path of a log type's dataset: [source, bucket, folder]"""
+        return [self.dremio.source, self.minio.bucket, self.folders[log_type]]
+
+    def to_dict(self, show_secrets: bool = False) -> Dict:
+        data = dataclasses.asdict(self)
+        for section in data.values():
+            for name, value in section.items():
+                if isinstance(value, Path):
+                    section[name] = str(value)
+                elif name in SECRET_FIELDS and value and not show_secrets:
+                    section[name] = '***'
+        return data
+
+
+def _coerce(value, annotation, name: str):
+    """Convert a file or environment value to a field's declared type"""
+    if get_origin(annotation) is Union:  # Optional[X]
+        if value is None or value == '':
+            return None
+        annotation = next(a for a in get_args(annotation) if a is not type(None))
+    if annotation is int:
+        if isinstance(value, bool):
+            raise ValueError(f"{name}: expected an integer, got {value!r}")
+        try:
+            return int(str(value).replace('_', ''))
+        except ValueError:
+            raise ValueError(f"{name}: expected an integer, got {value!r}") from None
+    if annotation is Path:
+        path = Path(value).expanduser()
+        return path if path.is_absolute() else REPO_ROOT / path
+    if annotation is str:
+        return str(value)
+    return value
+
+
+def _apply(section, values: Mapping, origin: str, name: str) -> None:
+    """Set a section's fields from a mapping, rejecting unknown keys"""
+    if not isinstance(values, Mapping):
+        raise ValueError(f"{origin}: '{name}' must be a mapping")
+    hints = get_type_hints(type(section))
+    unknown = set(values) - set(hints)
+    if unknown:
+        raise ValueError(f"{origin}: unknown {name} setting(s): {', '.join(sorted(unknown))}")
+    for key, value in values.items():
+        setattr(section, key, _coerce(value, hints[key], f"{origin}: {name}.{key}"))
+
+
+def _read_file(path: Path) -> Dict:
+    text = path.read_text()
+    if path.suffix == '.json':
+        data = json.loads(text)
+    else:
+        import yaml
+        data = yaml.safe_load(text)
+    if data is None:
+        return {}
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected a mapping of sections")
+    return data
+
+
+def load_settings(path: Optional[Path] = None,
+                  environ: Optional[Mapping[str, str]] = None) -> Settings:
+    """
+    Resolve settings from defaults, a config file and the environment.
+
+    Args:
+        path: YAML/JSON config file (default: $ZEEK_DEMO_CONFIG, else
+            config/settings.yaml when present)
+        environ: Environment to read overrides from (default: os.environ)
+
+    Returns:
+        Fully typed Settings
+
+    Raises:
+        ValueError: Unknown section/field or a value of the wrong type
+        FileNotFoundError: An explicitly requested config file is missing
+    """
+    environ = os.environ if environ is None else environ
+    settings = Settings()
+    sections = {f.name for f in dataclasses.fields(Settings)}
+
+    if path is None and environ.get(CONFIG_ENV):
+        path = Path(environ[CONFIG_ENV])
+    if path is None and DEFAULT_CONFIG.exists():
+        path = DEFAULT_CONFIG
+    if path is not None:
+        path = Path(path).expanduser()
+        data = _read_file(path)
+        unknown = set(data) - sections
+        if unknown:
+            raise ValueError(f"{path}: unknown section(s): {', '.join(sorted(unknown))}")
+        for name, values in data.items():
+            if name == 'folders':
+                if not isinstance(values, Mapping):
+                    raise ValueError(f"{path}: 'folders' must be a mapping")
+                settings.folders.update({str(k): str(v) for k, v in values.items()})
+            else:
+                _apply(getattr(settings, name), values, str(path), name)
+        logger.debug(f"Loaded settings from {path}")
+
+    overrides = [(key, target) for key, target in LEGACY_ENV.items() if key in environ]
+    for key in sorted(environ):
+        if not key.startswith(ENV_PREFIX) or key == CONFIG_ENV:
+            continue
+        section, _, name = key[len(ENV_PREFIX):].lower().partition('_')
+        if section not in sections or not name:
+            raise ValueError(f"{key}: not a known setting (expected {ENV_PREFIX}<SECTION>_<FIELD>)")
+        overrides.append((key, (section, name)))
+    for key, (section, name) in overrides:
+        if section == 'folders':
+            settings.folders[name] = environ[key]
+        else:
+            _apply(getattr(settings, section), {name: environ[key]}, key, section)
+
+    return settings
+
+
+_settings: Optional[Settings] = None
+_s3_client = None
+_lock = threading.Lock()
+
+
+def get_settings() -> Settings:
+    """Process-wide settings, loaded on first call"""
+    global _settings
+    with _lock:
+        if _settings is None:
+            _settings = load_settings()
+        return _settings
+
+
+def s3_client():
+    """Shared boto3 S3 client for the configured MinIO, created on first call"""
+    global _s3_client
+    minio = get_settings().minio
+    with _lock:
+        if _s3_client is None:
+            import boto3
+
+            _s3_client = boto3.client(
+                's3',
+                endpoint_url=minio.endpoint,
+                aws_access_key_id=minio.access_key,
+                aws_secret_access_key=minio.secret_key,
+                region_name=minio.region,
+            )
+        return _s3_client
+
+
+def reset_settings() -> None:
+    """Forget the loaded settings and S3 client (re-read on next use)"""
+    global _settings, _s3_client
+    with _lock:
+        _settings = None
+        _s3_client = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show the effective settings')
+    parser.add_argument('--config', type=Path,
+                        help=f'Config file (default: ${CONFIG_ENV}, else {DEFAULT_CONFIG})')
+    parser.add_argument('--show-secrets', action='store_true', help='Do not mask credentials')
+    args = parser.parse_args()
+
+    try:
+        settings = load_settings(args.config)
+    except (OSError, ValueError) as e:
+        logger.error(f"✗ {e}")
+        return 1
+    print(json.dumps(settings.to_dict(args.show_secrets), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    sys.exit(main())
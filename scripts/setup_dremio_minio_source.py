@@ -18,8 +18,13 @@ import asyncio
 import logging
 import sys
 import os
+from pathlib import Path
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
 
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from settings import get_settings
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -27,16 +32,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Configuration
-DREMIO_URL = "http://localhost:9047"
-DREMIO_USERNAME = os.getenv("DREMIO_USERNAME", "admin")
+# Configuration (see settings.py)
+SETTINGS = get_settings()
+DREMIO_URL = SETTINGS.dremio.url
+DREMIO_USERNAME = SETTINGS.dremio.username
 DREMIO_PASSWORD = os.getenv("DREMIO_PASSWORD", "")
 
-# MinIO Configuration
-MINIO_ENDPOINT = "minio:9000"
-MINIO_ACCESS_KEY = "minioadmin"
-MINIO_SECRET_KEY = "minioadmin"
-MINIO_SOURCE_NAME = "minio"
+# MinIO Configuration, as seen from the Dremio container
+MINIO_ENDPOINT = SETTINGS.dremio.minio_endpoint
+MINIO_ACCESS_KEY = SETTINGS.minio.access_key
+MINIO_SECRET_KEY = SETTINGS.minio.secret_key
+MINIO_SOURCE_NAME = SETTINGS.dremio.source
 
 
 async def setup_minio_source(page):
@@ -160,8 +166,8 @@ async def setup_minio_source(page):
 
             for selector in endpoint_selectors:
                 try:
-                    await page.fill(selector, f"http://{MINIO_ENDPOINT}", timeout=2000)
-                    logger.info(f"    ✓ Endpoint: http://{MINIO_ENDPOINT}")
+                    await page.fill(selector, MINIO_ENDPOINT, timeout=2000)
+                    logger.info(f"    ✓ Endpoint: {MINIO_ENDPOINT}")
                     break
                 except:
                     continue
@@ -309,7 +315,7 @@ async def main():
                 logger.info("")
                 logger.info("Next steps:")
                 logger.info("1. Verify you can see 'minio' in sources")
-                logger.info("2. Navigate to: minio > zeek-data > network-activity-ocsf")
+                logger.info(f"2. Navigate to: {' > '.join(SETTINGS.dataset_path())}")
                 logger.info("3. Format the folder as Parquet if needed")
                 logger.info("4. Run reflection setup script")
                 logger.info("")
@@ -328,7 +334,7 @@ async def main():
                 logger.info("3. Fill in:")
                 logger.info(f"   - Name: {MINIO_SOURCE_NAME}")
                 logger.info("   - Enable compatibility mode: YES")
-                logger.info(f"   - Endpoint: http://{MINIO_ENDPOINT}")
+                logger.info(f"   - Endpoint: {MINIO_ENDPOINT}")
                 logger.info(f"   - Access Key: {MINIO_ACCESS_KEY}")
                 logger.info(f"   - Secret Key: {MINIO_SECRET_KEY}")
                 logger.info("4. Click Save")
@@ -22,6 +22,12 @@ import getpass
 from pathlib import Path
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
 
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from dremio_client import DremioClient
+from reflection_watcher import watch_dataset_paths
+from settings import get_settings
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -30,9 +36,10 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Configuration
-DREMIO_URL = "http://localhost:9047"
-DREMIO_USERNAME = "admin"
-DATASET_PATH = ["minio", "zeek-data", "network-activity-ocsf"]
+DREMIO_URL = get_settings().dremio.url
+DREMIO_USERNAME = get_settings().dremio.username
+DATASET_PATH = get_settings().dataset_path()
+BUILD_TIMEOUT = 300  # seconds to keep the browser open while reflections build
 
 
 async def login_to_dremio(page, username: str, password: str):
@@ -391,12 +398,13 @@ async def main():
             logger.info("Playwright automation complete")
             logger.info("=" * 70)
             logger.info("")
-            logger.info("Browser will remain open for 60 seconds for manual verification")
+            logger.info("Browser stays open until the reflections finish building")
             logger.info("You can manually create additional reflections if needed")
             logger.info("")
 
-            # Keep browser open for manual inspection
-            await asyncio.sleep(60)
+            # Keep browser open for manual inspection while the build runs
+            with DremioClient(DREMIO_URL, DREMIO_USERNAME, password) as client:
+                await watch_dataset_paths(client, [DATASET_PATH], timeout=BUILD_TIMEOUT)
 
         except Exception as e:
             logger.error(f"Unexpected error: {e}", exc_info=True)
@@ -9,10 +9,21 @@ Rationale:
 - OCSF compliance = standardized field names and semantics
 - Flat structure = optimal query performance
 - Production validated = AWS Security Lake uses similar approach
+
+Supported Zeek log types (dispatched on `_path`):
+- conn  → Network Activity (4001)
+- dns   → DNS Activity (4003)
+- http  → HTTP Activity (4002)
+- ssl   → Network Activity (4001) with TLS extension fields
+- files → File System Activity (1001)
+
+Records a mapper cannot handle go to a dead-letter sink (dead_letter.py)
+with an error code, instead of a warning per record.
 """
 
 import json
 import logging
+import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -20,6 +31,10 @@ import pandas as pd
 import pyarrow as pa
 import pyarrow.parquet as pq
 
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from dead_letter import UNSUPPORTED_LOG_TYPE, DeadLetterSink
+
 logger = logging.getLogger(__name__)
 
 # OCSF Protocol mappings
@@ -57,176 +72,562 @@ ACTIVITY_ID_MAP = {
     'smtp': 5,         # SMTP email
 }
 
-def transform_zeek_to_ocsf_flat(zeek_records: List[Dict]) -> pd.DataFrame:
+# OCSF class metadata per Zeek log type:
+# (category_uid, category_name, class_uid, class_name)
+LOG_TYPE_CLASSES = {
+    'conn': (4, 'Network Activity', 4001, 'Network Activity'),
+    'dns': (4, 'Network Activity', 4003, 'DNS Activity'),
+    'http': (4, 'Network Activity', 4002, 'HTTP Activity'),
+    'ssl': (4, 'Network Activity', 4001, 'Network Activity'),  # TLS extension
+    'files': (1, 'System Activity', 1001, 'File System Activity'),
+}
+
+# OCSF DNS Activity (class_uid 4003) activity IDs
+DNS_ACTIVITY_ID_MAP = {
+    'Query': 1,
+    'Response': 2,
+    'Traffic': 6,
+}
+
+# OCSF HTTP Activity (class_uid 4002) activity IDs, keyed by HTTP method
+HTTP_ACTIVITY_ID_MAP = {
+    'CONNECT': 1,
+    'DELETE': 2,
+    'GET': 3,
+    'HEAD': 4,
+    'OPTIONS': 5,
+    'POST': 6,
+    'PUT': 7,
+    'TRACE': 8,
+}
+
+# Parquet writer settings shared by every OCSF data file
+PARQUET_ROW_GROUP_SIZE = 50000  # Optimize for query performance
+PARQUET_WRITE_OPTIONS = {
+    'use_dictionary': True,  # Dictionary encoding for repeated values
+    'write_statistics': True,  # Statistics for query optimization
+    'data_page_size': 1024 * 1024,  # 1MB pages
+    'version': '2.6',  # Latest Parquet format
+}
+
+# Identifier columns holding Zeek string IDs; excluded from integer coercion
+STRING_ID_COLUMNS = {
+    'connection_info_uid',  # Zeek connection uid, the join key across log types
+    'query_uid',
+    'file_uid',
+}
+
+
+def _zeek_conn_id(record: Dict) -> tuple:
+    """Extract (src_ip, src_port, dst_ip, dst_port) from flat or nested Zeek id fields"""
+    conn_id = record.get('id', {})
+    return (
+        record.get('id.orig_h') or conn_id.get('orig_h'),
+        record.get('id.orig_p') or conn_id.get('orig_p'),
+        record.get('id.resp_h') or conn_id.get('resp_h'),
+        record.get('id.resp_p') or conn_id.get('resp_p'),
+    )
+
+
+def _class_fields(log_type: str, activity_id: int, activity_name: str) -> Dict:
+    """OCSF classification fields shared by every log type mapper"""
+    category_uid, category_name, class_uid, class_name = LOG_TYPE_CLASSES[log_type]
+    return {
+        'activity_id': activity_id,
+        'activity_name': activity_name,
+        'category_uid': category_uid,
+        'category_name': category_name,
+        'class_uid': class_uid,
+        'class_name': class_name,
+        'confidence': 100,  # High confidence (direct observation)
+        'severity_id': 1,   # Informational (normal traffic)
+        'type_uid': class_uid * 100 + activity_id,
+        'type_name': f'{class_name}: {activity_name}',
+    }
+
+
+def _time_fields(ts: float) -> Dict:
+    """OCSF time fields (milliseconds since epoch)"""
+    return {
+        'time': int(ts * 1000),
+        'event_time': int(ts * 1000),
+        'metadata_logged_time': int(ts * 1000),
+        'metadata_processed_time': int(datetime.now().timestamp() * 1000),
+    }
+
+
+def _endpoint_fields(record: Dict, src_ip, src_port, dst_ip, dst_port) -> Dict:
+    """Flattened OCSF source/destination endpoint fields"""
+    return {
+        # === Source Endpoint (Flattened) ===
+        'src_endpoint_ip': src_ip,
+        'src_endpoint_port': int(src_port) if src_port else None,
+        'src_endpoint_domain': None,  # Could be enriched
+        'src_endpoint_hostname': None,  # Could be enriched
+        'src_endpoint_is_local': record.get('local_orig', False),
+        'src_endpoint_location_country': record.get('orig_cc'),
+        'src_endpoint_mac': record.get('orig_l2_addr'),
+
+        # === Destination Endpoint (Flattened) ===
+        'dst_endpoint_ip': dst_ip,
+        'dst_endpoint_port': int(dst_port) if dst_port else None,
+        'dst_endpoint_domain': None,  # Could be enriched
+        'dst_endpoint_hostname': None,  # Could be enriched
+        'dst_endpoint_is_local': record.get('local_resp', False),
+        'dst_endpoint_location_country': record.get('resp_cc'),
+        'dst_endpoint_mac': record.get('resp_l2_addr'),
+    }
+
+
+def _metadata_fields(log_type: str) -> Dict:
+    """OCSF product metadata fields"""
+    return {
+        'metadata_product_name': 'Zeek',
+        'metadata_product_vendor_name': 'Zeek Project',
+        'metadata_product_version': '5.0.0',  # Could be parameterized
+        'metadata_log_name': log_type,
+        'metadata_log_version': '1.0.0',
+    }
+
+
+def _observable_fields(src_ip, src_port, dst_ip, dst_port) -> Dict:
+    """OCSF observables (for threat hunting)"""
+    return {
+        'observables_name_src_ip': src_ip,
+        'observables_name_dst_ip': dst_ip,
+        'observables_name_src_port': str(src_port) if src_port else None,
+        'observables_name_dst_port': str(dst_port) if dst_port else None,
+        'observables_type_src_ip': 'IP Address',
+        'observables_type_dst_ip': 'IP Address',
+    }
+
+
+def _transform_records(zeek_records: List[Dict], log_type: str, mapper,
+                       dead_letter: Optional[DeadLetterSink] = None) -> pd.DataFrame:
     """
-    Transform Zeek conn logs to OCSF-compliant flat schema.
+    Apply a per-record OCSF mapper and build a typed DataFrame.
 
-    This creates a denormalized structure with OCSF field naming conventions,
-    optimized for analytical workloads while maintaining semantic compliance.
+    This is the shared machinery behind every log type transform: per-record
+    error handling, DataFrame construction and integer type coercion.
 
     Args:
-        zeek_records: List of Zeek conn log dictionaries
+        zeek_records: List of Zeek log dictionaries of a single log type
+        log_type: Zeek log type (conn, dns, http, ssl, files)
+        mapper: Function mapping one Zeek record to a flat OCSF dict
+        dead_letter: Sink for records the mapper fails on (default: count
+            and summarize them for this call only)
 
     Returns:
         DataFrame with OCSF-compliant flat schema
     """
-    logger.info(f"Transforming {len(zeek_records):,} Zeek records to OCSF flat schema")
+    logger.info(f"Transforming {len(zeek_records):,} Zeek {log_type} records to OCSF flat schema")
 
+    sink = dead_letter if dead_letter is not None else DeadLetterSink()
     transformed = []
 
     for record in zeek_records:
         try:
-            # Parse timestamp
-            ts = float(record.get('ts', 0))
-            timestamp = datetime.fromtimestamp(ts)
-            event_date = timestamp.date()
-
-            # Extract connection data
-            src_ip = record.get('id.orig_h') or record.get('id', {}).get('orig_h')
-            src_port = record.get('id.orig_p') or record.get('id', {}).get('orig_p')
-            dst_ip = record.get('id.resp_h') or record.get('id', {}).get('resp_h')
-            dst_port = record.get('id.resp_p') or record.get('id', {}).get('resp_p')
-
-            # Protocol mapping
-            proto = record.get('proto', 'unknown').lower()
-            protocol_num = PROTOCOL_MAP.get(proto, 0)
-
-            # Service detection
-            service = record.get('service')
-            activity_id = ACTIVITY_ID_MAP.get(service, 6) if service else 6
-
-            # Connection state mapping
-            conn_state = record.get('conn_state', 'OTH')
-            conn_state_id = CONN_STATE_MAP.get(conn_state, 99)
-
-            # Build OCSF-compliant flat record
-            ocsf_record = {
-                # === OCSF Metadata Fields ===
-                'activity_id': activity_id,
-                'activity_name': service if service else 'Traffic',
-                'category_uid': 4,  # Network Activity
-                'category_name': 'Network Activity',
-                'class_uid': 4001,  # Network Activity class
-                'class_name': 'Network Activity',
-                'confidence': 100,  # High confidence (direct observation)
-                'severity_id': 1,   # Informational (normal traffic)
-                'type_uid': 400106, # Network Traffic (4001 * 100 + activity_id)
-                'type_name': f'Network Activity: {service if service else "Traffic"}',
-
-                # === OCSF Time Fields ===
-                'time': int(ts * 1000),  # OCSF uses milliseconds
-                'event_time': int(ts * 1000),
-                'metadata_logged_time': int(ts * 1000),
-                'metadata_processed_time': int(datetime.now().timestamp() * 1000),
-
-                # === Source Endpoint (Flattened) ===
-                'src_endpoint_ip': src_ip,
-                'src_endpoint_port': int(src_port) if src_port else None,
-                'src_endpoint_domain': None,  # Could be enriched
-                'src_endpoint_hostname': None,  # Could be enriched
-                'src_endpoint_is_local': record.get('local_orig', False),
-                'src_endpoint_location_country': record.get('orig_cc'),
-                'src_endpoint_mac': record.get('orig_l2_addr'),
-
-                # === Destination Endpoint (Flattened) ===
-                'dst_endpoint_ip': dst_ip,
-                'dst_endpoint_port': int(dst_port) if dst_port else None,
-                'dst_endpoint_domain': None,  # Could be enriched
-                'dst_endpoint_hostname': None,  # Could be enriched
-                'dst_endpoint_is_local': record.get('local_resp', False),
-                'dst_endpoint_location_country': record.get('resp_cc'),
-                'dst_endpoint_mac': record.get('resp_l2_addr'),
-
-                # === Connection Info (Flattened) ===
-                'connection_info_uid': record.get('uid'),
-                'connection_info_protocol_num': protocol_num,
-                'connection_info_protocol_name': proto.upper(),
-                'connection_info_protocol_ver': 'IPv4',  # Could detect IPv6
-                'connection_info_tcp_flags': record.get('history'),
-                'connection_info_direction': 'Unknown',  # Could be enriched
-                'connection_info_boundary': 'Unknown',  # Could be enriched based on local_orig/resp
-
-                # === Traffic Metrics (Flattened) ===
-                'traffic_bytes_in': int(record.get('resp_bytes', 0)) if record.get('resp_bytes') is not None else 0,
-                'traffic_bytes_out': int(record.get('orig_bytes', 0)) if record.get('orig_bytes') is not None else 0,
-                'traffic_packets_in': int(record.get('resp_pkts', 0)) if record.get('resp_pkts') is not None else 0,
-                'traffic_packets_out': int(record.get('orig_pkts', 0)) if record.get('orig_pkts') is not None else 0,
-                'traffic_bytes': (
-                    int(record.get('resp_bytes', 0) or 0) +
-                    int(record.get('orig_bytes', 0) or 0)
-                ),
-                'traffic_packets': (
-                    int(record.get('resp_pkts', 0) or 0) +
-                    int(record.get('orig_pkts', 0) or 0)
-                ),
-
-                # === Network Metadata (Flattened) ===
-                'metadata_product_name': 'Zeek',
-                'metadata_product_vendor_name': 'Zeek Project',
-                'metadata_product_version': '5.0.0',  # Could be parameterized
-                'metadata_log_name': 'conn',
-                'metadata_log_version': '1.0.0',
-
-                # === Observables (for threat hunting) ===
-                'observables_name_src_ip': src_ip,
-                'observables_name_dst_ip': dst_ip,
-                'observables_name_src_port': str(src_port) if src_port else None,
-                'observables_name_dst_port': str(dst_port) if dst_port else None,
-                'observables_type_src_ip': 'IP Address',
-                'observables_type_dst_ip': 'IP Address',
-
-                # === Additional Zeek-specific fields (OCSF unmapped namespace) ===
-                'unmapped_conn_state': conn_state,
-                'unmapped_conn_state_id': conn_state_id,
-                'unmapped_duration': float(record.get('duration', 0.0)) if record.get('duration') else 0.0,
-                'unmapped_missed_bytes': int(record.get('missed_bytes', 0)) if record.get('missed_bytes') is not None else 0,
-                'unmapped_tunnel_parents': json.dumps(record.get('tunnel_parents', [])),
-                'unmapped_vlan': record.get('vlan'),
-                'unmapped_inner_vlan': record.get('inner_vlan'),
-                'unmapped_community_id': record.get('community_id'),
-
-                # === Partitioning ===
-                'event_date': event_date.isoformat(),
-            }
-
-            transformed.append(ocsf_record)
-
+            transformed.append(mapper(record))
         except Exception as e:
-            logger.warning(f"Error transforming record: {e}")
-            logger.debug(f"Problematic record: {record}")
-            continue
+            sink.add_error(log_type, e, record)
+
+    if dead_letter is None:
+        sink.log_summary()
 
     # Create DataFrame
     df = pd.DataFrame(transformed)
 
     # Ensure correct data types
-    int_columns = [col for col in df.columns if col.endswith('_id') or col.endswith('_uid') or col.endswith('_num')]
+    int_columns = [
+        col for col in df.columns
+        if (col.endswith('_id') or col.endswith('_uid') or col.endswith('_num'))
+        and col not in STRING_ID_COLUMNS
+    ]
     for col in int_columns:
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype('Int64')
 
-    logger.info(f"✓ Transformed {len(df):,} records to OCSF flat schema")
+    logger.info(f"✓ Transformed {len(df):,} {log_type} records to OCSF flat schema")
     logger.info(f"  Schema has {len(df.columns)} fields")
 
     return df
 
-def validate_ocsf_compliance(df: pd.DataFrame) -> Dict[str, bool]:
+
+def _map_conn_record(record: Dict) -> Dict:
+    """Map a single Zeek conn record to OCSF Network Activity (4001)"""
+    # Parse timestamp
+    ts = float(record.get('ts', 0))
+    timestamp = datetime.fromtimestamp(ts)
+    event_date = timestamp.date()
+
+    # Extract connection data
+    src_ip, src_port, dst_ip, dst_port = _zeek_conn_id(record)
+
+    # Protocol mapping
+    proto = record.get('proto', 'unknown').lower()
+    protocol_num = PROTOCOL_MAP.get(proto, 0)
+
+    # Service detection
+    service = record.get('service')
+    activity_id = ACTIVITY_ID_MAP.get(service, 6) if service else 6
+
+    # Connection state mapping
+    conn_state = record.get('conn_state', 'OTH')
+    conn_state_id = CONN_STATE_MAP.get(conn_state, 99)
+
+    # Build OCSF-compliant flat record
+    return {
+        # === OCSF Metadata Fields ===
+        'activity_id': activity_id,
+        'activity_name': service if service else 'Traffic',
+        'category_uid': 4,  # Network Activity
+        'category_name': 'Network Activity',
+        'class_uid': 4001,  # Network Activity class
+        'class_name': 'Network Activity',
+        'confidence': 100,  # High confidence (direct observation)
+        'severity_id': 1,   # Informational (normal traffic)
+        'type_uid': 400106, # Network Traffic (4001 * 100 + activity_id)
+        'type_name': f'Network Activity: {service if service else "Traffic"}',
+
+        # === OCSF Time Fields ===
+        **_time_fields(ts),
+
+        # === Source / Destination Endpoints (Flattened) ===
+        **_endpoint_fields(record, src_ip, src_port, dst_ip, dst_port),
+
+        # === Connection Info (Flattened) ===
+        'connection_info_uid': record.get('uid'),
+        'connection_info_protocol_num': protocol_num,
+        'connection_info_protocol_name': proto.upper(),
+        'connection_info_protocol_ver': 'IPv4',  # Could detect IPv6
+        'connection_info_tcp_flags': record.get('history'),
+        'connection_info_direction': 'Unknown',  # Could be enriched
+        'connection_info_boundary': 'Unknown',  # Could be enriched based on local_orig/resp
+
+        # === Traffic Metrics (Flattened) ===
+        'traffic_bytes_in': int(record.get('resp_bytes', 0)) if record.get('resp_bytes') is not None else 0,
+        'traffic_bytes_out': int(record.get('orig_bytes', 0)) if record.get('orig_bytes') is not None else 0,
+        'traffic_packets_in': int(record.get('resp_pkts', 0)) if record.get('resp_pkts') is not None else 0,
+        'traffic_packets_out': int(record.get('orig_pkts', 0)) if record.get('orig_pkts') is not None else 0,
+        'traffic_bytes': (
+            int(record.get('resp_bytes', 0) or 0) +
+            int(record.get('orig_bytes', 0) or 0)
+        ),
+        'traffic_packets': (
+            int(record.get('resp_pkts', 0) or 0) +
+            int(record.get('orig_pkts', 0) or 0)
+        ),
+
+        # === Network Metadata (Flattened) ===
+        **_metadata_fields('conn'),
+
+        # === Observables (for threat hunting) ===
+        **_observable_fields(src_ip, src_port, dst_ip, dst_port),
+
+        # === Additional Zeek-specific fields (OCSF unmapped namespace) ===
+        'unmapped_conn_state': conn_state,
+        'unmapped_conn_state_id': conn_state_id,
+        'unmapped_duration': float(record.get('duration', 0.0)) if record.get('duration') else 0.0,
+        'unmapped_missed_bytes': int(record.get('missed_bytes', 0)) if record.get('missed_bytes') is not None else 0,
+        'unmapped_tunnel_parents': json.dumps(record.get('tunnel_parents', [])),
+        'unmapped_vlan': record.get('vlan'),
+        'unmapped_inner_vlan': record.get('inner_vlan'),
+        'unmapped_community_id': record.get('community_id'),
+
+        # === Partitioning ===
+        'event_date': event_date.isoformat(),
+    }
+
+
+def _map_dns_record(record: Dict) -> Dict:
+    """Map a single Zeek dns record to OCSF DNS Activity (4003)"""
+    ts = float(record.get('ts', 0))
+    src_ip, src_port, dst_ip, dst_port = _zeek_conn_id(record)
+    proto = record.get('proto', 'unknown').lower()
+
+    # A logged rcode means the transaction saw a response
+    activity_name = 'Response' if record.get('rcode') is not None else 'Query'
+
+    return {
+        **_class_fields('dns', DNS_ACTIVITY_ID_MAP[activity_name], activity_name),
+        **_time_fields(ts),
+        **_endpoint_fields(record, src_ip, src_port, dst_ip, dst_port),
+
+        # === Connection Info (Flattened) ===
+        'connection_info_uid': record.get('uid'),
+        'connection_info_protocol_num': PROTOCOL_MAP.get(proto, 0),
+        'connection_info_protocol_name': proto.upper(),
+
+        # === DNS Query / Response (Flattened) ===
+        'query_hostname': record.get('query'),
+        'query_type': record.get('qtype_name'),
+        'query_class': record.get('qclass_name'),
+        'query_uid': str(record['trans_id']) if record.get('trans_id') is not None else None,
+        'rcode_id': record.get('rcode'),
+        'rcode': record.get('rcode_name'),
+        'answers': json.dumps(record.get('answers', [])),
+        'answers_ttls': json.dumps(record.get('TTLs', [])),
+        'is_authoritative': record.get('AA', False),
+        'is_truncated': record.get('TC', False),
+        'is_recursion_desired': record.get('RD', False),
+        'is_recursion_available': record.get('RA', False),
+
+        **_metadata_fields('dns'),
+        **_observable_fields(src_ip, src_port, dst_ip, dst_port),
+
+        # === Additional Zeek-specific fields (OCSF unmapped namespace) ===
+        'unmapped_rtt': float(record['rtt']) if record.get('rtt') is not None else None,
+        'unmapped_rejected': record.get('rejected', False),
+
+        # === Partitioning ===
+        'event_date': datetime.fromtimestamp(ts).date().isoformat(),
+    }
+
+
+def _map_http_record(record: Dict) -> Dict:
+    """Map a single Zeek http record to OCSF HTTP Activity (4002)"""
+    ts = float(record.get('ts', 0))
+    src_ip, src_port, dst_ip, dst_port = _zeek_conn_id(record)
+
+    method = (record.get('method') or '').upper()
+    activity_id = HTTP_ACTIVITY_ID_MAP.get(method, 99) if method else 0
+    resp_mime_types = record.get('resp_mime_types') or []
+
+    return {
+        **_class_fields('http', activity_id, method.title() if method else 'Unknown'),
+        **_time_fields(ts),
+        **_endpoint_fields(record, src_ip, src_port, dst_ip, dst_port),
+
+        # === Connection Info (Flattened) ===
+        'connection_info_uid': record.get('uid'),
+        'connection_info_protocol_num': PROTOCOL_MAP['tcp'],
+        'connection_info_protocol_name': 'TCP',
+
+        # === HTTP Request / Response (Flattened) ===
+        'http_request_http_method': method or None,
+        'http_request_url_hostname': record.get('host'),
+        'http_request_url_path': record.get('uri'),
+        'http_request_user_agent': record.get('user_agent'),
+        'http_request_referrer': record.get('referrer'),
+        'http_request_version': record.get('version'),
+        'http_response_code': record.get('status_code'),
+        'http_response_message': record.get('status_msg'),
+        'http_response_content_type': resp_mime_types[0] if resp_mime_types else None,
+
+        # === Traffic Metrics (Flattened) ===
+        'traffic_bytes_in': int(record.get('response_body_len') or 0),
+        'traffic_bytes_out': int(record.get('request_body_len') or 0),
+
+        **_metadata_fields('http'),
+        **_observable_fields(src_ip, src_port, dst_ip, dst_port),
+
+        # === Additional Zeek-specific fields (OCSF unmapped namespace) ===
+        'unmapped_trans_depth': record.get('trans_depth'),
+        'unmapped_resp_fuids': json.dumps(record.get('resp_fuids', [])),
+        'unmapped_orig_fuids': json.dumps(record.get('orig_fuids', [])),
+        'unmapped_tags': json.dumps(record.get('tags', [])),
+
+        # === Partitioning ===
+        'event_date': datetime.fromtimestamp(ts).date().isoformat(),
+    }
+
+
+def _map_ssl_record(record: Dict) -> Dict:
+    """Map a single Zeek ssl record to OCSF Network Activity (4001) with TLS extension"""
+    ts = float(record.get('ts', 0))
+    src_ip, src_port, dst_ip, dst_port = _zeek_conn_id(record)
+
+    return {
+        **_class_fields('ssl', ACTIVITY_ID_MAP['ssl'], 'ssl'),
+        **_time_fields(ts),
+        **_endpoint_fields(record, src_ip, src_port, dst_ip, dst_port),
+
+        # === Connection Info (Flattened) ===
+        'connection_info_uid': record.get('uid'),
+        'connection_info_protocol_num': PROTOCOL_MAP['tcp'],
+        'connection_info_protocol_name': 'TCP',
+
+        # === TLS (Flattened) ===
+        'tls_version': record.get('version'),
+        'tls_cipher': record.get('cipher'),
+        'tls_curve': record.get('curve'),
+        'tls_sni': record.get('server_name'),
+        'tls_alpn': record.get('next_protocol'),
+        'tls_is_established': record.get('established', False),
+        'tls_is_resumed': record.get('resumed', False),
+        'tls_certificate_subject': record.get('subject'),
+        'tls_certificate_issuer': record.get('issuer'),
+        'tls_certificate_fingerprints': json.dumps(record.get('cert_chain_fps', [])),
+        'tls_ja3': record.get('ja3'),
+        'tls_ja3s': record.get('ja3s'),
+        'tls_validation_status': record.get('validation_status'),
+
+        **_metadata_fields('ssl'),
+        **_observable_fields(src_ip, src_port, dst_ip, dst_port),
+
+        # === Partitioning ===
+        'event_date': datetime.fromtimestamp(ts).date().isoformat(),
+    }
+
+
+def _map_files_record(record: Dict) -> Dict:
+    """Map a single Zeek files record to OCSF File System Activity (1001)"""
+    ts = float(record.get('ts', 0))
+
+    # Zeek >= 5.1 logs the connection id; older versions only log host lists
+    src_ip, src_port, dst_ip, dst_port = _zeek_conn_id(record)
+    if src_ip is None:
+        tx_hosts = record.get('tx_hosts') or []
+        rx_hosts = record.get('rx_hosts') or []
+        src_ip = tx_hosts[0] if tx_hosts else None
+        dst_ip = rx_hosts[0] if rx_hosts else None
+    conn_uids = record.get('conn_uids') or []
+    uid = record.get('uid') or (conn_uids[0] if conn_uids else None)
+
+    return {
+        **_class_fields('files', 99, 'Other'),
+        **_time_fields(ts),
+        **_endpoint_fields(record, src_ip, src_port, dst_ip, dst_port),
+
+        # === Connection Info (Flattened) ===
+        'connection_info_uid': uid,
+
+        # === File (Flattened) ===
+        'file_uid': record.get('fuid'),
+        'file_name': record.get('filename'),
+        'file_mime_type': record.get('mime_type'),
+        'file_size': int(record.get('total_bytes') or record.get('seen_bytes') or 0),
+        'file_hash_md5': record.get('md5'),
+        'file_hash_sha1': record.get('sha1'),
+        'file_hash_sha256': record.get('sha256'),
+        'file_source': record.get('source'),
+        'file_is_orig': record.get('is_orig'),
+        'file_analyzers': json.dumps(record.get('analyzers', [])),
+        'file_extracted': record.get('extracted'),
+
+        **_metadata_fields('files'),
+        **_observable_fields(src_ip, src_port, dst_ip, dst_port),
+
+        # === Additional Zeek-specific fields (OCSF unmapped namespace) ===
+        'unmapped_duration': float(record.get('duration') or 0.0),
+        'unmapped_missed_bytes': int(record.get('missed_bytes') or 0),
+        'unmapped_conn_uids': json.dumps(conn_uids),
+
+        # === Partitioning ===
+        'event_date': datetime.fromtimestamp(ts).date().isoformat(),
+    }
+
+
+# Per-log-type record mappers, dispatched on Zeek's `_path` field
+LOG_TYPE_MAPPERS = {
+    'conn': _map_conn_record,
+    'dns': _map_dns_record,
+    'http': _map_http_record,
+    'ssl': _map_ssl_record,
+    'files': _map_files_record,
+}
+
+
+def transform_zeek_to_ocsf_flat(zeek_records: List[Dict],
+                                dead_letter: Optional[DeadLetterSink] = None) -> pd.DataFrame:
+    """
+    Transform Zeek conn logs to OCSF-compliant flat schema.
+
+    This creates a denormalized structure with OCSF field naming conventions,
+    optimized for analytical workloads while maintaining semantic compliance.
+
+    Args:
+        zeek_records: List of Zeek conn log dictionaries
+        dead_letter: Sink for records that cannot be mapped
+
+    Returns:
+        DataFrame with OCSF-compliant flat schema
+    """
+    return _transform_records(zeek_records, 'conn', _map_conn_record, dead_letter)
+
+
+def transform_zeek_log_to_ocsf_flat(zeek_records: List[Dict], log_type: str,
+                                    dead_letter: Optional[DeadLetterSink] = None) -> pd.DataFrame:
+    """
+    Transform Zeek records of a single log type to its OCSF class.
+
+    Args:
+        zeek_records: List of Zeek log dictionaries
+        log_type: Zeek log type (one of LOG_TYPE_MAPPERS)
+        dead_letter: Sink for records that cannot be mapped
+
+    Returns:
+        DataFrame with OCSF-compliant flat schema
+    """
+    if log_type not in LOG_TYPE_MAPPERS:
+        raise ValueError(f"Unsupported Zeek log type: {log_type}")
+    return _transform_records(zeek_records, log_type, LOG_TYPE_MAPPERS[log_type], dead_letter)
+
+
+def group_by_log_type(zeek_records: List[Dict],
+                      default_log_type: str = 'conn') -> Dict[str, List[Dict]]:
+    """
+    Split mixed Zeek records by their `_path` field.
+
+    Args:
+        zeek_records: List of Zeek log dictionaries, possibly of mixed types
+        default_log_type: Log type for records without a `_path` field
+
+    Returns:
+        Dictionary of log type to records
+    """
+    groups: Dict[str, List[Dict]] = {}
+    for record in zeek_records:
+        groups.setdefault(record.get('_path', default_log_type), []).append(record)
+    return groups
+
+
+def transform_zeek_records(zeek_records: List[Dict],
+                           default_log_type: str = 'conn',
+                           dead_letter: Optional[DeadLetterSink] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Transform mixed Zeek records to OCSF, dispatching on `_path`.
+
+    Args:
+        zeek_records: List of Zeek log dictionaries, possibly of mixed types
+        default_log_type: Log type for records without a `_path` field
+        dead_letter: Sink for unmappable records and unsupported log types
+
+    Returns:
+        Dictionary of log type to OCSF DataFrame
+    """
+    results = {}
+    for log_type, records in group_by_log_type(zeek_records, default_log_type).items():
+        if log_type not in LOG_TYPE_MAPPERS:
+            if dead_letter is None:
+                logger.warning(f"Skipping {len(records):,} records of unsupported log type: {log_type}")
+                continue
+            for record in records:
+                dead_letter.add(str(log_type), UNSUPPORTED_LOG_TYPE, record)
+            continue
+        results[log_type] = transform_zeek_log_to_ocsf_flat(records, log_type, dead_letter)
+    return results
+
+def validate_ocsf_compliance(df: pd.DataFrame, log_type: str = 'conn') -> Dict[str, bool]:
     """
     Validate that the DataFrame meets OCSF compliance requirements.
 
     Args:
         df: DataFrame with OCSF fields
+        log_type: Zeek log type the DataFrame was transformed from
 
     Returns:
         Dictionary of compliance checks and results
     """
     checks = {}
+    category_uid, _, class_uid, _ = LOG_TYPE_CLASSES[log_type]
 
-    # Required OCSF fields for Network Activity (class_uid 4001)
-    required_fields = [
-        'activity_id', 'category_uid', 'class_uid', 'time',
-        'src_endpoint_ip', 'dst_endpoint_ip'
-    ]
+    # Required OCSF fields for the class
+    required_fields = ['activity_id', 'category_uid', 'class_uid', 'time']
+    if log_type == 'files':
+        required_fields.append('file_uid')
+    else:
+        required_fields.extend(['src_endpoint_ip', 'dst_endpoint_ip'])
 
     # Check required fields exist
     for field in required_fields:
@@ -245,10 +646,10 @@ def validate_ocsf_compliance(df: pd.DataFrame) -> Dict[str, bool]:
         checks['activity_id_valid'] = df['activity_id'].between(0, 99).all()
 
     if 'category_uid' in df.columns:
-        checks['category_uid_is_4'] = (df['category_uid'] == 4).all()
+        checks[f'category_uid_is_{category_uid}'] = (df['category_uid'] == category_uid).all()
 
     if 'class_uid' in df.columns:
-        checks['class_uid_is_4001'] = (df['class_uid'] == 4001).all()
+        checks[f'class_uid_is_{class_uid}'] = (df['class_uid'] == class_uid).all()
 
     # Overall compliance
     checks['overall_compliance'] = all(checks.values())
@@ -276,11 +677,8 @@ def write_ocsf_parquet(df: pd.DataFrame, output_path: Path,
         table,
         output_path,
         compression=compression,
-        use_dictionary=True,  # Dictionary encoding for repeated values
-        write_statistics=True,  # Statistics for query optimization
-        row_group_size=50000,  # Optimize for query performance
-        data_page_size=1024*1024,  # 1MB pages
-        version='2.6'  # Latest Parquet format
+        row_group_size=PARQUET_ROW_GROUP_SIZE,
+        **PARQUET_WRITE_OPTIONS
     )
 
     file_size_mb = output_path.stat().st_size / 1024 / 1024
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Zeek Connection UID Index for Cross-Log Pivots
+
+Correlating conn with dns/http/ssl/files by Zeek `uid` in Dremio is a
+shuffle join over every log type. The loader instead maintains a compact
+side table per day that maps each uid to the row groups holding its
+records:
+
+    uid-index/year=YYYY/month=MM/day=DD/index.parquet
+        uid | log_type | partition | file | row_group
+
+The index is sorted by uid, so a lookup is a binary search followed by
+ranged reads of only the matching row groups in the data files.
+
+Requirements:
+    pip install pyarrow pandas numpy
+
+Usage:
+    python3 scripts/uid_index.py CXk4fz3LjsKVwF7fJf --date 2023-11-13
+    python3 scripts/uid_index.py CXk4fz3LjsKVwF7fJf --local-root /data/zeek-data
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+
+# Add scripts directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from settings import MinioSettings, get_settings
+
+logger = logging.getLogger(__name__)
+
+# Index Configuration
+UID_INDEX_FOLDER = "uid-index"
+UID_COLUMN = "connection_info_uid"
+INDEX_ROW_GROUP_SIZE = 100000
+
+INDEX_SCHEMA = pa.schema([
+    ('uid', pa.string()),
+    ('log_type', pa.string()),
+    ('partition', pa.string()),
+    ('file', pa.string()),
+    ('row_group', pa.int32()),
+])
+
+
+def partition_path(year: int, month: int, day: int) -> str:
+    """Hive-style partition path used by the loaders"""
+    return f"year={year}/month={month:02d}/day={day:02d}"
+
+
+def index_key(partition: str) -> str:
+    """Object key of the uid index for a partition"""
+    return f"{UID_INDEX_FOLDER}/{partition}/index.parquet"
+
+
+def build_uid_index(df: pd.DataFrame, log_type: str, partition: str,
+                    file_key: str, parquet_path: Path) -> pd.DataFrame:
+    """
+    Build uid index entries for a data file that has just been written.
+
+    Row group boundaries are read from the written file's footer, so the
+    index stays correct regardless of the writer's row group settings.
+
+    Args:
+        df: DataFrame in the row order it was written to parquet_path
+        log_type: Zeek log type of the records
+        partition: Partition path (year=/month=/day=)
+        file_key: Object key of the data file relative to the bucket
+        parquet_path: Local path of the written Parquet file
+
+    Returns:
+        Index entries, one per (uid, row group)
+    """
+    if UID_COLUMN not in df.columns:
+        return pd.DataFrame(columns=INDEX_SCHEMA.names)
+
+    metadata = pq.ParquetFile(parquet_path).metadata
+    row_group_ends = np.cumsum([
+        metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)
+    ])
+    row_groups = np.searchsorted(row_group_ends, np.arange(len(df)), side='right')
+
+    index = pd.DataFrame({
+        'uid': df[UID_COLUMN].to_numpy(),
+        'row_group': row_groups.astype('int32'),
+    })
+    index = index.dropna(subset=['uid']).drop_duplicates()
+    index.insert(1, 'log_type', log_type)
+    index.insert(2, 'partition', partition)
+    index.insert(3, 'file', file_key)
+    return index
+
+
+def merge_uid_index(existing: Optional[pd.DataFrame], new: pd.DataFrame,
+                    removed_files: Iterable[str] = ()) -> pd.DataFrame:
+    """
+    Merge new index entries into an existing partition index.
+
+    Entries pointing at files that were just rewritten are replaced, and
+    entries of removed_files (stale parts deleted by a reload) dropped, so
+    reloading a partition keeps the index consistent with the data.
+    """
+    if existing is not None and not existing.empty:
+        replaced = set(new['file'].unique()) | set(removed_files)
+        existing = existing[~existing['file'].isin(replaced)]
+        new = pd.concat([existing, new], ignore_index=True)
+    return new.sort_values(['uid', 'log_type', 'row_group'], kind='stable', ignore_index=True)
+
+
+def write_uid_index(index: pd.DataFrame, output_path: Path) -> None:
+    """Write a sorted uid index with statistics for row group pruning"""
+    table = pa.Table.from_pandas(index, schema=INDEX_SCHEMA, preserve_index=False)
+    pq.write_table(
+        table,
+        output_path,
+        compression='zstd',
+        use_dictionary=['log_type', 'partition', 'file'],
+        write_statistics=True,
+        row_group_size=INDEX_ROW_GROUP_SIZE,
+    )
+    logger.info(f"✓ Wrote uid index: {output_path} ({len(index):,} entries)")
+
+
+class UidIndex:
+    """Look up all records for a Zeek uid by reading only the relevant row groups"""
+
+    def __init__(self, filesystem: pafs.FileSystem, root: str):
+        self.filesystem = filesystem
+        self.root = root.rstrip('/')
+
+    @classmethod
+    def from_minio(cls, minio: Optional[MinioSettings] = None) -> 'UidIndex':
+        """Index over the MinIO bucket written by the loaders (default: configured MinIO)"""
+        minio = minio or get_settings().minio
+        return cls(minio.arrow_filesystem(), minio.bucket)
+
+    @classmethod
+    def from_local(cls, root: Path) -> 'UidIndex':
+        """Index over a local mirror of the bucket"""
+        return cls(pafs.LocalFileSystem(), str(Path(root).resolve()))
+
+    def _index_paths(self, event_date: Optional[str]) -> List[str]:
+        if event_date:
+            year, month, day = (int(part) for part in event_date.split('-'))
+            return [f"{self.root}/{index_key(partition_path(year, month, day))}"]
+
+        selector = pafs.FileSelector(f"{self.root}/{UID_INDEX_FOLDER}",
+                                     recursive=True, allow_not_found=True)
+        return sorted(
+            info.path for info in self.filesystem.get_file_info(selector)
+            if info.type == pafs.FileType.File and info.path.endswith('.parquet')
+        )
+
+    def _read_entries(self, path: str, uid: str) -> Optional[pd.DataFrame]:
+        """
+        Read the index entries of a uid from one day's index.
+
+        The index is sorted by uid, so the row group min/max statistics
+        select the (usually single) row group that can hold it; only those
+        row groups are read.
+        """
+        if self.filesystem.get_file_info(path).type != pafs.FileType.File:
+            return None
+        with self.filesystem.open_input_file(path) as f:
+            index_file = pq.ParquetFile(f)
+            metadata = index_file.metadata
+            column = index_file.schema_arrow.get_field_index('uid')
+            row_groups = []
+            for i in range(metadata.num_row_groups):
+                stats = metadata.row_group(i).column(column).statistics
+                if stats is None or not stats.has_min_max or stats.min <= uid <= stats.max:
+                    row_groups.append(i)
+            if not row_groups:
+                return None
+            table = index_file.read_row_groups(row_groups)
+
+        uids = table.column('uid').to_numpy(zero_copy_only=False)
+        lo = np.searchsorted(uids, uid, side='left')
+        hi = np.searchsorted(uids, uid, side='right')
+        if hi == lo:
+            return None
+        return table.slice(lo, hi - lo).to_pandas()
+
+    def locate(self, uid: str, event_date: Optional[str] = None) -> pd.DataFrame:
+        """
+        Find the (log_type, file, row_group) locations of a uid.
+
+        Args:
+            uid: Zeek connection uid
+            event_date: Restrict the search to one day (YYYY-MM-DD)
+
+        Returns:
+            Matching index entries
+        """
+        matches = []
+        for path in self._index_paths(event_date):
+            entries = self._read_entries(path, uid)
+            if entries is not None:
+                matches.append(entries)
+
+        if not matches:
+            return pd.DataFrame(columns=INDEX_SCHEMA.names)
+        return pd.concat(matches, ignore_index=True)
+
+    def fetch(self, uid: str, event_date: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch all records for a uid across log types.
+
+        Args:
+            uid: Zeek connection uid
+            event_date: Restrict the search to one day (YYYY-MM-DD)
+
+        Returns:
+            Dictionary of log type to matching OCSF records
+        """
+        locations = self.locate(uid, event_date)
+        results: Dict[str, List[pd.DataFrame]] = {}
+
+        for (log_type, file_key), group in locations.groupby(['log_type', 'file'], sort=False):
+            with self.filesystem.open_input_file(f"{self.root}/{file_key}") as f:
+                table = pq.ParquetFile(f).read_row_groups(sorted(group['row_group'].unique()))
+            df = table.to_pandas()
+            results.setdefault(log_type, []).append(df[df[UID_COLUMN] == uid])
+
+        return {
+            log_type: pd.concat(dfs, ignore_index=True)
+            for log_type, dfs in results.items()
+        }
+
+
+def main():
+    """Look up a uid from the command line"""
+    parser = argparse.ArgumentParser(description='Fetch all OCSF records for a Zeek uid')
+    parser.add_argument('uid', help='Zeek connection uid')
+    parser.add_argument('--date', type=str,
+                        help='Event date (YYYY-MM-DD) to restrict the search')
+    parser.add_argument('--local-root', type=str,
+                        help='Local mirror of the bucket instead of MinIO')
+    args = parser.parse_args()
+
+    if args.local_root:
+        index = UidIndex.from_local(Path(args.local_root))
+    else:
+        index = UidIndex.from_minio()
+
+    start = time.perf_counter()
+    results = index.fetch(args.uid, args.date)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if not results:
+        logger.info(f"No records found for uid {args.uid}")
+        return 1
+
+    for log_type, df in results.items():
+        logger.info(f"{log_type}: {len(df):,} records")
+        columns = [c for c in ['time', 'src_endpoint_ip', 'dst_endpoint_ip', 'activity_name']
+                   if c in df.columns]
+        for row in df[columns].itertuples(index=False):
+            logger.info(f"  {dict(zip(columns, row))}")
+
+    logger.info(f"✓ Lookup completed in {elapsed_ms:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    sys.exit(main())